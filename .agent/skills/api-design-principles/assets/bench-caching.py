@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Load test for the response cache and conditional GETs in rest-api-template.py.
+
+Drives the app in-process through httpx's ASGI transport (no network) with
+repeat reads of a hot set of users and list pages, in three modes:
+
+  no-cache      cache disabled, plain GETs (every request rebuilds + encodes)
+  cache         TTL/LRU cache on, plain GETs
+  cache+etag    cache on, clients revalidate with If-None-Match (304s)
+
+and reports requests per second and response bytes for each. A fraction of
+requests can be PATCHes (--write-ratio) to show invalidation keeps reads
+fresh.
+
+Usage:
+    python bench-caching.py [--requests 5000] [--concurrency 16] [--write-ratio 0.01]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ASSETS_DIR = Path(__file__).resolve().parent
+
+
+def load_template():
+    """Import rest-api-template.py (its name is not a valid module name) on a scratch database."""
+    os.environ.setdefault("API_DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+    # One in-process client at full speed: rate limiting and load shedding would turn this into their benchmark
+    os.environ.setdefault("API_RATE_LIMIT_RPS", "0")
+    os.environ.setdefault("API_MAX_CONCURRENCY", "0")
+    spec = importlib.util.spec_from_file_location('rest_api_template', ASSETS_DIR / 'rest-api-template.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def hot_set(api) -> list:
+    users = [f"/api/users/{i:08d}" for i in range(20)]  # Seeded demo users
+    pages = [f"/api/users?page={page}&page_size=100" for page in (1, 2)] + \
+            [f"/api/users?page={page}&page_size=20" for page in range(1, 6)]
+    return users + pages
+
+
+async def run_mode(api, mode: str, requests: int, concurrency: int, write_ratio: float, seed: int) -> dict:
+    api.response_cache = api.ResponseCache(maxsize=0 if mode == "no-cache" else 1024, ttl=30.0)
+    paths = hot_set(api)
+    rng = random.Random(seed)
+    plan = [rng.choice(paths) for _ in range(requests)]
+    writes = {i for i in range(requests) if rng.random() < write_ratio}
+    etags = {}
+    # Per-user write sequence: PATCHes to one user are serialized, and a read
+    # must not return a name older than the last write completed before it began
+    sequence = iter(range(requests))
+    completed = {}
+    locks = {}
+    totals = {"bytes": 0, "304": 0, "200": 0, "writes": 0, "stale": 0}
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def client(http: httpx.AsyncClient):
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            path = plan[i]
+            if i in writes:
+                user_id = rng.choice(paths[:20]).rsplit("/", 1)[-1]
+                async with locks.setdefault(user_id, asyncio.Lock()):
+                    seq = next(sequence)
+                    await http.patch(f"/api/users/{user_id}", json={"name": f"Renamed {seq}"})
+                    completed[user_id] = seq
+                totals["writes"] += 1
+                continue
+            expected = completed.get(path.rsplit("/", 1)[-1], -1)
+            headers = {}
+            if mode == "cache+etag" and path in etags:
+                headers["If-None-Match"] = etags[path][0]
+            response = await http.get(path, headers=headers)
+            totals["bytes"] += len(response.content)
+            if response.status_code == 304:
+                totals["304"] += 1
+            else:
+                totals["200"] += 1
+                assert response.status_code == 200, (response.status_code, response.text[:300])
+                etags[path] = (response.headers["etag"], response.content)
+            if path.startswith("/api/users/") and response.status_code == 200:
+                # Invalidation check against the writes completed before this read
+                name = response.json()["name"]
+                seen = int(name.split()[-1]) if name.startswith("Renamed") else -1
+                if seen < expected:
+                    totals["stale"] += 1
+
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    reads = requests - totals["writes"]
+    return {"mode": mode, "rps": requests / elapsed, "bytes": totals["bytes"], "bytes_per_read": totals["bytes"] / reads,
+            "not_modified": totals["304"], "hit_rate": api.response_cache.hits / max(1, api.response_cache.hits +
+                                                                                    api.response_cache.misses),
+            "stale": totals["stale"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and bandwidth with and without response caching")
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--write-ratio', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    api = load_template()
+
+    async def run_all():
+        try:
+            return [await run_mode(api, mode, args.requests, args.concurrency, args.write_ratio, args.seed)
+                    for mode in ("no-cache", "cache", "cache+etag")]
+        finally:
+            await api.pool.close()
+
+    results = asyncio.run(run_all())
+
+    base = results[0]
+    print(f"{args.requests:,} requests, concurrency {args.concurrency}, {args.write_ratio:.0%} writes")
+    print(f"{'Mode':<12} {'req/s':>9} {'vs no-cache':>12} {'KB sent':>10} {'B/read':>8} {'304s':>6} {'hit rate':>9}")
+    for r in results:
+        print(f"{r['mode']:<12} {r['rps']:>9,.0f} {r['rps'] / base['rps']:>11.1f}x {r['bytes'] / 1024:>10,.0f} "
+              f"{r['bytes_per_read']:>8,.0f} {r['not_modified']:>6,} {r['hit_rate']:>8.0%}")
+
+    stale = sum(r["stale"] for r in results)
+    if stale:
+        print(f"FAIL: {stale} reads returned data older than the last write")
+        return 1
+    print("No stale reads after writes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
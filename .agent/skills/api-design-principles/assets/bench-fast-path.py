@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fast path (API_FAST_PATH) in rest-api-template.py.
+
+Drives each hot endpoint in-process through httpx's ASGI transport (no
+network) with the fast path off and then on, and reports requests per
+second and p50/p99 latency per endpoint. The response cache is disabled so
+every request pays for building and encoding its response, which is what
+the fast path changes. Responses from both modes are compared to make sure
+the fast path returns the same JSON.
+
+Usage:
+    python bench-fast-path.py [--requests 1000] [--concurrency 8] [--endpoint list-100 ...]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ASSETS_DIR = Path(__file__).resolve().parent
+
+
+def load_template():
+    """Import rest-api-template.py (its name is not a valid module name) on a scratch database."""
+    os.environ.setdefault("API_DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+    # One in-process client at full speed: rate limiting and load shedding would turn this into their benchmark
+    os.environ.setdefault("API_RATE_LIMIT_RPS", "0")
+    os.environ.setdefault("API_MAX_CONCURRENCY", "0")
+    spec = importlib.util.spec_from_file_location('rest_api_template', ASSETS_DIR / 'rest-api-template.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def endpoints() -> dict:
+    """name -> function(i) returning (method, url, json body) for request i."""
+    seeded = [f"{i:08d}" for i in range(100)]
+    batch_ids = "&".join(f"ids={user_id}" for user_id in seeded[:20])
+    return {
+        "list-20": lambda i: ("GET", "/api/users?page=1&page_size=20", None),
+        "list-100": lambda i: ("GET", "/api/users?page=1&page_size=100", None),
+        "cursor-100": lambda i: ("GET", "/api/users?pagination=cursor&page_size=100", None),
+        "get": lambda i: ("GET", f"/api/users/{seeded[i % 100]}", None),
+        "batch-20": lambda i: ("GET", f"/api/users/batch?{batch_ids}", None),
+        "create": lambda i: ("POST", "/api/users",
+                             {"email": f"bench{i}-{time.monotonic_ns()}@example.com", "name": f"Bench {i}",
+                              "password": "correct-horse"}),
+        "update": lambda i: ("PATCH", f"/api/users/{seeded[i % 100]}", {"name": f"Renamed {i}"}),
+    }
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_endpoint(http: httpx.AsyncClient, make_request, requests: int, concurrency: int) -> dict:
+    counter = itertools.count()
+    latencies = []
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        while (i := next(counter)) < requests:
+            method, url, body = make_request(i)
+            start = time.perf_counter()
+            response = await http.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            errors += response.status_code >= 400
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"rps": requests / elapsed, "p50_ms": statistics.median(latencies) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000, "errors": errors}
+
+
+def comparable(name: str, payload: dict) -> dict:
+    """Strip the fields that legitimately differ between two runs of an endpoint."""
+    if name in ("create", "update"):
+        return {key: value for key, value in payload.items() if key not in ("id", "email", "name", "created_at",
+                                                                            "updated_at")}
+    return payload
+
+
+async def same_responses(api, http: httpx.AsyncClient, names: list) -> list:
+    """Endpoints whose JSON differs between the fast path and the checked path."""
+    mismatched = []
+    for name in names:
+        bodies = []
+        for fast in (False, True):
+            api.FAST_PATH = fast
+            method, url, body = endpoints()[name](0)  # Fresh body: a second create must not 409
+            response = await http.request(method, url, json=body)
+            bodies.append((response.status_code, comparable(name, response.json())))
+        if bodies[0] != bodies[1]:
+            mismatched.append(name)
+    return mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests/s and p99 per endpoint with the fast path off and on")
+    parser.add_argument('--requests', type=int, default=1000, help="Requests per endpoint and mode")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--endpoint', action='append', choices=sorted(endpoints()),
+                        help="Only benchmark these endpoints (repeatable)")
+    args = parser.parse_args()
+    names = args.endpoint or list(endpoints())
+
+    api = load_template()
+    api.response_cache = api.ResponseCache(maxsize=0)
+
+    async def run_all():
+        results = {}
+        transport = httpx.ASGITransport(app=api.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+                mismatched = await same_responses(api, http, names)
+                for name in names:
+                    for fast in (False, True):
+                        api.FAST_PATH = fast
+                        warmup = max(10, args.requests // 10)
+                        await run_endpoint(http, endpoints()[name], warmup, args.concurrency)
+                        results[name, fast] = await run_endpoint(http, endpoints()[name], args.requests,
+                                                                 args.concurrency)
+        finally:
+            await api.pool.close()
+        return results, mismatched
+
+    results, mismatched = asyncio.run(run_all())
+
+    encoder = "orjson" if api.orjson is not None else "json (install orjson for the faster encoder)"
+    print(f"{args.requests:,} requests per endpoint and mode, concurrency {args.concurrency}, "
+          f"response cache off, fast-path encoder: {encoder}")
+    print(f"{'Endpoint':<11} {'off req/s':>10} {'on req/s':>10} {'speedup':>8} "
+          f"{'off p50':>9} {'on p50':>9} {'off p99':>9} {'on p99':>9}")
+    for name in names:
+        off, on = results[name, False], results[name, True]
+        print(f"{name:<11} {off['rps']:>10,.0f} {on['rps']:>10,.0f} {on['rps'] / off['rps']:>7.1f}x "
+              f"{off['p50_ms']:>7.2f}ms {on['p50_ms']:>7.2f}ms {off['p99_ms']:>7.2f}ms {on['p99_ms']:>7.2f}ms")
+
+    errors = sum(result["errors"] for result in results.values())
+    if errors or mismatched:
+        if errors:
+            print(f"FAIL: {errors} requests returned an error status")
+        if mismatched:
+            print(f"FAIL: fast path changed the response of: {', '.join(mismatched)}")
+        return 1
+    print("Fast path responses match the checked path")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark filtered user lists (?status=, ?search=) from rest-api-template.py.
+
+Builds a users table with the template's own schema (1M rows by default;
+status index, FTS5 search index and its triggers) and times the queries a
+filtered list request runs, through the template's UserRepository:
+
+  naive     status filtered while walking the (created_at, id) index, search
+            as LIKE '%word%' on name and email
+  indexed   the template's plans: status index, FTS5 / bounded scan for search
+
+for one page (what a cursor page costs) and for page + COUNT(*) (what an
+offset page with its total costs), across searches from rare to very common
+and one that matches nobody (the naive worst case: every row is scanned).
+Both plans must return the same rows.
+
+Usage:
+    python bench-filtering.py [--rows N] [--page-size 20] [--repeat 5] [--db users.sqlite]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ASSETS_DIR = Path(__file__).resolve().parent
+SYLLABLES = ["al", "an", "ar", "be", "ca", "da", "el", "fi", "ga", "ha", "is", "jo", "ka", "le", "ma", "ni",
+             "or", "pa", "ri", "sa", "ta", "ul", "va", "we", "yo", "zu"]
+DOMAINS = ["example.com", "example.org", "mail.example.net"]
+
+
+def load_template():
+    """Import rest-api-template.py (its name is not a valid module name)."""
+    os.environ.setdefault("API_DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+    spec = importlib.util.spec_from_file_location('rest_api_template', ASSETS_DIR / 'rest-api-template.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def vocabulary(seed: int) -> tuple:
+    """300 first names and 5,000 last names made of random syllables."""
+    rng = random.Random(seed)
+
+    def names(count: int, syllables: int) -> list:
+        found = set()
+        while len(found) < count:
+            found.add("".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize())
+        return sorted(found)
+
+    return names(300, 2), names(5000, 3)
+
+
+def build_table(api, path: str, rows: int, seed: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    existing = conn.execute("SELECT name FROM sqlite_master WHERE name = 'users_fts'").fetchone()
+    if existing and conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == rows:
+        return conn
+    conn.executescript("DROP TABLE IF EXISTS users_fts; DROP TABLE IF EXISTS users;")
+    conn.executescript(api.SCHEMA_SQL)
+    first_names, last_names = vocabulary(seed)
+    rng = random.Random(seed)
+    epoch = datetime(2024, 1, 1)
+
+    def row(i: int) -> tuple:
+        first, last = rng.choice(first_names), rng.choice(last_names)
+        status = rng.choices(["active", "inactive", "suspended"], weights=[90, 8, 2])[0]
+        created = (epoch + timedelta(seconds=i // 2)).isoformat()  # Two users per second: (created_at, id) ties
+        return (f"{i:08d}", f"{first.lower()}.{last.lower()}{i}@{rng.choice(DOMAINS)}", f"{first} {last}",
+                status, created, created)
+
+    with conn:  # The triggers fill the search index as rows go in
+        conn.executemany(f"INSERT INTO users ({api.USER_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                         (row(i) for i in range(rows)))
+    conn.execute("ANALYZE")
+    return conn
+
+
+def scenarios(seed: int) -> list:
+    """(label, status, search words): rare to very common searches, plus status-only and no-match."""
+    first_names, last_names = vocabulary(seed)
+    return [
+        ("status=suspended", "suspended", ()),
+        ("status=inactive", "inactive", ()),
+        ("search rare (last name)", None, (last_names[1234].lower(),)),
+        ("search first + last", None, (first_names[12].lower(), last_names[99].lower()[:4])),
+        ("search common (first name)", None, (first_names[12].lower(),)),
+        ("search prefix (2 letters)", None, (first_names[12].lower()[:2],)),
+        ("search + status", "suspended", (first_names[12].lower(),)),
+        ("search no match", None, ("zzzz",)),
+    ]
+
+
+def naive_sql(api, status, terms: tuple) -> tuple:
+    """(where, params) without the status or search index."""
+    clauses, params = [], []
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    for term in terms:
+        clauses.append("(name LIKE ? OR email LIKE ?)")
+        params += [f"%{term}%"] * 2
+    return api.where_sql(clauses), tuple(params)
+
+
+async def same_as_scan(api, repo, filters, rows: list, total: int) -> bool:
+    """Check a page and count against a full scan with search_match (LIKE '%word%' also matches mid-word)."""
+    clauses, params = filters.conditions(use_search_index=False)
+    if filters.terms:
+        clauses.append("search_match(name, email, ?)")
+        params.append(" ".join(filters.terms))
+    where = api.where_sql(clauses)
+    expected = await repo.query(f"SELECT id FROM users INDEXED BY users_created_at_id {where} "
+                                f"ORDER BY created_at, id LIMIT ?", (*params, len(rows) + 1))
+    expected_total = await repo.query(f"SELECT COUNT(*) FROM users {where}", tuple(params))
+    return [u.id for u in rows] == [row[0] for row in expected][:len(rows)] and total == expected_total[0][0]
+
+
+async def timed_ms(fn, repeat: int) -> tuple:
+    """(median ms, last result)."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+async def run(api, path: str, page_size: int, repeat: int, seed: int) -> list:
+    pool = api.ConnectionPool(path, size=1)
+    results = []
+    try:
+        async with pool.acquire() as conn:
+            repo = api.UserRepository(conn)
+            for label, status, terms in scenarios(seed):
+                filters = api.UserFilter(api.UserStatus(status) if status else None, terms)
+                where, params = naive_sql(api, status, terms)
+                naive_page = (f"SELECT {api.USER_COLUMNS} FROM users INDEXED BY users_created_at_id {where} "
+                              f"ORDER BY created_at, id LIMIT ?")
+                naive_count = f"SELECT COUNT(*) FROM users INDEXED BY users_created_at_id {where}"
+
+                naive_ms, _ = await timed_ms(
+                    lambda: repo.fetch_all(naive_page, (*params, page_size)), repeat)
+                page_ms, rows = await timed_ms(lambda: repo.list_after(None, page_size, filters), repeat)
+                naive_count_ms, _ = await timed_ms(lambda: repo.query(naive_count, params), repeat)
+                count_ms, total = await timed_ms(lambda: repo.count(filters), repeat)
+                results.append({
+                    "label": label, "matches": total, "naive_ms": naive_ms, "page_ms": page_ms,
+                    "naive_total_ms": naive_ms + naive_count_ms, "total_ms": page_ms + count_ms,
+                    "same": await same_as_scan(api, repo, filters, rows, total),
+                })
+    finally:
+        await pool.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filtered list latency: naive scans vs. status and FTS5 indexes")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--db', help="Reuse (or create) this SQLite file instead of a temp file")
+    args = parser.parse_args()
+
+    api = load_template()
+    api.FAST_PATH = True  # Time the queries, not re-validating the rows they return
+    tmpdir = None
+    path = args.db
+    if path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, 'users.sqlite')
+
+    try:
+        start = time.perf_counter()
+        build_table(api, path, args.rows, args.seed).close()
+        print(f"Table ready: {args.rows:,} rows with status and FTS5 indexes in {time.perf_counter() - start:.1f}s")
+        results = asyncio.run(run(api, path, args.page_size, args.repeat, args.seed))
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    print()
+    print(f"{'Filter':<28} {'matches':>9} {'naive page':>11} {'page':>9} {'naive +count':>13} "
+          f"{'page +count':>12} {'speedup':>8}")
+    for r in results:
+        print(f"{r['label']:<28} {r['matches']:>9,} {r['naive_ms']:>9.2f}ms {r['page_ms']:>7.2f}ms "
+              f"{r['naive_total_ms']:>11.2f}ms {r['total_ms']:>10.2f}ms {r['naive_total_ms'] / r['total_ms']:>7.0f}x")
+
+    print()
+    print(f"Indexed worst case: page {max(r['page_ms'] for r in results):.2f}ms, "
+          f"page + count {max(r['total_ms'] for r in results):.2f}ms")
+    wrong = [r["label"] for r in results if not r["same"]]
+    if wrong:
+        print(f"FAIL: indexed and naive plans disagree for: {', '.join(wrong)}")
+        return 1
+    print("Indexed plans return the same rows as the naive scans")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Overload test for rate limiting and load shedding in rest-api-template.py.
+
+Measures the app's capacity for a mixed workload, then offers --overload
+times that rate for --duration seconds from an open-loop generator (requests
+arrive on schedule whether or not earlier ones finished, like real users).
+One "heavy" API key sends half the traffic as 100-row list pages; twenty
+"normal" keys send the rest as single-user reads and 20-row pages. Latency
+is measured from each request's scheduled arrival, so queueing in the
+generator is not hidden (no coordinated omission).
+
+Three modes run against the same schedule:
+
+  unprotected   no rate limiter, no concurrency limit
+  shedding      adaptive concurrency limit only (503 + Retry-After)
+  full          per-key token bucket (429) + adaptive concurrency limit
+
+Without protection the queue (and p99) grows for as long as the overload
+lasts; with it, admitted requests' p99 stays bounded. Goodput (200s per
+second) must also stay above --min-goodput of the capacity measured just
+before each mode: a limiter that misreads the mixed workload as congestion
+sheds work the app could have served. The floor leaves room for the shed
+requests themselves, which still cost ~0.3ms each here (middleware plus the
+in-process client).
+
+Usage:
+    python bench-overload.py [--duration 8] [--overload 2.0] [--queue-target-ms 50] [--min-goodput 0.7]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+ASSETS_DIR = Path(__file__).resolve().parent
+NORMAL_KEYS = [f"normal-{i}" for i in range(20)]
+
+
+def load_template():
+    """Import rest-api-template.py (its name is not a valid module name) on a scratch database."""
+    os.environ.setdefault("API_DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "bench.sqlite3"))
+    spec = importlib.util.spec_from_file_location('rest_api_template', ASSETS_DIR / 'rest-api-template.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_request(rng: random.Random) -> tuple:
+    """(client class, API key, url) for one arrival."""
+    if rng.random() < 0.5:
+        return "heavy", "heavy", "/api/users?page=1&page_size=100"
+    key = rng.choice(NORMAL_KEYS)
+    if rng.random() < 0.5:
+        return "normal", key, f"/api/users/{rng.randrange(100):08d}"
+    return "normal", key, "/api/users?page=1&page_size=20"
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else float("nan")
+
+
+async def measure_capacity(http: httpx.AsyncClient, seconds: float, seed: int) -> float:
+    """Requests/s of the workload with a few closed-loop clients (no queueing beyond them)."""
+    rng = random.Random(seed)
+    done = 0
+    deadline = time.perf_counter() + seconds
+
+    async def client():
+        nonlocal done
+        while time.perf_counter() < deadline:
+            _, key, url = make_request(rng)
+            await http.get(url, headers={"X-API-Key": key})
+            done += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(4)))
+    return done / (time.perf_counter() - start)
+
+
+async def open_loop(http: httpx.AsyncClient, rate: float, duration: float, seed: int) -> list:
+    """Fire requests at a fixed arrival rate; returns (client class, status, latency from schedule)."""
+    rng = random.Random(seed)
+    results = []
+
+    async def one(scheduled: float, client: str, key: str, url: str):
+        response = await http.get(url, headers={"X-API-Key": key})
+        results.append((client, response.status_code, time.perf_counter() - scheduled))
+
+    tasks = []
+    start = time.perf_counter()
+    for i in range(int(rate * duration)):
+        scheduled = start + i / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(scheduled, *make_request(rng))))
+    await asyncio.gather(*tasks)
+    return results
+
+
+def summarize(mode: str, results: list, duration: float) -> dict:
+    normal_ok = [latency for client, code, latency in results if client == "normal" and code == 200]
+    normal_total = sum(1 for client, _, _ in results if client == "normal")
+    codes = Counter(code for _, code, _ in results)
+    return {
+        "mode": mode,
+        "ok_rps": codes[200] / duration,
+        "normal_served": len(normal_ok) / normal_total if normal_total else 0.0,
+        "normal_p50_ms": statistics.median(normal_ok) * 1000 if normal_ok else float("nan"),
+        "normal_p99_ms": percentile(normal_ok, 0.99) * 1000,
+        "all_ok_p99_ms": percentile([latency for _, code, latency in results if code == 200], 0.99) * 1000,
+        "heavy_429": sum(1 for client, code, _ in results if client == "heavy" and code == 429),
+        "shed_503": codes[503],
+        "other_errors": sum(count for code, count in codes.items() if code not in (200, 429, 503)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p99 latency under overload with and without load shedding")
+    parser.add_argument('--duration', type=float, default=8.0, help="Seconds of offered load per mode")
+    parser.add_argument('--overload', type=float, default=2.0, help="Offered load as a multiple of capacity")
+    parser.add_argument('--queue-target-ms', type=float, default=50.0)
+    parser.add_argument('--min-goodput', type=float, default=0.7,
+                        help="Protected modes must serve at least this fraction of capacity (default: 0.7)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("API_RATE_LIMIT_RPS", "0")
+    os.environ.setdefault("API_MAX_CONCURRENCY", "0")
+    api = load_template()
+    api.response_cache = api.ResponseCache(maxsize=0)  # Every request does real work
+
+    async def run_all():
+        summaries = []
+        transport = httpx.ASGITransport(app=api.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+                capacity = await measure_capacity(http, 3.0, args.seed)
+                rate = capacity * args.overload
+                # Per-key budget: normal keys (1/40 of arrivals at cost 1) stay well inside it;
+                # the heavy key (half of arrivals at cost 5) is far over it
+                per_key = capacity / 10
+                modes = {
+                    "unprotected": (None, None),
+                    "shedding": (None, True),
+                    "full": (api.RateLimiter(api.MemoryTokenBuckets(), per_key, per_key * 2), True),
+                }
+                for mode, (rate_limiter, shedding) in modes.items():
+                    # Re-measured next to each mode: on a shared machine capacity drifts
+                    # too much for one up-front number to judge goodput against
+                    api.rate_limiter = api.concurrency_limiter = None
+                    mode_capacity = await measure_capacity(http, 2.0, args.seed)
+                    api.rate_limiter = rate_limiter
+                    api.concurrency_limiter = api.AdaptiveConcurrencyLimiter(
+                        20, target_delay=args.queue_target_ms / 1000) if shedding else None
+                    results = await open_loop(http, rate, args.duration, args.seed)
+                    summaries.append(summarize(mode, results, args.duration))
+                    summaries[-1]["capacity"] = mode_capacity
+                    if shedding:
+                        summaries[-1]["final_limit"] = api.concurrency_limiter.limit
+                    await asyncio.sleep(1.0)  # Let stragglers and pool waiters drain between modes
+        finally:
+            await api.pool.close()
+        return capacity, rate, summaries
+
+    capacity, rate, summaries = asyncio.run(run_all())
+
+    print(f"Capacity ~{capacity:,.0f} req/s; offering {rate:,.0f} req/s ({args.overload:.1f}x) "
+          f"for {args.duration:.0f}s per mode, queue target {args.queue_target_ms:.0f}ms")
+    print(f"{'Mode':<12} {'ok req/s':>9} {'of cap':>7} {'normal ok':>10} {'normal p50':>11} {'normal p99':>11} "
+          f"{'all ok p99':>11} {'429 heavy':>10} {'503':>6} {'other':>6} {'limit':>6}")
+    for s in summaries:
+        limit = f"{s['final_limit']:.1f}" if "final_limit" in s else "-"
+        print(f"{s['mode']:<12} {s['ok_rps']:>9,.0f} {s['ok_rps'] / s['capacity']:>6.0%} {s['normal_served']:>9.0%} "
+              f"{s['normal_p50_ms']:>9,.0f}ms {s['normal_p99_ms']:>9,.0f}ms {s['all_ok_p99_ms']:>9,.0f}ms "
+              f"{s['heavy_429']:>10,} {s['shed_503']:>6,} {s['other_errors']:>6,} {limit:>6}")
+
+    unprotected, full = summaries[0], summaries[-1]
+    bounded = full["all_ok_p99_ms"] < unprotected["all_ok_p99_ms"] / 2
+    print("p99 bounded under overload" if bounded else "FAIL: protection did not bound p99")
+    starved = [s["mode"] for s in summaries[1:] if s["ok_rps"] < args.min_goodput * s["capacity"]]
+    if starved:
+        print(f"FAIL: goodput below {args.min_goodput:.0%} of capacity in: {', '.join(starved)}")
+    else:
+        print(f"Goodput at least {args.min_goodput:.0%} of capacity while shedding")
+    return 0 if bounded and not starved else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark offset vs. keyset pagination from rest-api-template.py.
+
+Builds a SQLite stand-in for the users table (1M rows by default, indexed on
+(created_at, id)) and times fetching one page at increasing depths with
+OFFSET_SQL and with KEYSET_SQL + a signed cursor, plus the COUNT(*) that
+offset pagination pays on every request. Keyset latency should stay flat
+while offset latency grows with depth.
+
+Usage:
+    python bench-pagination.py [--rows N] [--page-size 20] [--repeat 5] [--db users.sqlite]
+"""
+
+import argparse
+import importlib.util
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ASSETS_DIR = Path(__file__).resolve().parent
+
+
+def load_template():
+    """Import rest-api-template.py (its name is not a valid module name)."""
+    spec = importlib.util.spec_from_file_location('rest_api_template', ASSETS_DIR / 'rest-api-template.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def build_table(path: str, rows: int, index_sql: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    existing = conn.execute("SELECT name FROM sqlite_master WHERE name = 'users'").fetchone()
+    if existing and conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == rows:
+        return conn
+    conn.executescript("""
+        DROP TABLE IF EXISTS users;
+        CREATE TABLE users (
+            id TEXT PRIMARY KEY,
+            email TEXT NOT NULL,
+            name TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+    """)
+    epoch = datetime(2024, 1, 1)
+    # Two users per second so (created_at, id) ties are exercised
+    data = (
+        (f"{i:08d}", f"user{i}@example.com", f"User {i}", "active",
+         (epoch + timedelta(seconds=i // 2)).isoformat(), (epoch + timedelta(seconds=i // 2)).isoformat())
+        for i in range(rows)
+    )
+    with conn:
+        conn.executemany("INSERT INTO users VALUES (?, ?, ?, ?, ?, ?)", data)
+        conn.execute(index_sql)
+    conn.execute("ANALYZE")
+    return conn
+
+
+def timed_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offset vs. keyset pagination on a SQLite users table")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--db', help="Reuse (or create) this SQLite file instead of a temp file")
+    args = parser.parse_args()
+
+    api = load_template()
+    tmpdir = None
+    path = args.db
+    if path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, 'users.sqlite')
+
+    try:
+        start = time.perf_counter()
+        conn = build_table(path, args.rows, api.KEYSET_INDEX_SQL)
+        print(f"Table ready: {args.rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+        plan = conn.execute("EXPLAIN QUERY PLAN " + api.KEYSET_SQL, ("", "", 1)).fetchall()
+        print(f"Keyset plan: {' / '.join(row[-1] for row in plan)}")
+
+        count_ms = timed_ms(lambda: conn.execute("SELECT COUNT(*) FROM users").fetchone(), args.repeat)
+        depths = [d for d in (0, 1_000, 10_000, 100_000, 500_000, args.rows - args.page_size)
+                  if 0 <= d < args.rows]
+
+        print()
+        print(f"{'Depth':>10} {'offset':>10} {'offset+count':>13} {'keyset':>10} {'speedup':>8}")
+        worst_keyset = 0.0
+        for depth in depths:
+            offset_ms = timed_ms(
+                lambda: conn.execute(api.OFFSET_SQL, (args.page_size, depth)).fetchall(), args.repeat)
+            if depth:
+                user_id, created_at = conn.execute(
+                    "SELECT id, created_at FROM users ORDER BY created_at, id LIMIT 1 OFFSET ?",
+                    (depth - 1,)).fetchone()
+                cursor = api.encode_cursor(datetime.fromisoformat(created_at), user_id)
+
+                def keyset_page():
+                    after_created, after_id = api.decode_cursor(cursor)
+                    rows = conn.execute(api.KEYSET_SQL,
+                                        (after_created.isoformat(), after_id, args.page_size + 1)).fetchall()
+                    assert rows[0][0] == f"{depth:08d}"
+            else:
+                def keyset_page():
+                    conn.execute(api.FIRST_PAGE_SQL, (args.page_size + 1,)).fetchall()
+            keyset_ms = timed_ms(keyset_page, args.repeat)
+            worst_keyset = max(worst_keyset, keyset_ms)
+            print(f"{depth:>10,} {offset_ms:>8.2f}ms {offset_ms + count_ms:>11.2f}ms "
+                  f"{keyset_ms:>8.2f}ms {(offset_ms + count_ms) / keyset_ms:>7.0f}x")
+
+        print()
+        print(f"COUNT(*) alone: {count_ms:.2f}ms per request in offset mode")
+        print(f"Keyset worst case across depths: {worst_keyset:.2f}ms")
+        conn.close()
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
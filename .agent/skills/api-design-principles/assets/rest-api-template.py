@@ -1,21 +1,101 @@
 """
 Production-ready REST API template using FastAPI.
 Includes pagination, filtering, error handling, and best practices.
+
+Pagination: offset (?page=&page_size=) for small collections, keyset
+(?pagination=cursor, then ?cursor=<next_cursor>) for large ones. A keyset
+page costs the same at any depth because it seeks the (created_at, id)
+index instead of scanning and discarding OFFSET rows, and it skips
+COUNT(*) unless include_total=true.
+
+Filtering: ?status= seeks a (status, created_at, id) index and ?search=
+word-prefix matches name and email through an FTS5 index kept in sync by
+triggers, so neither degrades to a LIKE '%...%' scan of every user.
+
+Caching: GET responses carry an ETag (single users also Last-Modified, from
+updated_at) and answer conditional requests with 304; serialized responses are kept in a TTL/LRU
+cache that writes invalidate.
+
+Data access: an async repository over SQLite (aiosqlite) with a pooled,
+Depends-injected connection per request, batched IN (...) lookups and a
+per-request loader that coalesces N single-user lookups into one query.
+Pool metrics are exposed on /health.
+
+Bulk writes: POST/PATCH/DELETE /api/users/bulk take an NDJSON body (one
+object per line) and stream back one NDJSON result per line, writing in
+batched transactions with memory bounded by the batch size.
+
+Fast path (opt-in, API_FAST_PATH=1): rows read back from the database are
+trusted and skip re-validation, and hot endpoints return pre-encoded
+(orjson when installed) responses instead of going through response_model.
+
+Observability: per-route latency and response-size histograms plus
+in-flight counts on /metrics (Prometheus text format), a Server-Timing
+header on every response, and optional pyinstrument reports for slow
+requests (API_PROFILE_SLOW_MS).
+
+Overload protection: a per-client token bucket (429) and an adaptive
+concurrency limit that sheds requests queued longer than a target delay
+(503), both with Retry-After.
 """
 
-from fastapi import FastAPI, HTTPException, Query, Path, Depends, status
+import asyncio
+import base64
+import bisect
+import hashlib
+import hmac
+import ipaddress
+import json
+import math
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import FastAPI, HTTPException, Query, Path, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, EmailStr, ConfigDict
-from typing import Optional, List, Any
-from datetime import datetime
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from pydantic import BaseModel, Field, EmailStr, ConfigDict, ValidationError
+from typing import (Optional, List, Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, IO, Iterable,
+                    Iterator, Literal, Set, Tuple, Type, Union)
+from datetime import datetime, timedelta, timezone
 from enum import Enum
+from urllib.parse import parse_qs
+
+import aiosqlite
+
+try:
+    import orjson  # Optional: faster encoder for the fast path
+except ImportError:
+    orjson = None
+
+try:
+    from pyinstrument import Profiler  # Optional: slow-request profiling
+except ImportError:
+    Profiler = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await pool.open()
+    yield
+    await pool.close()
 
 app = FastAPI(
     title="API Template",
     version="1.0.0",
-    docs_url="/api/docs"
+    docs_url="/api/docs",
+    lifespan=lifespan
 )
 
 # Security Middleware
@@ -34,6 +114,416 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Rate limiting and load shedding
+# Two layers, both skipped for /health and /metrics so operators can still
+# see an overloaded service:
+#   1. A token bucket per client (API key if sent, else client address)
+#      refills at RATE_LIMIT_RPS up to RATE_LIMIT_BURST. Expensive requests
+#      cost more tokens (a 100-row page costs 5), so one client's burst of
+#      large pages is throttled with 429 before it slows everyone else.
+#   2. An adaptive concurrency limit in front of the app. Requests over the
+#      limit wait in a FIFO queue; any that would wait longer than
+#      QUEUE_TARGET_MS are shed with 503 (CoDel's idea: bound queueing delay,
+#      not queue length). The limit itself is AIMD on latency: it grows by
+#      ~1 per limit completions while latency stays within LATENCY_TOLERANCE
+#      of the recent minimum, and shrinks by 10% when it does not, so it
+#      settles near the concurrency the backend can serve without queueing
+#      internally (on the pool, the GIL, SQLite locks). The minimum is kept
+#      per request class (method, route template, token cost): a 100-row
+#      page is compared with other 100-row pages, not with single-row reads,
+#      or a mixed workload would look permanently congested.
+# Shed responses are cheap to produce, which is what keeps admitted
+# requests' p99 bounded while the service is overloaded.
+RATE_LIMIT_RPS = float(os.environ.get("API_RATE_LIMIT_RPS", "20"))  # 0 disables rate limiting
+RATE_LIMIT_BURST = float(os.environ.get("API_RATE_LIMIT_BURST", "40"))
+MAX_CONCURRENCY = int(os.environ.get("API_MAX_CONCURRENCY", "20"))  # Initial limit; 0 disables shedding
+QUEUE_TARGET_MS = float(os.environ.get("API_QUEUE_TARGET_MS", "50"))
+# Comma-separated proxy addresses or CIDRs, e.g. "10.0.0.0/8,127.0.0.1"; empty trusts no X-Forwarded-For
+TRUSTED_PROXIES = [ipaddress.ip_network(net.strip(), strict=False)
+                   for net in os.environ.get("API_TRUSTED_PROXIES", "").split(",") if net.strip()]
+LATENCY_TOLERANCE = 2.0
+UNLIMITED_PATHS = {"/health", "/metrics"}
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets.
+
+    The in-memory backend is per process; to share limits across workers or
+    hosts, implement take() on a shared store (e.g. the same arithmetic in a
+    Redis Lua script so the read-modify-write is atomic).
+    """
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: float, cost: float) -> Tuple[float, float]:
+        """Spend cost tokens from key's bucket: (seconds until allowed, 0 if allowed now; tokens left)."""
+
+class MemoryTokenBuckets(RateLimitBackend):
+    """Token buckets in an LRU dict; evicting a bucket only resets it to full."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self.buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, updated)
+
+    async def take(self, key: str, rate: float, burst: float, cost: float) -> Tuple[float, float]:
+        now = time.monotonic()
+        tokens, updated = self.buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / rate
+        self.buckets[key] = (tokens, now)
+        if len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+        return wait, tokens
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, rate: float, burst: float):
+        self.backend = backend
+        self.rate = rate
+        self.burst = burst
+        self.limited = 0
+
+    async def check(self, key: str, cost: float) -> Tuple[float, float]:
+        wait, remaining = await self.backend.take(key, self.rate, self.burst, cost)
+        self.limited += wait > 0
+        return wait, remaining
+
+    def headers(self, remaining: float) -> List[Tuple[bytes, bytes]]:
+        reset = time.time() + (self.burst - remaining) / self.rate
+        return [(b"x-ratelimit-limit", str(int(self.burst)).encode()),
+                (b"x-ratelimit-remaining", str(int(remaining)).encode()),
+                (b"x-ratelimit-reset", str(math.ceil(reset)).encode())]
+
+def is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in net for net in TRUSTED_PROXIES)
+
+def client_address(scope: Scope) -> str:
+    """The client's IP: the peer, or behind TRUSTED_PROXIES the last X-Forwarded-For hop they didn't add.
+
+    Hops are read right to left and only while the sender is a trusted proxy,
+    so a client can't pick its own rate-limit key by forging the header.
+    """
+    client = scope.get("client")
+    address = client[0] if client else "unknown"
+    if not TRUSTED_PROXIES:
+        return address
+    hops = [hop.strip() for hop in ",".join(Headers(scope=scope).getlist("x-forwarded-for")).split(",")]
+    while is_trusted_proxy(address) and hops:
+        hop = hops.pop()
+        if hop:
+            address = hop
+    return address
+
+def client_key(scope: Scope) -> str:
+    api_key = Headers(scope=scope).get("x-api-key")
+    if api_key:
+        return "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:16]  # Don't keep raw keys in memory
+    return "ip:" + client_address(scope)
+
+def request_cost(scope: Scope) -> float:
+    """Tokens a request spends: list pages cost one per 20 rows."""
+    if scope["method"] == "GET" and scope["path"] == "/api/users":
+        try:
+            page_size = int(parse_qs(scope["query_string"].decode()).get("page_size", ["20"])[0])
+        except ValueError:
+            return 1.0  # Rejected with 422 anyway
+        return max(1.0, min(page_size, 100) / 20)
+    return 1.0
+
+def request_class(scope: Scope) -> Hashable:
+    """Latency class for the concurrency limiter: (method, route template, token cost)."""
+    route = getattr(scope.get("route"), "path", "unmatched")  # Set by the router once the app ran
+    return scope["method"], route, math.ceil(request_cost(scope))
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit with a FIFO queue that sheds after target_delay."""
+
+    def __init__(self, initial: int = 20, min_limit: int = 2, max_limit: int = 500,
+                 target_delay: float = 0.05, tolerance: float = 2.0, max_queue: int = 1000):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_delay = target_delay
+        self.tolerance = tolerance
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.waiters: "deque[asyncio.Future[None]]" = deque()
+        # Request class -> [minimum of the previous window of samples, current window minimum, samples]
+        self.baselines: Dict[Hashable, List[float]] = {}
+        self.last_decrease = 0.0
+        self.shed = 0
+
+    async def acquire(self) -> bool:
+        """Take a slot, queueing for at most target_delay; False means shed the request."""
+        if self.in_flight < int(self.limit) and not self.waiters:
+            self.in_flight += 1
+            return True
+        if len(self.waiters) >= self.max_queue:
+            self.shed += 1
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.target_delay)
+            return True
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                self.release(None)  # Handed a slot just as we gave up
+            if isinstance(exc, asyncio.TimeoutError):
+                self.shed += 1
+                return False
+            raise
+
+    def release(self, latency: Optional[float], request_class: Hashable = None):
+        """Free a slot (latency is the admitted request's service time, None if it never ran)."""
+        if latency is not None:
+            self.adjust(latency, request_class)
+        self.in_flight -= 1
+        while self.waiters and self.in_flight < int(self.limit):
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1  # The slot moves straight to the oldest waiter
+                waiter.set_result(None)
+
+    def adjust(self, latency: float, request_class: Hashable = None):
+        window = self.baselines.get(request_class)
+        if window is None:
+            window = self.baselines[request_class] = [math.inf, math.inf, 0]
+        window[1] = min(window[1], latency)
+        window[2] += 1
+        if window[2] >= 200:  # Let the baseline rise again if the workload changed
+            window[:] = [window[1], math.inf, 0]
+        baseline = min(window[0], window[1])
+        if latency <= baseline * self.tolerance:
+            if self.in_flight * 2 >= self.limit:  # Only grow a limit that is actually being used
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        else:
+            now = time.monotonic()
+            if now - self.last_decrease >= latency:  # At most one decrease per latency interval
+                self.limit = max(self.min_limit, self.limit * 0.9)
+                self.last_decrease = now
+
+rate_limiter: Optional[RateLimiter] = (
+    RateLimiter(MemoryTokenBuckets(), RATE_LIMIT_RPS, RATE_LIMIT_BURST) if RATE_LIMIT_RPS > 0 else None
+)
+concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = (
+    AdaptiveConcurrencyLimiter(MAX_CONCURRENCY, target_delay=QUEUE_TARGET_MS / 1000, tolerance=LATENCY_TOLERANCE)
+    if MAX_CONCURRENCY > 0 else None
+)
+
+async def reject(scope: Scope, receive: Receive, send: Send, status_code: int, message: str, code: str,
+                 retry_after: float, headers: Optional[List[Tuple[bytes, bytes]]] = None):
+    response = JSONResponse(
+        status_code=status_code,
+        content=ErrorResponse(error="HTTPException", message=message, details=[
+            ErrorDetail(message=message, code=code)
+        ]).model_dump(),
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+    response.raw_headers.extend(headers or [])
+    await response(scope, receive, send)
+
+def with_headers(send: Send, headers: List[Tuple[bytes, bytes]]) -> Send:
+    async def send_with_headers(message: Message):
+        if message["type"] == "http.response.start":
+            message["headers"] = [*message.get("headers", []), *headers]
+        await send(message)
+    return send_with_headers
+
+class LoadSheddingMiddleware:
+    """Applies rate_limiter and concurrency_limiter (looked up per request, so None disables either)."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in UNLIMITED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        if rate_limiter is not None:
+            wait, remaining = await rate_limiter.check(client_key(scope), request_cost(scope))
+            limit_headers = rate_limiter.headers(remaining)
+            if wait > 0:
+                await reject(scope, receive, send, status.HTTP_429_TOO_MANY_REQUESTS, "Rate limit exceeded",
+                             "rate_limited", wait, limit_headers)
+                return
+
+            send = with_headers(send, limit_headers)
+        limiter = concurrency_limiter
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+        queued = time.perf_counter()
+        if not await limiter.acquire():
+            await reject(scope, receive, send, status.HTTP_503_SERVICE_UNAVAILABLE,
+                         "Server overloaded, retry shortly", "overloaded", 1)
+            return
+        admitted = time.perf_counter()
+        add_timing("queue", admitted - queued)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - admitted, request_class(scope))
+
+# Added before MetricsMiddleware, so it runs inside it and shed requests are still counted
+app.add_middleware(LoadSheddingMiddleware)
+
+# Observability
+# MetricsMiddleware is plain ASGI (BaseHTTPMiddleware would buffer the
+# streamed bulk responses). Series are keyed by route template, so
+# /api/users/{user_id} is one series rather than one per id; requests that
+# match no route share "unmatched". Server-Timing reports time to response
+# headers plus time spent waiting for a pooled connection and in queries,
+# which browser devtools show per request. With API_PROFILE_SLOW_MS set, a
+# sample of requests runs under pyinstrument and an HTML report is written
+# for each one slower than the threshold.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+PROFILE_SLOW_MS = float(os.environ.get("API_PROFILE_SLOW_MS", "0"))  # 0 disables profiling
+PROFILE_SAMPLE_RATE = float(os.environ.get("API_PROFILE_SAMPLE_RATE", "0.1"))
+PROFILE_DIR = os.environ.get("API_PROFILE_DIR", "profiles")
+
+if PROFILE_SLOW_MS > 0 and Profiler is None:
+    raise RuntimeError("API_PROFILE_SLOW_MS requires pyinstrument (pip install pyinstrument)")
+
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+def add_timing(name: str, seconds: float):
+    """Add to the current request's Server-Timing entry `name` (no-op outside a request)."""
+    timings = request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(name, time.perf_counter() - start)
+
+def label_set(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+
+class Histogram:
+    """Prometheus-style histogram with one series per label-value tuple."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.series: Dict[Tuple[str, ...], List[float]] = {}  # Per-bucket counts (last is +Inf), then sum
+
+    def observe(self, values: Tuple[str, ...], value: float):
+        series = self.series.get(values)
+        if series is None:
+            series = self.series[values] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, series in sorted(self.series.items()):
+            labels = label_set(self.labels, values)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+class RequestMetrics:
+    def __init__(self):
+        self.latency = Histogram("http_request_duration_seconds", "Request latency by route template.",
+                                 ("method", "route", "status"), LATENCY_BUCKETS)
+        self.response_size = Histogram("http_response_size_bytes", "Response body size by route template.",
+                                       ("method", "route"), SIZE_BUCKETS)
+        self.in_flight: Dict[str, int] = {}
+        self.profiles_written = 0
+
+    def render(self) -> List[str]:
+        lines = self.latency.render() + self.response_size.render()
+        lines += ["# HELP http_requests_in_flight Requests currently being served.",
+                  "# TYPE http_requests_in_flight gauge"]
+        lines += [f'http_requests_in_flight{{method="{method}"}} {count}'
+                  for method, count in sorted(self.in_flight.items())]
+        lines += ["# HELP http_slow_request_profiles_total pyinstrument reports written for slow requests.",
+                  "# TYPE http_slow_request_profiles_total counter",
+                  f"http_slow_request_profiles_total {self.profiles_written}"]
+        return lines
+
+request_metrics = RequestMetrics()
+
+def server_timing(timings: Dict[str, float], total: float) -> str:
+    entries = [f"app;dur={total * 1000:.1f}"]
+    entries += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    return ", ".join(entries)
+
+def write_profile(profiler: "Profiler", method: str, route: str, elapsed: float):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = "".join(c if c.isalnum() else "_" for c in route).strip("_") or "root"
+    path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%dT%H%M%S')}-{method}-{slug}-{elapsed * 1000:.0f}ms-{uuid.uuid4().hex[:6]}.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(profiler.output_html())
+    request_metrics.profiles_written += 1
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        in_flight = self.metrics.in_flight
+        in_flight[method] = in_flight.get(method, 0) + 1
+        timings: Dict[str, float] = {}
+        token = request_timings.set(timings)
+        profiler = None
+        if PROFILE_SLOW_MS > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+        start = time.perf_counter()
+        status_code = 500  # Reported if the app raises before sending a response
+        size = 0
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing",
+                                                     server_timing(timings, time.perf_counter() - start))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.metrics.latency.observe((method, route, str(status_code)), elapsed)
+            self.metrics.response_size.observe((method, route), size)
+            in_flight[method] -= 1
+            request_timings.reset(token)
+            if profiler is not None:
+                profiler.stop()
+                if elapsed * 1000 >= PROFILE_SLOW_MS:
+                    write_profile(profiler, method, route, elapsed)
+
+# Outermost of the app's middleware, so its timings include CORS and host checks
+app.add_middleware(MetricsMiddleware)
+
 # Models
 class UserStatus(str, Enum):
     ACTIVE = "active"
@@ -72,6 +562,163 @@ class PaginatedResponse(BaseModel):
     page_size: int
     pages: int
 
+class BatchUsers(BaseModel):
+    items: List[User]
+    missing: List[str]
+
+class CursorPage(BaseModel):
+    items: List[Any]
+    next_cursor: Optional[str] = None
+    has_more: bool
+    page_size: int
+    total: Optional[int] = None  # Only computed when include_total=true
+
+# Keyset pagination
+# Cursors are opaque to clients: base64url JSON of the last row's sort key,
+# HMAC-signed so a client cannot forge a position. Rotate the secret to
+# invalidate outstanding cursors.
+CURSOR_SECRET = os.environ.get("API_CURSOR_SECRET", "change-me-in-production").encode()
+
+# What a cursor page runs against a real table. The row-value comparison is
+# an index range seek on (created_at, id); fetching one extra row tells us
+# whether there is a next page without a COUNT(*).
+KEYSET_SQL = (
+    "SELECT id, email, name, status, created_at, updated_at FROM users "
+    "WHERE (created_at, id) > (?, ?) ORDER BY created_at, id LIMIT ?"
+)
+FIRST_PAGE_SQL = (
+    "SELECT id, email, name, status, created_at, updated_at FROM users "
+    "ORDER BY created_at, id LIMIT ?"
+)
+OFFSET_SQL = (
+    "SELECT id, email, name, status, created_at, updated_at FROM users "
+    "ORDER BY created_at, id LIMIT ? OFFSET ?"
+)
+KEYSET_INDEX_SQL = "CREATE INDEX IF NOT EXISTS users_created_at_id ON users (created_at, id)"
+
+def _sign(payload: bytes) -> str:
+    digest = hmac.new(CURSOR_SECRET, payload, hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+def encode_cursor(created_at: datetime, user_id: str) -> str:
+    """Opaque, signed cursor for the row after which the next page starts."""
+    payload = base64.urlsafe_b64encode(
+        json.dumps([created_at.isoformat(), user_id], separators=(",", ":")).encode()
+    ).rstrip(b"=")
+    return f"{payload.decode()}.{_sign(payload)}"
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Verify and unpack a cursor; tampered or malformed cursors are a 400."""
+    try:
+        payload, signature = cursor.encode().rsplit(b".", 1)
+        if not hmac.compare_digest(signature.decode(), _sign(payload)):
+            raise ValueError("bad signature")
+        created_at, user_id = json.loads(base64.urlsafe_b64decode(payload + b"=" * (-len(payload) % 4)))
+        return datetime.fromisoformat(created_at), str(user_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "Invalid pagination cursor", "details": [
+                {"field": "cursor", "message": "Cursor is malformed or was not issued by this API",
+                 "code": "invalid_cursor"}
+            ]}
+        )
+
+# Filtering
+# status is served by an index on (status, created_at, id), so a filtered page
+# is still an index range seek in list order. search matches users whose name
+# or email contains a word starting with each search word (AND), using an
+# FTS5 index over name and email that triggers keep in sync on insert,
+# update and delete. Matches come back from FTS5 in rowid order and have to
+# be sorted into list order, which is cheap for rare words and expensive for
+# common ones ("a" matches most users). So a search first counts its FTS5
+# matches up to SEARCH_DENSE_HITS; at the cap it takes another plan: walk the
+# list-order index (at most SEARCH_SCAN_BUDGET rows) testing each row with
+# search_match(), which finds a page of common words within a few hundred rows.
+STATUS_INDEX_SQL = "CREATE INDEX IF NOT EXISTS users_status_created_at_id ON users (status, created_at, id)"
+
+# External-content FTS5 table keyed by the users rowid. remove_diacritics 0
+# keeps its tokenizer in step with search_match(). users has no INTEGER
+# PRIMARY KEY, so VACUUM may renumber rowids: run SEARCH_REBUILD_SQL after it.
+SEARCH_INDEX_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+    name, email, content='users', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 0', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+    INSERT INTO users_fts (rowid, name, email) VALUES (new.rowid, new.name, new.email);
+END;
+CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+    INSERT INTO users_fts (users_fts, rowid, name, email) VALUES ('delete', old.rowid, old.name, old.email);
+END;
+CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF name, email ON users BEGIN
+    INSERT INTO users_fts (users_fts, rowid, name, email) VALUES ('delete', old.rowid, old.name, old.email);
+    INSERT INTO users_fts (rowid, name, email) VALUES (new.rowid, new.name, new.email);
+END;
+"""
+SEARCH_REBUILD_SQL = "INSERT INTO users_fts (users_fts) VALUES ('rebuild')"
+SEARCH_DENSE_HITS = 2_000
+SEARCH_SCAN_BUDGET = 20_000
+
+# Words as the unicode61 tokenizer sees them: runs of letters and digits
+WORD_RE = re.compile(r"[^\W_]+")
+
+def search_match(name: str, email: str, terms: str) -> bool:
+    """SQL function: every space-separated term prefixes a word of name or email."""
+    text = f"{name} {email}".lower()
+    terms = terms.split()
+    if not all(term in text for term in terms):  # Cheap rejection for most rows
+        return False
+    words = WORD_RE.findall(text)
+    return all(any(word.startswith(term) for word in words) for term in terms)
+
+@dataclass(frozen=True)
+class UserFilter:
+    """Server-side list filters; terms are the lowercased words of ?search=."""
+    status: Optional[UserStatus] = None
+    terms: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_query(cls, user_status: Optional[UserStatus], search: Optional[str]) -> "UserFilter":
+        terms = tuple(WORD_RE.findall(search.lower())) if search else ()
+        if search and search.strip() and not terms:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={"message": "Invalid search", "details": [
+                    {"field": "search", "message": "Search must contain at least one letter or digit",
+                     "code": "invalid_search"}
+                ]}
+            )
+        return cls(user_status, terms)
+
+    def __bool__(self) -> bool:
+        return self.status is not None or bool(self.terms)
+
+    def key(self) -> str:
+        return f"{self.status.value if self.status else ''}:{' '.join(self.terms)}"
+
+    def match_query(self) -> str:
+        """FTS5 query: each term as a quoted prefix, implicitly ANDed."""
+        return " ".join(f'"{term}"*' for term in self.terms)
+
+    def conditions(self, after: Optional[Tuple[datetime, str]] = None,
+                   use_search_index: bool = True) -> Tuple[List[str], List[Any]]:
+        """WHERE clauses and parameters; the search clause is left out unless use_search_index."""
+        clauses, params = [], []
+        if self.status is not None:
+            clauses.append("status = ?")
+            params.append(self.status.value)
+        if after is not None:
+            clauses.append("(created_at, id) > (?, ?)")
+            params += [after[0].isoformat(), after[1]]
+        if self.terms and use_search_index:
+            clauses.append("rowid IN (SELECT rowid FROM users_fts WHERE users_fts MATCH ?)")
+            params.append(self.match_query())
+        return clauses, params
+
+def where_sql(clauses: List[str]) -> str:
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
 # Error handling
 class ErrorDetail(BaseModel):
     field: Optional[str] = None
@@ -94,87 +741,894 @@ async def http_exception_handler(request, exc):
         ).model_dump()
     )
 
+# Fast path
+# Two costs dominate hot endpoints: re-validating rows we wrote ourselves
+# (EmailStr validation is ~0.1ms per user, so 100 rows cost more than the
+# query) and FastAPI validating the returned object against response_model
+# before encoding it. With FAST_PATH on, rows are built with
+# model_construct and responses are encoded once by dumps() and returned as
+# FastJSONResponse, which FastAPI sends as-is. Request bodies are always
+# validated. Off by default so the template shows the checked path first.
+FAST_PATH = os.environ.get("API_FAST_PATH", "0") == "1"
+
+def json_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.__dict__  # Field values only; nested models come back through here
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=json_default)
+    return json.dumps(content, default=json_default, separators=(",", ":")).encode()
+
+class FastJSONResponse(JSONResponse):
+    """ORJSONResponse-style response that encodes with dumps() and skips validation."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def respond(model: BaseModel, status_code: int = status.HTTP_200_OK) -> Union[BaseModel, Response]:
+    """Return model for FastAPI to validate and encode, or encode it directly on the fast path."""
+    return FastJSONResponse(model, status_code=status_code) if FAST_PATH else model
+
+# Response caching
+# GET responses are cached as serialized JSON together with their validators,
+# so a hit skips both the model rebuild and JSON encoding. ETag and
+# Last-Modified derive from updated_at; clients that send If-None-Match /
+# If-Modified-Since get a bodyless 304. List pages only get an ETag over
+# their rows: deleting or inserting a row changes the page without raising
+# the newest updated_at on it, so a Last-Modified would answer 304 wrongly. Writes invalidate the user's entry
+# and bump the generation, which orphans every cached list page at once
+# (they age out of the LRU) and stops a build that read the rows before the
+# write from caching them after it. The TTL bounds staleness from writers in
+# other processes.
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]  # None for list pages
+    expires_at: float
+
+class ResponseCache:
+    """In-process TTL + LRU cache of serialized GET responses."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.generation = 0  # Bumped by every write
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None or entry.expires_at < time.monotonic():
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: str, body: bytes, etag: str, last_modified: Optional[datetime],
+            generation: int) -> CachedResponse:
+        """Cache a response built at generation; if a write happened since, it is returned but not stored."""
+        entry = CachedResponse(body, etag, last_modified, time.monotonic() + self.ttl)
+        if self.maxsize > 0 and generation == self.generation:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return entry
+
+    def list_key(self, params: str) -> str:
+        return f"users:list:{self.generation}:{params}"
+
+    def invalidate_user(self, user_id: str):
+        """Drop one user's entry and every cached list page."""
+        self.invalidate_users((user_id,))
+
+    def invalidate_users(self, user_ids: Iterable[str]):
+        """Drop several users' entries; list pages are invalidated once."""
+        for user_id in user_ids:
+            self.entries.pop(f"users:{user_id}", None)
+        self.generation += 1
+
+response_cache = ResponseCache(
+    maxsize=int(os.environ.get("API_RESPONSE_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("API_RESPONSE_CACHE_TTL", "30"))
+)
+
+def make_etag(*parts: Any) -> str:
+    return '"' + hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:20] + '"'
+
+def not_modified(request: Request, entry: CachedResponse) -> bool:
+    """RFC 9110 evaluation order: If-None-Match wins over If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or entry.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and entry.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return entry.last_modified.replace(microsecond=0) <= since.replace(tzinfo=None)
+    return False
+
+async def cached_json(request: Request, key: str,
+                      build: Callable[[], Awaitable[Tuple[BaseModel, str, Optional[datetime]]]]) -> Response:
+    """Serve key from the cache (building it on a miss) with conditional GET support.
+
+    build returns (model, etag, last_modified); last_modified is naive UTC, or None to send no
+    Last-Modified.
+    """
+    entry = response_cache.get(key)
+    if entry is None:
+        generation = response_cache.generation  # A write committing during build() makes its result stale
+        model, etag, last_modified = await build()
+        body = dumps(model) if FAST_PATH else model.model_dump_json().encode()
+        entry = response_cache.set(key, body, etag, last_modified, generation)
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": "private, no-cache",  # Always revalidate; a 304 is cheap
+    }
+    if entry.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(entry.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    if not_modified(request, entry):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+def page_etag(users: List[User], *params: Any) -> str:
+    """ETag of a list page: its query plus each row's (id, updated_at)."""
+    return make_etag(*params, *(f"{u.id}@{u.updated_at.isoformat()}" for u in users))
+
+# Database
+# Users live in SQLite (aiosqlite) behind a small async connection pool.
+# Endpoints get a UserRepository per request through Depends, so a request
+# holds one pooled connection for its duration and returns it afterwards.
+DATABASE_PATH = os.environ.get("API_DATABASE_PATH", "users.sqlite3")
+POOL_SIZE = int(os.environ.get("API_DB_POOL_SIZE", "5"))
+POOL_TIMEOUT = float(os.environ.get("API_DB_POOL_TIMEOUT", "5"))
+MAX_BATCH = 500  # Stays under SQLite's bound-parameter limit
+
+USER_COLUMNS = "id, email, name, status, created_at, updated_at"
+SCHEMA_SQL = f"""
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+{KEYSET_INDEX_SQL};
+{STATUS_INDEX_SQL};
+{SEARCH_INDEX_SQL}
+"""
+
+# Seed data for the demo database: user i was created i minutes after MOCK_EPOCH
+MOCK_TOTAL = 100
+MOCK_EPOCH = datetime(2024, 1, 1)
+
+def mock_user(i: int) -> User:
+    created = MOCK_EPOCH + timedelta(minutes=i)
+    return User(
+        id=f"{i:08d}",
+        email=f"user{i}@example.com",
+        name=f"User {i}",
+        status=UserStatus.ACTIVE,
+        created_at=created,
+        updated_at=created
+    )
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class PoolTimeout(Exception):
+    pass
+
+class ConnectionPool:
+    """Fixed-size pool of aiosqlite connections with checkout metrics.
+
+    Connections are opened lazily on first use (so the app also works under
+    test transports that skip lifespan events) and run `init` once.
+    """
+
+    def __init__(self, path: str, size: int = 5, timeout: float = 5.0,
+                 init: Optional[Callable[[aiosqlite.Connection], Awaitable[None]]] = None):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self.init = init
+        self.idle: "deque[aiosqlite.Connection]" = deque()
+        # FIFO of checkouts waiting for a connection; release hands off directly
+        # to the oldest so new arrivals cannot starve them
+        self.waiters: "deque[asyncio.Future[aiosqlite.Connection]]" = deque()
+        self.connections: List[aiosqlite.Connection] = []
+        self.open_lock = asyncio.Lock()
+        self.checked_out = 0
+        self.acquisitions = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    async def open(self):
+        async with self.open_lock:
+            if self.connections:
+                return
+            for _ in range(self.size):
+                conn = await aiosqlite.connect(self.path, timeout=self.timeout)
+                await conn.execute("PRAGMA journal_mode=WAL")
+                await conn.execute("PRAGMA synchronous=NORMAL")
+                await conn.execute("PRAGMA foreign_keys=ON")
+                await conn.create_function("search_match", 3, search_match, deterministic=True)
+                if self.init is not None and not self.connections:
+                    await self.init(conn)
+                self.connections.append(conn)
+                self.idle.append(conn)
+
+    async def close(self):
+        for conn in self.connections:
+            await conn.close()
+        self.connections = []
+        self.idle.clear()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aiosqlite.Connection]:
+        if not self.connections:
+            await self.open()
+        start = time.perf_counter()
+        if self.idle:
+            conn = self.idle.popleft()
+        else:
+            self.waits += 1
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters.append(waiter)
+            try:
+                conn = await asyncio.wait_for(waiter, self.timeout)
+            except BaseException as exc:
+                if waiter.done() and not waiter.cancelled():
+                    self.release(waiter.result())  # Handed over just as we gave up
+                if isinstance(exc, asyncio.TimeoutError):
+                    self.timeouts += 1
+                    raise PoolTimeout(f"No database connection free within {self.timeout}s")
+                raise
+        waited = time.perf_counter() - start
+        add_timing("pool", waited)
+        self.acquisitions += 1
+        self.wait_time_total += waited
+        self.wait_time_max = max(self.wait_time_max, waited)
+        self.checked_out += 1
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                await conn.rollback()
+            self.checked_out -= 1
+            self.release(conn)
+
+    def release(self, conn: aiosqlite.Connection):
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(conn)
+                return
+        self.idle.append(conn)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "checked_out": self.checked_out,
+            "idle": len(self.idle),
+            "waiting": len(self.waiters),
+            "acquisitions": self.acquisitions,
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(1000 * self.wait_time_total / self.acquisitions, 3) if self.acquisitions else 0.0,
+            "wait_ms_max": round(1000 * self.wait_time_max, 3),
+        }
+
+async def init_database(conn: aiosqlite.Connection):
+    async with conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'users_fts'") as cur:
+        has_search_index = await cur.fetchone() is not None
+    await conn.executescript(SCHEMA_SQL)
+    async with conn.execute("SELECT COUNT(*) FROM users") as cur:
+        empty = (await cur.fetchone())[0] == 0
+    if not has_search_index and not empty:
+        await conn.execute(SEARCH_REBUILD_SQL)  # Index users that predate the search index
+    if empty and os.environ.get("API_SEED_MOCK_USERS", "1") == "1":
+        await conn.executemany(
+            f"INSERT INTO users ({USER_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+            [user_row(mock_user(i)) for i in range(MOCK_TOTAL)]
+        )
+    await conn.commit()
+
+pool = ConnectionPool(DATABASE_PATH, size=POOL_SIZE, timeout=POOL_TIMEOUT, init=init_database)
+
+def user_row(user: User) -> tuple:
+    return (user.id, user.email, user.name, user.status.value,
+            user.created_at.isoformat(), user.updated_at.isoformat())
+
+def row_to_user(row: tuple) -> User:
+    if FAST_PATH:
+        return User.model_construct(
+            id=row[0], email=row[1], name=row[2], status=UserStatus(row[3]),
+            created_at=datetime.fromisoformat(row[4]), updated_at=datetime.fromisoformat(row[5])
+        )
+    return User(
+        id=row[0], email=row[1], name=row[2], status=row[3],
+        created_at=datetime.fromisoformat(row[4]), updated_at=datetime.fromisoformat(row[5])
+    )
+
+class UserRepository:
+    """Data access for users; one instance per request, bound to a pooled connection."""
+
+    def __init__(self, conn: aiosqlite.Connection):
+        self.conn = conn
+
+    async def query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with timed("db"):
+            async with self.conn.execute(sql, params) as cur:
+                return await cur.fetchall()
+
+    async def execute(self, sql: str, params: tuple = ()) -> int:
+        """Run a statement and return its rowcount."""
+        with timed("db"):
+            async with self.conn.execute(sql, params) as cur:
+                return cur.rowcount
+
+    async def commit(self):
+        with timed("db"):
+            await self.conn.commit()
+
+    async def fetch_all(self, sql: str, params: tuple = ()) -> List[User]:
+        return [row_to_user(row) for row in await self.query(sql, params)]
+
+    async def get(self, user_id: str) -> Optional[User]:
+        users = await self.fetch_all(f"SELECT {USER_COLUMNS} FROM users WHERE id = ?", (user_id,))
+        return users[0] if users else None
+
+    async def get_many(self, user_ids: List[str]) -> Dict[str, User]:
+        """Batched lookup: one IN (...) query per MAX_BATCH ids."""
+        found = {}
+        unique = list(dict.fromkeys(user_ids))
+        for i in range(0, len(unique), MAX_BATCH):
+            chunk = unique[i:i + MAX_BATCH]
+            sql = f"SELECT {USER_COLUMNS} FROM users WHERE id IN ({', '.join('?' * len(chunk))})"
+            for user in await self.fetch_all(sql, tuple(chunk)):
+                found[user.id] = user
+        return found
+
+    async def count(self, filters: UserFilter = UserFilter()) -> int:
+        if filters.terms and filters.status is None:
+            # Answered from the search index alone, without visiting each match in users
+            sql = "SELECT COUNT(*) FROM users_fts WHERE users_fts MATCH ?"
+            return (await self.query(sql, (filters.match_query(),)))[0][0]
+        clauses, params = filters.conditions()
+        return (await self.query(f"SELECT COUNT(*) FROM users {where_sql(clauses)}", tuple(params)))[0][0]
+
+    async def list_offset(self, limit: int, offset: int, filters: UserFilter = UserFilter()) -> List[User]:
+        if not filters:
+            return await self.fetch_all(OFFSET_SQL, (limit, offset))
+        return await self.list_filtered(filters, None, limit, offset)
+
+    async def list_after(self, after: Optional[Tuple[datetime, str]], limit: int,
+                         filters: UserFilter = UserFilter()) -> List[User]:
+        if filters:
+            return await self.list_filtered(filters, after, limit)
+        if after is None:
+            return await self.fetch_all(FIRST_PAGE_SQL, (limit,))
+        return await self.fetch_all(KEYSET_SQL, (after[0].isoformat(), after[1], limit))
+
+    async def search_hits(self, filters: UserFilter, cap: int) -> int:
+        """FTS5 matches for the search terms, counting no further than cap."""
+        sql = "SELECT COUNT(*) FROM (SELECT rowid FROM users_fts WHERE users_fts MATCH ? LIMIT ?)"
+        return (await self.query(sql, (filters.match_query(), cap)))[0][0]
+
+    async def list_filtered(self, filters: UserFilter, after: Optional[Tuple[datetime, str]],
+                            limit: int, offset: int = 0) -> List[User]:
+        """Filtered rows in list order; see Filtering for how search picks its plan."""
+        order = "ORDER BY created_at, id LIMIT ? OFFSET ?"
+        if filters.terms and await self.search_hits(filters, SEARCH_DENSE_HITS) >= SEARCH_DENSE_HITS:
+            # Bounded walk in list order: the first matches found are the page.
+            # The bound is an index-only seek, so the walk stops as soon as the page fills.
+            clauses, params = filters.conditions(after, use_search_index=False)
+            bound = await self.query(
+                f"SELECT created_at, id FROM users {where_sql(clauses)} ORDER BY created_at, id LIMIT 1 OFFSET ?",
+                (*params, SEARCH_SCAN_BUDGET)
+            )
+            if bound:
+                clauses.append("(created_at, id) <= (?, ?)")
+                params += bound[0]
+            clauses.append("search_match(name, email, ?)")
+            users = await self.fetch_all(f"SELECT {USER_COLUMNS} FROM users {where_sql(clauses)} {order}",
+                                         (*params, " ".join(filters.terms), limit, offset))
+            if len(users) == limit or not bound:
+                return users
+        clauses, params = filters.conditions(after)
+        return await self.fetch_all(f"SELECT {USER_COLUMNS} FROM users {where_sql(clauses)} {order}",
+                                    (*params, limit, offset))
+
+    async def create(self, user: User) -> User:
+        await self.execute(f"INSERT INTO users ({USER_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)", user_row(user))
+        await self.commit()
+        return user
+
+    async def create_many(self, users: List[User]) -> Set[str]:
+        """Insert users in one transaction; returns the ids inserted (the rest hit a unique constraint)."""
+        inserted = set()
+        per_statement = MAX_BATCH // len(USER_COLUMNS.split(","))
+        for i in range(0, len(users), per_statement):
+            chunk = users[i:i + per_statement]
+            sql = (f"INSERT INTO users ({USER_COLUMNS}) VALUES "
+                   f"{', '.join(['(?, ?, ?, ?, ?, ?)'] * len(chunk))} ON CONFLICT DO NOTHING RETURNING id")
+            rows = await self.query(sql, tuple(value for user in chunk for value in user_row(user)))
+            inserted.update(row[0] for row in rows)
+        await self.commit()
+        return inserted
+
+    async def update(self, user_id: str, fields: Dict[str, Any], commit: bool = True) -> Optional[User]:
+        fields = {k: v.value if isinstance(v, Enum) else v for k, v in fields.items()}
+        fields["updated_at"] = utcnow().isoformat()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        users = await self.fetch_all(
+            f"UPDATE users SET {assignments} WHERE id = ? RETURNING {USER_COLUMNS}",
+            (*fields.values(), user_id)
+        )
+        if commit:
+            await self.commit()
+        return users[0] if users else None
+
+    async def delete(self, user_id: str) -> bool:
+        deleted = await self.execute("DELETE FROM users WHERE id = ?", (user_id,))
+        await self.commit()
+        return deleted > 0
+
+    async def delete_many(self, user_ids: List[str]) -> Set[str]:
+        """Delete in one transaction; returns the ids that existed."""
+        deleted = set()
+        unique = list(dict.fromkeys(user_ids))
+        for i in range(0, len(unique), MAX_BATCH):
+            chunk = unique[i:i + MAX_BATCH]
+            sql = f"DELETE FROM users WHERE id IN ({', '.join('?' * len(chunk))}) RETURNING id"
+            deleted.update(row[0] for row in await self.query(sql, tuple(chunk)))
+        await self.commit()
+        return deleted
+
+class UserLoader:
+    """Per-request loader that makes N lookups cost one query (N+1-safe).
+
+    load() calls issued in the same event-loop tick (e.g. from asyncio.gather
+    while resolving related records) are coalesced into a single
+    get_many(); results are memoized for the rest of the request.
+    """
+
+    def __init__(self, repo: UserRepository):
+        self.repo = repo
+        self.futures: Dict[str, "asyncio.Future[Optional[User]]"] = {}
+        self.pending: List[str] = []
+        self.batches = 0
+
+    def load(self, user_id: str) -> "asyncio.Future[Optional[User]]":
+        if user_id not in self.futures:
+            loop = asyncio.get_running_loop()
+            self.futures[user_id] = loop.create_future()
+            self.pending.append(user_id)
+            if len(self.pending) == 1:
+                # Dispatch after every load() already scheduled in this tick has queued its id
+                loop.call_soon(self.schedule_dispatch)
+        return self.futures[user_id]
+
+    def schedule_dispatch(self):
+        self.dispatch_task = asyncio.get_running_loop().create_task(self.dispatch())
+
+    async def load_many(self, user_ids: List[str]) -> List[Optional[User]]:
+        return list(await asyncio.gather(*(self.load(user_id) for user_id in user_ids)))
+
+    async def dispatch(self):
+        keys, self.pending = self.pending, []
+        self.batches += 1
+        try:
+            found = await self.repo.get_many(keys)
+        except Exception as exc:
+            for key in keys:
+                self.futures.pop(key).set_exception(exc)
+            return
+        for key in keys:
+            self.futures[key].set_result(found.get(key))
+
+async def get_repository() -> AsyncIterator[UserRepository]:
+    try:
+        async with pool.acquire() as conn:
+            yield UserRepository(conn)
+    except PoolTimeout as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"message": str(exc), "details": [
+                {"field": None, "message": "Database pool exhausted", "code": "pool_timeout"}
+            ]}
+        )
+
+async def get_loader(repo: UserRepository = Depends(get_repository)) -> UserLoader:
+    return UserLoader(repo)
+
+def user_not_found(user_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail={"message": "User not found", "details": [
+            {"field": "user_id", "message": f"No user with id {user_id}", "code": "not_found"}
+        ]}
+    )
+
+def email_taken(email: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={"message": "Email already registered", "details": [
+            {"field": "email", "message": f"{email} is already in use", "code": "duplicate"}
+        ]}
+    )
+
+# Bulk operations
+# Bulk endpoints read NDJSON (one JSON object per line) and answer with one
+# NDJSON result per input line, in input order, then a summary line. The body
+# is spooled as it arrives (in memory up to NDJSON_SPOOL_SIZE, then to a temp
+# file) and is only then validated and written, BULK_BATCH_SIZE lines per
+# transaction, so memory is bounded by the batch, not the payload. Spooling
+# first also keeps clients that read the response only after sending the
+# whole body from deadlocking against a server that is already answering.
+# Bodies over MAX_BULK_BODY get a 413 so one request cannot fill the disk,
+# and each batch checks a pooled connection out only while it is written:
+# a client that reads its results slowly holds back the stream, not the pool.
+BULK_BATCH_SIZE = 500
+MAX_NDJSON_LINE = 64 * 1024
+NDJSON_SPOOL_SIZE = 1024 * 1024
+MAX_BULK_BODY = int(os.environ.get("API_MAX_BULK_BODY", str(64 * 1024 * 1024)))  # Bytes
+
+class BulkUserUpdate(UserUpdate):
+    id: str
+
+class BulkUserDelete(BaseModel):
+    id: str
+
+class BulkRowResult(BaseModel):
+    line: int
+    status: Literal["created", "updated", "deleted", "error"]
+    id: Optional[str] = None
+    error: Optional[ErrorDetail] = None
+
+def bulk_error(line: int, code: str, message: str, field: Optional[str] = None,
+               user_id: Optional[str] = None) -> BulkRowResult:
+    return BulkRowResult(line=line, status="error", id=user_id,
+                         error=ErrorDetail(field=field, message=message, code=code))
+
+def body_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail={"message": "Request body too large", "details": [
+            {"field": None, "message": f"Bulk bodies are limited to {MAX_BULK_BODY} bytes; split the upload",
+             "code": "body_too_large"}
+        ]}
+    )
+
+async def spool_body(request: Request) -> IO[bytes]:
+    try:
+        declared = int(request.headers.get("content-length", "0"))
+    except ValueError:
+        declared = 0
+    if declared > MAX_BULK_BODY:
+        raise body_too_large()  # Before reading any of it
+    spool = tempfile.SpooledTemporaryFile(max_size=NDJSON_SPOOL_SIZE)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_BULK_BODY:  # Chunked bodies declare no length
+            spool.close()
+            raise body_too_large()
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+def ndjson_lines(spool: IO[bytes]) -> Iterator[Tuple[int, Optional[bytes]]]:
+    """(line number, raw line) for each non-blank line; None for lines over MAX_NDJSON_LINE."""
+    number = 0
+    while True:
+        line = spool.readline(MAX_NDJSON_LINE + 1)
+        if not line:
+            return
+        number += 1
+        if len(line) > MAX_NDJSON_LINE and not line.endswith(b"\n"):
+            while line and not line.endswith(b"\n"):  # Skip the rest without buffering it
+                line = spool.readline(MAX_NDJSON_LINE)
+            yield number, None
+        elif line.strip():
+            yield number, line
+
+BulkApply = Callable[[UserRepository, List[Tuple[int, Any]]], Awaitable[List[BulkRowResult]]]
+
+async def run_bulk(spool: IO[bytes], model: Type[BaseModel], apply: BulkApply) -> AsyncIterator[bytes]:
+    """Validate each spooled line with model, apply() valid rows in batches, yield NDJSON results."""
+    counts = {"lines": 0, "created": 0, "updated": 0, "deleted": 0, "error": 0}
+    window: List[Union[BulkRowResult, Tuple[int, Any]]] = []  # Results (and pending rows) in line order
+
+    async def flush() -> bytes:
+        rows = [entry for entry in window if isinstance(entry, tuple)]
+        applied = iter([])
+        if rows:
+            async with pool.acquire() as conn:  # Released before the batch is yielded
+                applied = iter(await apply(UserRepository(conn), rows))
+        results = [entry if isinstance(entry, BulkRowResult) else next(applied) for entry in window]
+        window.clear()
+        changed = [result.id for result in results if result.status != "error"]
+        if changed:
+            response_cache.invalidate_users(changed)
+        for result in results:
+            counts[result.status] += 1
+        return b"".join(result.model_dump_json(exclude_none=True).encode() + b"\n" for result in results)
+
+    try:
+        for number, line in ndjson_lines(spool):
+            counts["lines"] += 1
+            if line is None:
+                window.append(bulk_error(number, "line_too_long", f"Line exceeds {MAX_NDJSON_LINE} bytes"))
+            else:
+                try:
+                    window.append((number, model.model_validate_json(line)))
+                except ValidationError as exc:
+                    first = exc.errors()[0]
+                    window.append(bulk_error(number, first["type"], first["msg"],
+                                             field=".".join(map(str, first["loc"])) or None))
+            if len(window) >= BULK_BATCH_SIZE:
+                yield await flush()
+        if window:
+            yield await flush()
+        summary: Dict[str, Any] = {"summary": counts}
+    except (PoolTimeout, sqlite3.Error) as exc:
+        # Batches already reported were committed; nothing after them was
+        summary = {"summary": counts, "error": {"message": str(exc), "code": "aborted"}}
+    finally:
+        spool.close()
+    yield json.dumps(summary).encode() + b"\n"
+
+async def bulk_response(request: Request, model: Type[BaseModel], apply: BulkApply) -> StreamingResponse:
+    spool = await spool_body(request)
+    return StreamingResponse(run_bulk(spool, model, apply), media_type="application/x-ndjson")
+
+async def apply_creates(repo: UserRepository, rows: List[Tuple[int, UserCreate]]) -> List[BulkRowResult]:
+    now = utcnow()
+    # Rows were validated as UserCreate; model_construct skips re-validating every email
+    users = [User.model_construct(id=uuid.uuid4().hex, email=row.email, name=row.name, status=row.status,
+                                  created_at=now, updated_at=now) for _, row in rows]
+    inserted = await repo.create_many(users)
+    return [
+        BulkRowResult(line=number, status="created", id=user.id) if user.id in inserted
+        else bulk_error(number, "duplicate", f"{user.email} is already in use", field="email")
+        for (number, _), user in zip(rows, users)
+    ]
+
+async def apply_updates(repo: UserRepository, rows: List[Tuple[int, BulkUserUpdate]]) -> List[BulkRowResult]:
+    results = []
+    for number, row in rows:
+        fields = row.model_dump(exclude_unset=True, exclude={"id"})
+        try:
+            updated = await repo.update(row.id, fields, commit=False) if fields else await repo.get(row.id)
+        except sqlite3.IntegrityError:
+            results.append(bulk_error(number, "duplicate", f"{fields.get('email')} is already in use",
+                                      field="email", user_id=row.id))
+            continue
+        if updated is None:
+            results.append(bulk_error(number, "not_found", f"No user with id {row.id}", user_id=row.id))
+        else:
+            results.append(BulkRowResult(line=number, status="updated", id=row.id))
+    await repo.commit()
+    return results
+
+async def apply_deletes(repo: UserRepository, rows: List[Tuple[int, BulkUserDelete]]) -> List[BulkRowResult]:
+    deleted = await repo.delete_many([row.id for _, row in rows])
+    results = []
+    for number, row in rows:
+        if row.id in deleted:
+            deleted.discard(row.id)  # A repeated id is not found the second time
+            results.append(BulkRowResult(line=number, status="deleted", id=row.id))
+        else:
+            results.append(bulk_error(number, "not_found", f"No user with id {row.id}", user_id=row.id))
+    return results
+
 # Endpoints
-@app.get("/api/users", response_model=PaginatedResponse, tags=["Users"])
+@app.get("/health", tags=["Health"])
+async def health():
+    """Liveness plus database pool and response cache metrics."""
+    try:
+        async with pool.acquire() as conn:
+            await conn.execute("SELECT 1")
+        database = "ok"
+    except (PoolTimeout, aiosqlite.Error) as exc:
+        database = f"error: {exc}"
+    return {
+        "status": "ok" if database == "ok" else "degraded",
+        "database": database,
+        "pool": pool.metrics(),
+        "response_cache": {
+            "entries": len(response_cache.entries),
+            "hits": response_cache.hits,
+            "misses": response_cache.misses,
+        },
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: request metrics plus pool and response cache state."""
+    lines = request_metrics.render()
+    pool_stats = pool.metrics()
+    for name, kind, help in (
+        ("checked_out", "gauge", "Connections in use."),
+        ("waiting", "gauge", "Requests waiting for a connection."),
+        ("acquisitions", "counter", "Connections handed out."),
+        ("waits", "counter", "Checkouts that had to wait."),
+        ("timeouts", "counter", "Checkouts that gave up (503)."),
+    ):
+        metric = f"db_pool_{name}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {metric} {help}", f"# TYPE {metric} {kind}", f"{metric} {pool_stats[name]}"]
+    if rate_limiter is not None:
+        lines += ["# HELP rate_limited_requests_total Requests rejected with 429.",
+                  "# TYPE rate_limited_requests_total counter",
+                  f"rate_limited_requests_total {rate_limiter.limited}"]
+    if concurrency_limiter is not None:
+        lines += ["# HELP shed_requests_total Requests rejected with 503 after queueing too long.",
+                  "# TYPE shed_requests_total counter",
+                  f"shed_requests_total {concurrency_limiter.shed}",
+                  "# HELP concurrency_limit Current adaptive concurrency limit.",
+                  "# TYPE concurrency_limit gauge",
+                  f"concurrency_limit {concurrency_limiter.limit:.2f}",
+                  "# HELP concurrency_queue_length Requests queued for a concurrency slot.",
+                  "# TYPE concurrency_queue_length gauge",
+                  f"concurrency_queue_length {len(concurrency_limiter.waiters)}"]
+    lines += ["# HELP response_cache_requests_total Response cache lookups by result.",
+              "# TYPE response_cache_requests_total counter",
+              f'response_cache_requests_total{{result="hit"}} {response_cache.hits}',
+              f'response_cache_requests_total{{result="miss"}} {response_cache.misses}']
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/users", response_model=Union[PaginatedResponse, CursorPage], tags=["Users"])
 async def list_users(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     status: Optional[UserStatus] = Query(None),
-    search: Optional[str] = Query(None)
+    search: Optional[str] = Query(None, max_length=100, description="Words to match at the start of name/email words"),
+    pagination: Literal["offset", "cursor"] = Query("offset", description="Use 'cursor' for large collections"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (implies cursor mode)"),
+    include_total: bool = Query(False, description="Cursor mode only: also run COUNT(*)"),
+    repo: UserRepository = Depends(get_repository)
 ):
-    """List users with pagination and filtering."""
-    # Mock implementation
-    total = 100
-    items = [
-        User(
-            id=str(i),
-            email=f"user{i}@example.com",
-            name=f"User {i}",
-            status=UserStatus.ACTIVE,
-            created_at=datetime.now(),
-            updated_at=datetime.now()
-        ).model_dump()
-        for i in range((page-1)*page_size, min(page*page_size, total))
-    ]
+    """List users with pagination and filtering.
+
+    status filters exactly; search matches users with a name or email word
+    starting with each search word (e.g. "ali smi" finds "Alice Smith").
+    """
+    filters = UserFilter.from_query(status, search)
+    if cursor is not None or pagination == "cursor":
+        after = decode_cursor(cursor) if cursor is not None else None  # Reject forged cursors before the cache
+        key = response_cache.list_key(f"cursor:{page_size}:{cursor}:{include_total}:{filters.key()}")
+        return await cached_json(request, key,
+                                 lambda: list_users_keyset(repo, page_size, cursor, after, include_total, filters))
+
+    async def build():
+        total = await repo.count(filters)
+        rows = await repo.list_offset(page_size, (page-1)*page_size, filters)
+        etag = page_etag(rows, "offset", page, page_size, total, filters.key())
+        return PaginatedResponse(
+            items=rows if FAST_PATH else [row.model_dump() for row in rows],
+            total=total,
+            page=page,
+            page_size=page_size,
+            pages=(total + page_size - 1) // page_size
+        ), etag, None
 
-    return PaginatedResponse(
-        items=items,
-        total=total,
-        page=page,
+    return await cached_json(request, response_cache.list_key(f"offset:{page}:{page_size}:{filters.key()}"), build)
+
+async def list_users_keyset(repo: UserRepository, page_size: int, cursor: Optional[str],
+                            after: Optional[Tuple[datetime, str]],
+                            include_total: bool,
+                            filters: UserFilter = UserFilter()) -> Tuple[CursorPage, str, None]:
+    """One keyset page: matching rows strictly after the cursor's (created_at, id)."""
+    rows = await repo.list_after(after, page_size + 1, filters)
+
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    etag = page_etag(rows, "cursor", cursor, page_size, include_total, filters.key())
+    return CursorPage(
+        items=rows if FAST_PATH else [row.model_dump() for row in rows],
+        next_cursor=encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+        has_more=has_more,
         page_size=page_size,
-        pages=(total + page_size - 1) // page_size
-    )
+        total=await repo.count(filters) if include_total else None
+    ), etag, None
 
 @app.post("/api/users", response_model=User, status_code=status.HTTP_201_CREATED, tags=["Users"])
-async def create_user(user: UserCreate):
+async def create_user(user: UserCreate, repo: UserRepository = Depends(get_repository)):
     """Create a new user."""
-    # Mock implementation
-    return User(
-        id="123",
+    # Hash and store user.password with your auth system; it is not persisted here
+    now = utcnow()
+    created = (User.model_construct if FAST_PATH else User)(
+        id=uuid.uuid4().hex,
         email=user.email,
         name=user.name,
         status=user.status,
-        created_at=datetime.now(),
-        updated_at=datetime.now()
+        created_at=now,
+        updated_at=now
     )
+    try:
+        await repo.create(created)
+    except sqlite3.IntegrityError:
+        raise email_taken(user.email)
+    response_cache.invalidate_user(created.id)
+    return respond(created, status.HTTP_201_CREATED)
+
+@app.post("/api/users/bulk", response_class=StreamingResponse, tags=["Users"])
+async def bulk_create_users(request: Request):
+    """Create users from an NDJSON body of UserCreate objects; streams one result per line."""
+    return await bulk_response(request, UserCreate, apply_creates)
+
+@app.patch("/api/users/bulk", response_class=StreamingResponse, tags=["Users"])
+async def bulk_update_users(request: Request):
+    """Partially update users from an NDJSON body of {"id": ..., <UserUpdate fields>} objects."""
+    return await bulk_response(request, BulkUserUpdate, apply_updates)
+
+@app.delete("/api/users/bulk", response_class=StreamingResponse, tags=["Users"])
+async def bulk_delete_users(request: Request):
+    """Delete users from an NDJSON body of {"id": ...} objects."""
+    return await bulk_response(request, BulkUserDelete, apply_deletes)
+
+@app.get("/api/users/batch", response_model=BatchUsers, tags=["Users"])
+async def get_users_batch(
+    ids: List[str] = Query(..., max_length=100, description="Repeat ?ids= for each user"),
+    loader: UserLoader = Depends(get_loader)
+):
+    """Fetch several users in one request and one query."""
+    users = await loader.load_many(ids)
+    return respond(BatchUsers(
+        items=[user for user in users if user is not None],
+        missing=[user_id for user_id, user in zip(ids, users) if user is None]
+    ))
 
 @app.get("/api/users/{user_id}", response_model=User, tags=["Users"])
-async def get_user(user_id: str = Path(..., description="User ID")):
+async def get_user(request: Request, user_id: str = Path(..., description="User ID"),
+                   repo: UserRepository = Depends(get_repository)):
     """Get user by ID."""
-    # Mock: Check if exists
-    if user_id == "999":
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"message": "User not found", "details": {"id": user_id}}
-        )
+    async def build():
+        user = await repo.get(user_id)
+        if user is None:
+            raise user_not_found(user_id)
+        return user, make_etag(user.id, user.updated_at.isoformat()), user.updated_at
 
-    return User(
-        id=user_id,
-        email="user@example.com",
-        name="User Name",
-        status=UserStatus.ACTIVE,
-        created_at=datetime.now(),
-        updated_at=datetime.now()
-    )
+    return await cached_json(request, f"users:{user_id}", build)
 
 @app.patch("/api/users/{user_id}", response_model=User, tags=["Users"])
-async def update_user(user_id: str, update: UserUpdate):
+async def update_user(user_id: str, update: UserUpdate, repo: UserRepository = Depends(get_repository)):
     """Partially update user."""
-    # Validate user exists
-    existing = await get_user(user_id)
-
-    # Apply updates
     update_data = update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(existing, field, value)
-
-    existing.updated_at = datetime.now()
-    return existing
+    try:
+        updated = await repo.update(user_id, update_data) if update_data else await repo.get(user_id)
+    except sqlite3.IntegrityError:
+        raise email_taken(update_data.get("email"))
+    if updated is None:
+        raise user_not_found(user_id)
+    response_cache.invalidate_user(user_id)
+    return respond(updated)
 
 @app.delete("/api/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Users"])
-async def delete_user(user_id: str):
+async def delete_user(user_id: str, repo: UserRepository = Depends(get_repository)):
     """Delete user."""
-    await get_user(user_id)  # Verify exists
+    if not await repo.delete(user_id):
+        raise user_not_found(user_id)
+    response_cache.invalidate_user(user_id)
     return None
 
 if __name__ == "__main__":
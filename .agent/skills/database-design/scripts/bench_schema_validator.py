@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Schema Validator Benchmark - graph-based vs. regex-based Prisma checks
+
+Generates a large Prisma schema (1,500 models by default, each with several
+foreign keys and indexes) and times the graph-based validator in
+schema_validator.py against the previous regex implementation, which
+searched the whole file once per foreign key.
+
+Usage:
+    python bench_schema_validator.py [--models N] [--repeat R]
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from schema_validator import validate_prisma_schema  # noqa: E402
+
+
+def generate_schema(models: int) -> str:
+    """Build a schema where model N relates to models N-1 and N-2."""
+    parts = [
+        'generator client {\n  provider = "prisma-client-js"\n}\n',
+        'datasource db {\n  provider = "postgresql"\n  url      = env("DATABASE_URL")\n}\n',
+    ]
+    for i in range(models):
+        lines = [f"model Model{i} {{",
+                 "  id        Int      @id @default(autoincrement())",
+                 '  settings  Json     @default("[]")',
+                 "  tenantId  Int",
+                 "  createdAt DateTime @default(now())"]
+        back = [j for j in (i - 1, i - 2) if j >= 0]
+        for j in back:
+            lines.append(f"  model{j}Id Int")
+            lines.append(f"  model{j}   Model{j} @relation(\"R{i}_{j}\", fields: [model{j}Id], references: [id])")
+        for j in (i + 1, i + 2):
+            if j < models:
+                lines.append(f"  children{j} Model{j}[] @relation(\"R{j}_{i}\")")
+        if back:
+            # Composite index whose prefix covers the first FK; the second stays uncovered
+            lines.append(f"  @@index([model{back[0]}Id, createdAt(sort: Desc)])")
+        lines.append("  @@index([tenantId])")
+        lines.append("}")
+        parts.append("\n".join(lines) + "\n")
+    return "\n".join(parts)
+
+
+def legacy_validate(file_path: Path) -> list:
+    """The regex-based validate_prisma_schema this script benchmarks against."""
+    issues = []
+    content = file_path.read_text(encoding='utf-8', errors='ignore')
+    models = re.findall(r'model\s+(\w+)\s*{([^}]+)}', content, re.DOTALL)
+    for model_name, model_body in models:
+        if not model_name[0].isupper():
+            issues.append(f"Model '{model_name}' should be PascalCase")
+        if '@id' not in model_body and 'id' not in model_body.lower():
+            issues.append(f"Model '{model_name}' might be missing @id field")
+        if 'createdAt' not in model_body and 'created_at' not in model_body:
+            issues.append(f"Model '{model_name}' missing createdAt field (recommended)")
+        foreign_keys = re.findall(r'(\w+Id)\s+\w+', model_body)
+        for fk in foreign_keys:
+            if f'@@index([{fk}])' not in content and f'@@index(["{fk}"])' not in content:
+                issues.append(f"Consider adding @@index([{fk}]) for better query performance in {model_name}")
+    enums = re.findall(r'enum\s+(\w+)\s*{', content)
+    for enum_name in enums:
+        if not enum_name[0].isupper():
+            issues.append(f"Enum '{enum_name}' should be PascalCase")
+    return issues
+
+
+def best_of(fn, path: Path, repeat: int) -> tuple:
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(path)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark schema_validator.py on a generated schema")
+    parser.add_argument('--models', type=int, default=1500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'schema.prisma'
+        path.write_text(generate_schema(args.models), encoding='utf-8')
+        size_kb = path.stat().st_size / 1024
+
+        legacy_time, legacy_issues = best_of(legacy_validate, path, args.repeat)
+        graph_time, graph_issues = best_of(validate_prisma_schema, path, args.repeat)
+
+    expected_fk_issues = max(0, args.models - 2)
+    graph_fk_issues = sum(1 for issue in graph_issues if issue.startswith('Consider adding'))
+
+    print(f"Schema: {args.models:,} models, {size_kb:,.0f} KB")
+    print(f"{'Validator':<10} {'Time':>10} {'Issues':>8}")
+    print(f"{'regex':<10} {legacy_time * 1000:>8.1f}ms {len(legacy_issues):>8,}")
+    print(f"{'graph':<10} {graph_time * 1000:>8.1f}ms {len(graph_issues):>8,}")
+    print(f"Speedup: {legacy_time / graph_time:.1f}x")
+    print(f"Uncovered FKs found by graph: {graph_fk_issues:,} (expected {expected_fk_issues:,}; "
+          f"the regex validator ignores composite-index prefixes)")
+
+    if graph_fk_issues != expected_fk_issues:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
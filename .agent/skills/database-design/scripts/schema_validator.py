@@ -1,23 +1,46 @@
 #!/usr/bin/env python3
 """
 Schema Validator - Database schema validation
-Validates Prisma schemas and checks for common issues.
+Validates Prisma and Drizzle schemas and checks for common issues.
 
 Usage:
-    python schema_validator.py <project_path>
+    python schema_validator.py <project_path> [--jobs N] [--no-cache]
+    python schema_validator.py <project_path> --workload prisma-query.log --workload pg_stat_statements.csv
 
 Checks:
-    - Prisma schema syntax
+    - Prisma schema syntax, Drizzle table definitions
     - Missing relations
     - Index recommendations
     - Naming conventions
+
+Prisma schemas and Drizzle table definitions (pgTable/mysqlTable/
+sqliteTable) are parsed once into the same model/field/relation/index
+graph; one rule engine runs every check as lookups against that graph.
+
+Schema files are found in a single walk that skips node_modules, .git, build
+output and anything matched by .gitignore/.stignore. Files are validated in
+parallel, and results are cached per file with its content hash so unchanged
+schemas are skipped on re-runs; entries for deleted files are pruned on save.
+
+With --workload, real queries (Prisma query logs or a pg_stat_statements CSV
+export) are mapped onto the parsed models to recommend composite indexes
+ranked by the share of workload time they would serve, and to flag declared
+@@index entries that are redundant or unused by that workload.
 """
 
+import argparse
+import csv
+import hashlib
+import os
 import sys
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field as dc_field
 from pathlib import Path
 from datetime import datetime
+from itertools import product
+from typing import Optional
 
 # Fix Windows console encoding
 try:
@@ -26,73 +49,1316 @@ except:
     pass
 
 
+# =============================================================================
+# SCHEMA DISCOVERY
+# =============================================================================
+
+# Never descended into, whatever the ignore files say
+DEFAULT_IGNORED_DIRS = {
+    'node_modules', '.git', '.hg', '.svn', 'dist', 'build', 'out', '.next',
+    '.nuxt', '.turbo', '.cache', 'coverage', '__pycache__', '.venv', 'venv',
+}
+
+IGNORE_FILES = ('.gitignore', '.stignore')
+
+
+def glob_to_regex(pattern: str) -> str:
+    """Translate a gitignore-style glob (with ``**``) to a regex over '/'-separated paths."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                out.append('[' + pattern[i + 1:end].replace('\\', '\\\\') + ']')
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class IgnoreRules:
+    """Ignore patterns from .gitignore/.stignore files, scoped to their directory.
+
+    Supports comments, ``!`` negation, trailing ``/`` (directories only),
+    leading ``/`` or inner ``/`` (anchored), ``*``, ``?``, ``[...]`` and ``**``.
+    Syncthing's ``(?d)``/``(?i)`` prefixes are accepted and ``#include`` is skipped.
+    """
+
+    def __init__(self, rules: tuple = ()):
+        self.rules = rules  # (base, regex, negate, dir_only, anchored)
+
+    def extended(self, directory: Path, rel_dir: str) -> 'IgnoreRules':
+        """Return rules with any ignore files found in ``directory`` appended."""
+        rules = list(self.rules)
+        for name in IGNORE_FILES:
+            try:
+                text = (directory / name).read_text(encoding='utf-8', errors='ignore')
+            except OSError:
+                continue
+            for raw in text.splitlines():
+                line = raw.strip()
+                if not line or line.startswith('#'):
+                    continue
+                flags = 0
+                while line.startswith('(?'):
+                    if line.startswith('(?i)'):
+                        flags = re.IGNORECASE
+                    line = line[line.index(')') + 1:]
+                negate = line.startswith('!')
+                if negate:
+                    line = line[1:]
+                dir_only = line.endswith('/')
+                line = line.rstrip('/')
+                anchored = '/' in line
+                line = line.lstrip('/')
+                if not line:
+                    continue
+                regex = re.compile(glob_to_regex(line) + r'\Z', flags)
+                rules.append((rel_dir, regex, negate, dir_only, anchored))
+        return self if len(rules) == len(self.rules) else IgnoreRules(tuple(rules))
+
+    def ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """Whether ``rel_path`` (relative to the project root) is ignored; the last match wins."""
+        result = False
+        name = rel_path.rsplit('/', 1)[-1]
+        for base, regex, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not rel_path.startswith(base + '/'):
+                    continue
+                local = rel_path[len(base) + 1:]
+            else:
+                local = rel_path
+            if regex.match(local if anchored else name):
+                result = not negate
+        return result
+
+
+def classify_schema_file(path: Path) -> Optional[str]:
+    """Return 'prisma' or 'drizzle' if ``path`` looks like a schema file."""
+    parent = path.parent.name
+    if path.name == 'schema.prisma' and parent == 'prisma':
+        return 'prisma'
+    if path.suffix == '.ts' and parent in ('drizzle', 'schema'):
+        name = path.name.lower()
+        if 'schema' in name or 'table' in name:
+            return 'drizzle'
+    return None
+
+
 def find_schema_files(project_path: Path) -> list:
-    """Find database schema files."""
+    """Find database schema files in one pruned walk of the project."""
     schemas = []
-    
-    # Prisma schema
-    prisma_files = list(project_path.glob('**/prisma/schema.prisma'))
-    schemas.extend([('prisma', f) for f in prisma_files])
-    
-    # Drizzle schema files
-    drizzle_files = list(project_path.glob('**/drizzle/*.ts'))
-    drizzle_files.extend(project_path.glob('**/schema/*.ts'))
-    for f in drizzle_files:
-        if 'schema' in f.name.lower() or 'table' in f.name.lower():
-            schemas.append(('drizzle', f))
-    
-    return schemas[:10]  # Limit
+    rules_by_dir = {project_path: IgnoreRules().extended(project_path, '')}
+
+    for dirpath, dirnames, filenames in os.walk(project_path):
+        directory = Path(dirpath)
+        rules = rules_by_dir.pop(directory)
+        rel_dir = directory.relative_to(project_path).as_posix()
+        rel_dir = '' if rel_dir == '.' else rel_dir
+
+        kept = []
+        for name in sorted(dirnames):
+            rel = f"{rel_dir}/{name}" if rel_dir else name
+            if name in DEFAULT_IGNORED_DIRS or rules.ignored(rel, True):
+                continue
+            kept.append(name)
+            rules_by_dir[directory / name] = rules.extended(directory / name, rel)
+        dirnames[:] = kept
+
+        for name in sorted(filenames):
+            schema_type = classify_schema_file(directory / name)
+            if schema_type is None:
+                continue
+            rel = f"{rel_dir}/{name}" if rel_dir else name
+            if not rules.ignored(rel, False):
+                schemas.append((schema_type, directory / name))
+
+    return schemas
+
+
+# =============================================================================
+# VALIDATION CACHE
+# =============================================================================
+
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'schema_validator' / 'results.json'
+
+
+def validator_digest() -> str:
+    """Hash of this script, so cached results are dropped whenever the checks change."""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+def load_cache(path: Path) -> dict:
+    try:
+        cache = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if cache.get('validator') != validator_digest():
+        return {}
+    return cache.get('results', {})
+
+
+def prune_cache(cache: dict, project_path: Path, schemas: list) -> dict:
+    """Drop entries for files that no longer exist, or that this run no longer found under project_path."""
+    validated = {str(file_path) for _, file_path in schemas}
+    root = str(project_path) + os.sep
+    return {path: entry for path, entry in cache.items()
+            if path in validated or (not path.startswith(root) and os.path.exists(path))}
+
+
+def save_cache(path: Path, results: dict):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps({'validator': validator_digest(), 'results': results}),
+                            encoding='utf-8')
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Warning: could not write cache {path}: {e}")
+
+
+def cache_key(schema_type: str, file_path: Path) -> str:
+    """Content hash of a schema file, prefixed with its type; stored with the file's cached result."""
+    return f"{schema_type}:{hashlib.sha256(file_path.read_bytes()).hexdigest()}"
+
+
+# =============================================================================
+# PRISMA SCHEMA GRAPH
+# =============================================================================
+
+SCALAR_TYPES = {
+    'String', 'Boolean', 'Int', 'BigInt', 'Float', 'Decimal',
+    'DateTime', 'Json', 'Bytes', 'Unsupported',
+}
+
+# Leading blanks are consumed with each token so whitespace never becomes a token
+TOKEN_RE = re.compile(r"""
+    [ \t\r\f]*
+    (?:
+        (?P<comment>//[^\n]*)
+      | (?P<newline>\n)
+      | (?P<string>"(?:[^"\\\n]|\\.)*")
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<ident>[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*)
+      | (?P<attr>@@?)
+      | (?P<punct>[{}()\[\],:=?!])
+      | (?P<error>.)
+      | (?P<end>$)
+    )
+""", re.VERBOSE)
+
+
+class SchemaParseError(ValueError):
+    """Raised when a schema file cannot be tokenized or parsed."""
+
+    def __init__(self, message: str, line: int):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+@dataclass
+class Field:
+    name: str
+    type: str
+    optional: bool = False
+    is_list: bool = False
+    attributes: dict = dc_field(default_factory=dict)  # name -> (positional, named)
+    line: int = 0
+
+    @property
+    def db_name(self) -> str:
+        """Column name in the database (``@map("...")`` or the field name)."""
+        positional, named = self.attributes.get('map', ((), {}))
+        return named.get('name', positional[0] if positional else self.name)
+
+
+@dataclass
+class Index:
+    kind: str  # 'id' | 'unique' | 'index'
+    fields: tuple
+
+
+@dataclass
+class Relation:
+    field: str
+    target: str
+    fields: tuple = ()
+    references: tuple = ()
+    name: Optional[str] = None
+
+
+@dataclass
+class Model:
+    name: str
+    kind: str = 'model'  # 'model' | 'view' | 'type'
+    fields: dict = dc_field(default_factory=dict)
+    indexes: list = dc_field(default_factory=list)
+    relations: list = dc_field(default_factory=list)
+    line: int = 0
+    db_name: Optional[str] = None  # table name from @@map
+
+    @property
+    def has_id(self) -> bool:
+        return any(index.kind == 'id' for index in self.indexes)
+
+    def index_prefixes(self) -> set:
+        """All leading column tuples of the model's indexes (an index on (a, b) covers (a,))."""
+        prefixes = set()
+        for index in self.indexes:
+            for i in range(1, len(index.fields) + 1):
+                prefixes.add(index.fields[:i])
+        return prefixes
+
+
+@dataclass
+class SchemaGraph:
+    orm: str = 'prisma'  # 'prisma' | 'drizzle'; selects ORM_CONVENTIONS
+    models: dict = dc_field(default_factory=dict)
+    enums: dict = dc_field(default_factory=dict)  # name -> list of values
+
+
+def tokenize(content: str) -> list:
+    """Split schema text into (kind, value, line) tokens, dropping whitespace and comments."""
+    tokens = []
+    append = tokens.append
+    line = 1
+    for match in TOKEN_RE.finditer(content):
+        kind = match.lastgroup
+        if kind == 'newline':
+            append(('newline', '\n', line))
+            line += 1
+        elif kind == 'comment' or kind == 'end':
+            continue
+        elif kind == 'error':
+            raise SchemaParseError(f"unexpected character {match.group(kind)!r}", line)
+        else:
+            append((kind, match.group(kind), line))
+    append(('eof', '', line))
+    return tokens
+
+
+class PrismaParser:
+    """Recursive-descent parser from Prisma schema tokens to a SchemaGraph."""
+
+    def __init__(self, content: str):
+        self.tokens = tokenize(content)
+        self.pos = 0
+
+    def peek(self) -> tuple:
+        return self.tokens[self.pos]
+
+    def advance(self) -> tuple:
+        token = self.tokens[self.pos]
+        if token[0] != 'eof':
+            self.pos += 1
+        return token
+
+    def expect(self, kind: str, value: str = None) -> tuple:
+        token = self.advance()
+        if token[0] != kind or (value is not None and token[1] != value):
+            wanted = value or kind
+            raise SchemaParseError(f"expected {wanted!r}, got {token[1] or 'end of file'!r}", token[2])
+        return token
+
+    def skip_newlines(self):
+        while self.peek()[0] == 'newline':
+            self.pos += 1
+
+    def parse(self) -> SchemaGraph:
+        graph = SchemaGraph()
+        while True:
+            self.skip_newlines()
+            kind, value, line = self.advance()
+            if kind == 'eof':
+                return graph
+            if kind != 'ident':
+                raise SchemaParseError(f"unexpected {value!r} at top level", line)
+            if value in ('model', 'view', 'type'):
+                model = self.parse_model(value, line)
+                graph.models[model.name] = model
+            elif value == 'enum':
+                name = self.expect('ident')[1]
+                graph.enums[name] = self.parse_enum()
+            elif value in ('datasource', 'generator'):
+                self.expect('ident')
+                self.skip_block()
+            else:
+                raise SchemaParseError(f"unknown block type {value!r}", line)
+
+    def skip_block(self):
+        self.expect('punct', '{')
+        depth = 1
+        while depth:
+            kind, value, line = self.advance()
+            if kind == 'eof':
+                raise SchemaParseError("unterminated block", line)
+            if value == '{':
+                depth += 1
+            elif value == '}':
+                depth -= 1
+
+    def parse_enum(self) -> list:
+        self.expect('punct', '{')
+        values = []
+        while True:
+            self.skip_newlines()
+            kind, value, line = self.peek()
+            if value == '}':
+                self.advance()
+                return values
+            if kind == 'attr':
+                self.parse_attribute()
+            else:
+                values.append(self.expect('ident')[1])
+                while self.peek()[0] == 'attr':
+                    self.parse_attribute()
+
+    def parse_model(self, kind: str, line: int) -> Model:
+        model = Model(name=self.expect('ident')[1], kind=kind, line=line)
+        self.expect('punct', '{')
+        while True:
+            self.skip_newlines()
+            token = self.peek()
+            if token[1] == '}':
+                self.advance()
+                break
+            if token[1] == '@@':
+                self.advance()
+                name, positional, named = self.parse_attribute()
+                if name in ('id', 'unique', 'index'):
+                    columns = named.get('fields', positional[0] if positional else [])
+                    model.indexes.append(Index(name, tuple(value_name(v) for v in as_list(columns))))
+                elif name == 'map':
+                    model.db_name = named.get('name', positional[0] if positional else None)
+            else:
+                self.parse_field(model)
+        return model
+
+    def parse_field(self, model: Model):
+        name, line = self.expect('ident')[1], self.peek()[2]
+        if self.peek()[0] == 'punct' and self.peek()[1] in ':=':
+            raise SchemaParseError(f"expected a field type after {name!r}", line)
+        field = Field(name=name, type=self.expect('ident')[1], line=line)
+        if field.type == 'Unsupported' and self.peek()[1] == '(':
+            self.parse_args()
+        if self.peek()[1] == '[':
+            self.advance()
+            self.expect('punct', ']')
+            field.is_list = True
+        if self.peek()[1] == '?':
+            self.advance()
+            field.optional = True
+        while self.peek()[0] == 'attr':
+            attr_name, positional, named = self.parse_attribute()
+            field.attributes[attr_name] = (positional, named)
+        if self.peek()[0] not in ('newline', 'eof') and self.peek()[1] != '}':
+            raise SchemaParseError(f"unexpected {self.peek()[1]!r} after field {name!r}", self.peek()[2])
+
+        model.fields[name] = field
+        if 'id' in field.attributes:
+            model.indexes.append(Index('id', (name,)))
+        if 'unique' in field.attributes:
+            model.indexes.append(Index('unique', (name,)))
+        if 'relation' in field.attributes:
+            positional, named = field.attributes['relation']
+            model.relations.append(Relation(
+                field=name, target=field.type,
+                fields=tuple(value_name(v) for v in as_list(named.get('fields', []))),
+                references=tuple(value_name(v) for v in as_list(named.get('references', []))),
+                name=named.get('name', positional[0] if positional else None),
+            ))
+
+    def parse_attribute(self) -> tuple:
+        """Parse ``@name`` / ``@@name`` with optional arguments (the '@' is already consumed
+        for block attributes)."""
+        if self.peek()[0] == 'attr':
+            self.advance()
+        name = self.expect('ident')[1]
+        positional, named = [], {}
+        if self.peek()[1] == '(':
+            positional, named = self.parse_args()
+        return name, positional, named
+
+    def parse_args(self) -> tuple:
+        self.expect('punct', '(')
+        positional, named = [], {}
+        while True:
+            self.skip_newlines()
+            if self.peek()[1] == ')':
+                self.advance()
+                return positional, named
+            if self.peek()[0] == 'ident' and self.tokens[self.pos + 1][1] == ':':
+                key = self.advance()[1]
+                self.advance()
+                named[key] = self.parse_value()
+            else:
+                positional.append(self.parse_value())
+            self.skip_newlines()
+            if self.peek()[1] == ',':
+                self.advance()
+            elif self.peek()[1] != ')':
+                raise SchemaParseError(f"expected ',' or ')', got {self.peek()[1]!r}", self.peek()[2])
+
+    def parse_value(self):
+        kind, value, line = self.advance()
+        if value == '[':
+            items = []
+            while True:
+                self.skip_newlines()
+                if self.peek()[1] == ']':
+                    self.advance()
+                    return items
+                items.append(self.parse_value())
+                self.skip_newlines()
+                if self.peek()[1] == ',':
+                    self.advance()
+        if kind == 'string':
+            return value[1:-1]
+        if kind in ('ident', 'number'):
+            if self.peek()[1] == '(':
+                return (value, self.parse_args())  # function call, e.g. now() or id(sort: Desc)
+            return value
+        raise SchemaParseError(f"unexpected {value!r} in attribute arguments", line)
+
+
+def as_list(value) -> list:
+    return value if isinstance(value, list) else [value]
+
+
+def value_name(value) -> str:
+    """Column name of an index/relation argument: ``a``, ``"a"`` or ``a(sort: Desc)``."""
+    return value[0] if isinstance(value, tuple) else str(value)
+
+
+def parse_prisma(content: str) -> SchemaGraph:
+    """Parse a Prisma schema into its model/field/relation/index graph."""
+    return PrismaParser(content).parse()
+
+
+# =============================================================================
+# DRIZZLE SCHEMA GRAPH
+# =============================================================================
+
+DRIZZLE_TABLE_FUNCTIONS = {'pgTable', 'mysqlTable', 'sqliteTable', 'singlestoreTable'}
+DRIZZLE_ENUM_FUNCTIONS = {'pgEnum', 'mysqlEnum'}
+
+# Drizzle column builders normalized to the Prisma scalar type names
+DRIZZLE_TYPES = {
+    'String': {'text', 'varchar', 'char', 'uuid', 'citext', 'inet', 'cidr', 'macaddr'},
+    'Int': {'integer', 'int', 'smallint', 'tinyint', 'mediumint', 'serial', 'smallserial'},
+    'BigInt': {'bigint', 'bigserial'},
+    'Float': {'real', 'doublePrecision', 'double', 'float'},
+    'Decimal': {'numeric', 'decimal'},
+    'Boolean': {'boolean'},
+    'DateTime': {'timestamp', 'date', 'time', 'datetime', 'interval'},
+    'Json': {'json', 'jsonb'},
+    'Bytes': {'bytea', 'blob', 'binary', 'varbinary'},
+}
+DRIZZLE_TYPE_OF = {builder: scalar for scalar, builders in DRIZZLE_TYPES.items() for builder in builders}
+
+TS_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\]|\\.)*`)
+  | (?P<number>\d[\w.]*)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<punct>=>|\.\.\.|[{}()\[\],:.;<>=?!&|+\-*/%^~@#])
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+OPENERS = {'(': ')', '[': ']', '{': '}'}
+
+
+def ts_tokens(content: str) -> list:
+    """Tokenize TypeScript into (kind, value), dropping whitespace and comments."""
+    return [(match.lastgroup, match.group()) for match in TS_TOKEN_RE.finditer(content)
+            if match.lastgroup not in ('space', 'comment')]
+
+
+class DrizzleParser:
+    """Extract pgTable/mysqlTable/sqliteTable definitions into a SchemaGraph.
+
+    Only the statically visible shape is read: column builders and their
+    ``.primaryKey()``, ``.unique()`` and ``.references(() => t.col)`` chains,
+    plus ``index()/uniqueIndex()/unique()/primaryKey()/foreignKey()`` in the
+    table's extra-config callback.
+    """
+
+    def __init__(self, content: str):
+        self.tokens = ts_tokens(content)
+        self.tokens.append(('eof', ''))
+
+    def closing(self, i: int) -> int:
+        """Index of the bracket closing the one at ``i``; generics after ``$type``/``sql`` count too."""
+        stack = []
+        while i < len(self.tokens) - 1:
+            value = self.tokens[i][1]
+            if value in OPENERS:
+                stack.append(OPENERS[value])
+            elif value == '<' and self.tokens[i - 1][1] in ('$type', 'sql'):
+                stack.append('>')
+            elif stack and value == stack[-1]:
+                stack.pop()
+                if not stack:
+                    return i
+            i += 1
+        raise SchemaParseError("unbalanced brackets", 0)
+
+    def split_top(self, start: int, end: int) -> list:
+        """Split tokens[start:end] on commas that are not nested in brackets."""
+        parts, i, first = [], start, start
+        while i < end:
+            value = self.tokens[i][1]
+            if value in OPENERS or (value == '<' and self.tokens[i - 1][1] in ('$type', 'sql')):
+                i = self.closing(i)
+            elif value == ',':
+                parts.append((first, i))
+                first = i + 1
+            i += 1
+        if first < end:
+            parts.append((first, end))
+        return parts
+
+    def parse(self) -> SchemaGraph:
+        graph = SchemaGraph(orm='drizzle')
+        self.enum_vars = {}
+        tokens = self.tokens
+        tables = []
+        for i in range(len(tokens) - 6):
+            if not (tokens[i][0] == 'ident' and tokens[i + 1][1] == '=' and tokens[i + 2][0] == 'ident'):
+                continue
+            func = tokens[i + 2][1]
+            if func in DRIZZLE_ENUM_FUNCTIONS and tokens[i + 3][1] == '(':
+                args = self.split_top(i + 4, self.closing(i + 3))
+                if args and tokens[args[0][0]][0] == 'string':
+                    name = tokens[args[0][0]][1][1:-1]
+                    values = [v[1:-1] for k, v in tokens[args[1][0]:args[1][1]] if k == 'string'] \
+                        if len(args) > 1 else []
+                    graph.enums[name] = values
+                    self.enum_vars[tokens[i][1]] = name
+            elif func in DRIZZLE_TABLE_FUNCTIONS and tokens[i + 3][1] == '(':
+                tables.append((tokens[i][1], i + 3))
+            elif tokens[i + 3][1] == '.' and tokens[i + 4][1] == 'table' and tokens[i + 5][1] == '(':
+                # pgSchema('auth').table(...) via `const users = authSchema.table(...)`
+                tables.append((tokens[i][1], i + 5))
+
+        for var, open_paren in tables:
+            model = self.parse_table(var, open_paren)
+            if model is not None:
+                graph.models[model.name] = model
+        return graph
+
+    def parse_table(self, var: str, open_paren: int) -> Optional[Model]:
+        tokens = self.tokens
+        args = self.split_top(open_paren + 1, self.closing(open_paren))
+        if len(args) < 2 or tokens[args[0][0]][0] != 'string':
+            return None
+        model = Model(name=var, db_name=tokens[args[0][0]][1][1:-1])
+
+        # Columns: an object literal, or a callback returning one
+        start, end = args[1]
+        while start < end and tokens[start][1] != '{':
+            start += 1
+        if start == end:
+            return model
+        for entry_start, entry_end in self.split_top(start + 1, self.closing(start)):
+            self.parse_column(model, entry_start, entry_end)
+
+        # Extra config: (table) => ({ ... }) or (table) => [ ... ]
+        if len(args) > 2:
+            self.parse_extra_config(model, *args[2])
+        return model
+
+    def parse_column(self, model: Model, start: int, end: int):
+        tokens = self.tokens
+        if end - start < 3 or tokens[start + 1][1] != ':':
+            return
+        key = tokens[start][1].strip('\'"')
+        i = start + 2
+        # Builder: integer('col') or t.integer('col') or integer()
+        while i < end and not (tokens[i][0] == 'ident' and tokens[i + 1][1] == '('):
+            i += 1
+        if i == end:
+            return
+        builder = tokens[i][1]
+        close = self.closing(i + 1)
+        builder_args = self.split_top(i + 2, close)
+        db_name = key
+        if builder_args and tokens[builder_args[0][0]][0] == 'string':
+            db_name = tokens[builder_args[0][0]][1][1:-1]
+        if builder in self.enum_vars:
+            field_type = self.enum_vars[builder]
+        else:
+            field_type = DRIZZLE_TYPE_OF.get(builder, 'Unsupported')
+        field = Field(name=key, type=field_type, optional=True)
+        field.attributes['map'] = ((db_name,), {})
+        model.fields[key] = field
+
+        # Method chain
+        i = close + 1
+        while i + 2 < end and tokens[i][1] == '.' and tokens[i + 1][0] == 'ident':
+            method = tokens[i + 1][1]
+            j = i + 2
+            if tokens[j][1] == '<':
+                j = self.closing(j) + 1
+            if tokens[j][1] != '(':
+                break
+            close = self.closing(j)
+            if method == 'primaryKey':
+                model.indexes.append(Index('id', (key,)))
+            elif method == 'unique':
+                model.indexes.append(Index('unique', (key,)))
+            elif method == 'notNull':
+                field.optional = False
+            elif method == 'array':
+                field.is_list = True
+            elif method == 'references':
+                target = self.member_refs(j + 1, close)
+                if target:
+                    table, column = target[0]
+                    model.relations.append(Relation(field=key, target=table,
+                                                    fields=(key,), references=(column,)))
+            i = close + 1
+
+    def member_refs(self, start: int, end: int) -> list:
+        """(object, property) pairs of ``a.b`` expressions in tokens[start:end]."""
+        tokens = self.tokens
+        refs = []
+        for i in range(start, end - 2):
+            if tokens[i][0] == 'ident' and tokens[i + 1][1] == '.' and tokens[i + 2][0] == 'ident' \
+                    and tokens[i - 1][1] != '.':
+                refs.append((tokens[i][1], tokens[i + 2][1]))
+        return refs
+
+    def parse_extra_config(self, model: Model, start: int, end: int):
+        tokens = self.tokens
+        i = start
+        while i < end:
+            kind, value = tokens[i]
+            if kind == 'ident' and tokens[i + 1][1] == '(' and tokens[i - 1][1] != '.' and \
+                    value in ('index', 'uniqueIndex', 'unique', 'primaryKey', 'foreignKey'):
+                close = self.closing(i + 1)
+                # index('name').on(t.a, t.b) / primaryKey({ columns: [t.a, t.b] })
+                args_start, args_end = i + 2, close
+                if tokens[close + 1][1] == '.' and tokens[close + 2][1] == 'on' and tokens[close + 3][1] == '(':
+                    args_start, args_end = close + 4, self.closing(close + 3)
+                    close = args_end
+                if value == 'foreignKey':
+                    self.parse_foreign_key(model, args_start, args_end)
+                else:
+                    columns = tuple(prop for _, prop in self.member_refs(args_start, args_end))
+                    if columns:
+                        kind_name = {'primaryKey': 'id', 'uniqueIndex': 'unique'}.get(value, value)
+                        model.indexes.append(Index(kind_name, columns))
+                i = close
+            i += 1
+
+    def parse_foreign_key(self, model: Model, start: int, end: int):
+        """foreignKey({ columns: [t.a], foreignColumns: [other.id] })"""
+        tokens = self.tokens
+        sections = {}
+        for i in range(start, end):
+            if tokens[i][1] in ('columns', 'foreignColumns') and tokens[i + 1][1] == ':' \
+                    and tokens[i + 2][1] == '[':
+                sections[tokens[i][1]] = self.member_refs(i + 3, self.closing(i + 2))
+        local = tuple(prop for _, prop in sections.get('columns', []))
+        foreign = sections.get('foreignColumns', [])
+        if local and foreign:
+            target = foreign[0][0]
+            model.relations.append(Relation(field=local[0], target=target, fields=local,
+                                            references=tuple(prop for _, prop in foreign)))
+
+
+def parse_drizzle(content: str) -> SchemaGraph:
+    """Parse Drizzle table definitions into the same graph as parse_prisma."""
+    return DrizzleParser(content).parse()
+
+
+# =============================================================================
+# RULE ENGINE (shared by Prisma and Drizzle graphs)
+# =============================================================================
+
+SNAKE_CASE_RE = re.compile(r'^[a-z][a-z0-9_]*$')
+
+ORM_CONVENTIONS = {
+    'prisma': {
+        'model': 'Model',
+        'name_style': 'PascalCase',
+        'is_valid_name': lambda name: name[0].isupper(),
+        'id_hint': '@id field',
+        'index_hint': lambda fk: f"@@index([{', '.join(fk)}])",
+    },
+    'drizzle': {
+        'model': 'Table',
+        'name_style': 'snake_case',
+        'is_valid_name': lambda name: bool(SNAKE_CASE_RE.match(name)),
+        'id_hint': 'primaryKey()',
+        'index_hint': lambda fk: f"index().on({', '.join(f'table.{c}' for c in fk)})",
+    },
+}
+
+
+def foreign_keys(model: Model) -> list:
+    """Column tuples of a model that reference other rows.
+
+    Explicit relation columns (``@relation(fields: [...])``, ``.references()``,
+    ``foreignKey()``) come first; scalar fields named ``*Id`` / ``*_id`` are
+    included as likely unmodelled foreign keys.
+    """
+    fks = []
+    for relation in model.relations:
+        if relation.fields and relation.fields not in fks:
+            fks.append(relation.fields)
+    for field in model.fields.values():
+        named_like_fk = (field.name.endswith('Id') and len(field.name) > 2) or field.db_name.endswith('_id')
+        if named_like_fk and not field.is_list and field.type in SCALAR_TYPES and (field.name,) not in fks:
+            fks.append((field.name,))
+    return fks
+
+
+def check_model_naming(graph: SchemaGraph, model: Model, conv: dict) -> list:
+    name = model.name if graph.orm == 'prisma' else (model.db_name or model.name)
+    if not conv['is_valid_name'](name):
+        return [f"{conv['model']} '{name}' should be {conv['name_style']}"]
+    return []
+
+
+def check_primary_key(graph: SchemaGraph, model: Model, conv: dict) -> list:
+    # Composite types (MongoDB `type`) and views have no primary key
+    if model.kind == 'model' and not model.has_id:
+        return [f"{conv['model']} '{model.name}' might be missing {conv['id_hint']}"]
+    return []
+
+
+def check_timestamps(graph: SchemaGraph, model: Model, conv: dict) -> list:
+    if model.kind != 'model':
+        return []
+    names = set(model.fields) | {field.db_name for field in model.fields.values()}
+    if 'createdAt' not in names and 'created_at' not in names:
+        return [f"{conv['model']} '{model.name}' missing createdAt field (recommended)"]
+    return []
+
+
+def check_relations(graph: SchemaGraph, model: Model, conv: dict) -> list:
+    """Relations must point at real models and columns."""
+    issues = []
+    known_types = SCALAR_TYPES | set(graph.models) | set(graph.enums)
+    for field in model.fields.values():
+        if field.type not in known_types:
+            issues.append(f"Field '{model.name}.{field.name}' has unknown type '{field.type}'")
+    for relation in model.relations:
+        target = graph.models.get(relation.target)
+        for column in relation.fields:
+            if column not in model.fields:
+                issues.append(f"Relation '{model.name}.{relation.field}' uses unknown field '{column}'")
+        if target is not None:
+            for column in relation.references:
+                if column not in target.fields:
+                    issues.append(f"Relation '{model.name}.{relation.field}' references unknown "
+                                  f"field '{relation.target}.{column}'")
+    return issues
+
+
+def check_fk_indexes(graph: SchemaGraph, model: Model, conv: dict) -> list:
+    """An index whose leading columns are the FK covers it."""
+    covered = model.index_prefixes()
+    return [f"Consider adding {conv['index_hint'](fk)} for better query performance in {model.name}"
+            for fk in foreign_keys(model) if fk not in covered]
+
+
+def check_enum_naming(graph: SchemaGraph, conv: dict) -> list:
+    return [f"Enum '{name}' should be {conv['name_style']}"
+            for name in graph.enums if not conv['is_valid_name'](name)]
+
+
+MODEL_RULES = (check_model_naming, check_primary_key, check_timestamps, check_relations, check_fk_indexes)
+GRAPH_RULES = (check_enum_naming,)
+
+
+def check_graph(graph: SchemaGraph) -> list:
+    """Run every rule as lookups against a parsed graph (Prisma or Drizzle)."""
+    conv = ORM_CONVENTIONS[graph.orm]
+    issues = []
+    for model in graph.models.values():
+        for rule in MODEL_RULES:
+            issues.extend(rule(graph, model, conv))
+    for rule in GRAPH_RULES:
+        issues.extend(rule(graph, conv))
+    return issues
+
+
+def validate_schema(schema_type: str, file_path: Path) -> list:
+    """Validate one schema file of the given type (runs in a worker process)."""
+    if schema_type == 'prisma':
+        return validate_prisma_schema(file_path)
+    return validate_drizzle_schema(file_path)
 
 
 def validate_prisma_schema(file_path: Path) -> list:
     """Validate Prisma schema file."""
-    issues = []
-    
     try:
         content = file_path.read_text(encoding='utf-8', errors='ignore')
-        
-        # Find all models
-        models = re.findall(r'model\s+(\w+)\s*{([^}]+)}', content, re.DOTALL)
-        
-        for model_name, model_body in models:
-            # Check naming convention (PascalCase)
-            if not model_name[0].isupper():
-                issues.append(f"Model '{model_name}' should be PascalCase")
-            
-            # Check for id field
-            if '@id' not in model_body and 'id' not in model_body.lower():
-                issues.append(f"Model '{model_name}' might be missing @id field")
-            
-            # Check for createdAt/updatedAt
-            if 'createdAt' not in model_body and 'created_at' not in model_body:
-                issues.append(f"Model '{model_name}' missing createdAt field (recommended)")
-            
-            # Check for @relation without fields
-            relations = re.findall(r'@relation\([^)]*\)', model_body)
-            for rel in relations:
-                if 'fields:' not in rel and 'references:' not in rel:
-                    pass  # Implicit relation, ok
-            
-            # Check for @@index suggestions
-            foreign_keys = re.findall(r'(\w+Id)\s+\w+', model_body)
-            for fk in foreign_keys:
-                if f'@@index([{fk}])' not in content and f'@@index(["{fk}"])' not in content:
-                    issues.append(f"Consider adding @@index([{fk}]) for better query performance in {model_name}")
-        
-        # Check for enum definitions
-        enums = re.findall(r'enum\s+(\w+)\s*{', content)
-        for enum_name in enums:
-            if not enum_name[0].isupper():
-                issues.append(f"Enum '{enum_name}' should be PascalCase")
-        
+        return check_graph(parse_prisma(content))
+    except SchemaParseError as e:
+        return [f"Error parsing schema: {e}"]
     except Exception as e:
-        issues.append(f"Error reading schema: {str(e)[:50]}")
-    
-    return issues
+        return [f"Error reading schema: {str(e)[:50]}"]
+
+
+def validate_drizzle_schema(file_path: Path) -> list:
+    """Validate Drizzle table definitions."""
+    try:
+        content = file_path.read_text(encoding='utf-8', errors='ignore')
+        return check_graph(parse_drizzle(content))
+    except SchemaParseError as e:
+        return [f"Error parsing schema: {e}"]
+    except Exception as e:
+        return [f"Error reading schema: {str(e)[:50]}"]
+
+
+# =============================================================================
+# WORKLOAD-AWARE INDEX RECOMMENDATIONS
+# =============================================================================
+
+SQL_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<string>'(?:[^']|'')*')
+      | (?P<quoted>"(?:[^"]|"")*")
+      | (?P<param>\$\d+|\?)
+      | (?P<number>\d+(?:\.\d+)?)
+      | (?P<word>[A-Za-z_][\w$]*)
+      | (?P<op><=|>=|<>|!=|=|<|>)
+      | (?P<punct>[().,;*])
+      | (?P<other>\S)
+    )""", re.VERBOSE)
+
+SQL_KEYWORDS = {
+    'SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'NOT', 'IN', 'IS', 'NULL', 'JOIN', 'LEFT',
+    'RIGHT', 'INNER', 'OUTER', 'FULL', 'CROSS', 'LATERAL', 'ON', 'AS', 'ORDER', 'BY',
+    'GROUP', 'HAVING', 'LIMIT', 'OFFSET', 'ASC', 'DESC', 'NULLS', 'FIRST', 'LAST',
+    'BETWEEN', 'LIKE', 'ILIKE', 'UPDATE', 'SET', 'DELETE', 'INSERT', 'INTO', 'VALUES',
+    'RETURNING', 'DISTINCT', 'EXISTS', 'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'WITH',
+    'UNION', 'ALL', 'ANY', 'USING', 'TRUE', 'FALSE', 'FOR', 'FETCH', 'WINDOW', 'CAST',
+}
+EQUALITY_OPS = {'=', 'IN', 'IS'}
+RANGE_OPS = {'<', '>', '<=', '>=', 'BETWEEN', 'LIKE', 'ILIKE'}
+ORDER_BY_END = {'LIMIT', 'OFFSET', 'FETCH', 'FOR', 'UNION', 'RETURNING'}
+# Longest composite index the recommender will suggest
+MAX_INDEX_COLUMNS = 4
+# Prisma `$on('query')` logging: "Query: ..." optionally followed by "Duration: 12ms"
+PRISMA_LOG_RE = re.compile(r'^(?:.*?prisma:query\s+|Query:\s*)(?P<sql>.+)$')
+DURATION_RE = re.compile(r'^\s*Duration:\s*(?P<ms>[\d.]+)\s*ms', re.IGNORECASE)
+
+
+def sql_tokens(sql: str) -> list:
+    """Tokenize SQL into (kind, value); dotted identifiers become ('name', parts)."""
+    raw = []
+    for match in SQL_TOKEN_RE.finditer(sql):
+        kind = match.lastgroup
+        if kind is None:
+            continue
+        value = match.group(kind)
+        if kind == 'quoted':
+            raw.append(('ident', value[1:-1].replace('""', '"')))
+        elif kind == 'word':
+            upper = value.upper()
+            raw.append(('word', upper) if upper in SQL_KEYWORDS else ('ident', value))
+        else:
+            raw.append((kind, value))
+
+    tokens = []
+    i = 0
+    while i < len(raw):
+        if raw[i][0] == 'ident':
+            parts = [raw[i][1]]
+            while i + 2 < len(raw) and raw[i + 1] == ('punct', '.') and raw[i + 2][0] == 'ident':
+                parts.append(raw[i + 2][1])
+                i += 2
+            tokens.append(('name', tuple(parts)))
+        else:
+            tokens.append(raw[i])
+        i += 1
+    return tokens
+
+
+def analyze_sql(sql: str) -> dict:
+    """Extract per-table access columns from one statement.
+
+    Returns {table: {'eq': [...], 'range': [...], 'order': [...], 'join': [...]}}
+    with database column names; 'join' holds columns compared to another
+    column. Columns must be qualified unless the statement touches a single
+    table (Prisma always qualifies them).
+    """
+    tokens = sql_tokens(sql)
+    tokens.append(('eof', ''))
+    aliases = {}
+
+    # Tables and their aliases
+    for i, (kind, value) in enumerate(tokens):
+        if kind == 'word' and value in ('FROM', 'JOIN', 'UPDATE', 'INTO') and tokens[i + 1][0] == 'name':
+            table = tokens[i + 1][1][-1]
+            aliases[table] = table
+            j = i + 2
+            if tokens[j] == ('word', 'AS'):
+                j += 1
+            if tokens[j][0] == 'name' and len(tokens[j][1]) == 1:
+                aliases[tokens[j][1][0]] = table
+    tables = set(aliases.values())
+
+    def resolve(parts):
+        if len(parts) >= 2:
+            table = aliases.get(parts[-2])
+            return (table, parts[-1]) if table else None
+        if len(tables) == 1:
+            return next(iter(tables)), parts[0]
+        return None
+
+    access = {}
+
+    def record(column, role):
+        resolved = resolve(column)
+        if resolved is None:
+            return
+        table, name = resolved
+        entry = access.setdefault(table, {'eq': [], 'range': [], 'order': [], 'join': []})
+        if name not in entry[role]:
+            entry[role].append(name)
+
+    depth = 0
+    order_depth = None
+    for i, (kind, value) in enumerate(tokens):
+        if value == '(':
+            depth += 1
+        elif value == ')':
+            depth -= 1
+            if order_depth is not None and depth < order_depth:
+                order_depth = None
+        if kind == 'word' and value == 'ORDER' and tokens[i + 1] == ('word', 'BY'):
+            order_depth = depth
+            continue
+        if order_depth is not None and kind == 'word' and value in ORDER_BY_END:
+            order_depth = None
+        if kind != 'name':
+            continue
+        if order_depth is not None and depth == order_depth:
+            record(value, 'order')
+            continue
+
+        # Skip closing parens, e.g. ("public"."Post"."authorId") IN (...)
+        j = i + 1
+        while tokens[j] == ('punct', ')'):
+            j += 1
+        op = tokens[j][1] if tokens[j][0] in ('op', 'word') else None
+        if op == 'NOT':
+            op = tokens[j + 1][1]
+        if op == '=' and tokens[j + 1][0] == 'name':
+            record(value, 'join')
+            record(tokens[j + 1][1], 'join')
+        elif op in EQUALITY_OPS:
+            record(value, 'eq')
+        elif op in RANGE_OPS:
+            record(value, 'range')
+    return access
+
+
+def read_workload(path: Path) -> list:
+    """Read (sql, weight) pairs from a Prisma query log or a pg_stat_statements CSV.
+
+    Weights are total execution time in ms where the log records it
+    (pg_stat_statements total_exec_time/total_time, Prisma "Duration:" lines),
+    otherwise the number of calls.
+    """
+    queries = []
+    if path.suffix.lower() == '.csv':
+        with path.open(newline='', encoding='utf-8', errors='ignore') as f:
+            for row in csv.DictReader(f):
+                sql = row.get('query')
+                if not sql:
+                    continue
+                for column in ('total_exec_time', 'total_time', 'calls'):
+                    try:
+                        weight = float(row[column])
+                        break
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                else:
+                    weight = 1.0
+                queries.append((sql, weight))
+        return queries
+
+    for line in path.read_text(encoding='utf-8', errors='ignore').splitlines():
+        duration = DURATION_RE.match(line)
+        if duration and queries:
+            queries[-1] = (queries[-1][0], float(duration.group('ms')))
+            continue
+        match = PRISMA_LOG_RE.match(line)
+        sql = match.group('sql') if match else line.strip()
+        if re.match(r'(?i)(SELECT|UPDATE|DELETE|WITH)\b', sql):
+            queries.append((sql, 1.0))
+    return queries
+
+
+def table_lookup(graph: SchemaGraph) -> dict:
+    """Map database table names (exact and lower-cased) to models."""
+    lookup = {}
+    for model in graph.models.values():
+        if model.kind != 'model':
+            continue
+        table = model.db_name or model.name
+        lookup.setdefault(table.lower(), model)
+        lookup[table] = model
+    return lookup
+
+
+def serves(index: Index, eq: tuple, tail: tuple) -> bool:
+    """Whether an index fully answers a query shape (equality columns, then sort/range).
+
+    A unique/id constraint whose columns are all equality-filtered is a point
+    lookup and always serves the query.
+    """
+    if index.kind != 'index' and eq and set(index.fields) <= set(eq):
+        return True
+    if set(index.fields[:len(eq)]) != set(eq):
+        return False
+    return not tail or index.fields[len(eq):len(eq) + 1] == tail[:1]
+
+
+def covering_index(model: Model, index: Index) -> Optional[Index]:
+    """Another index of the model that makes ``index`` redundant, if any.
+
+    That is a longer index starting with the same columns, a unique/id
+    constraint on exactly those columns, or an identical earlier @@index.
+    """
+    position = next(i for i, other in enumerate(model.indexes) if other is index)
+    for i, other in enumerate(model.indexes):
+        if other is index or other.fields[:len(index.fields)] != index.fields:
+            continue
+        if len(other.fields) > len(index.fields) or other.kind != 'index' or i < position:
+            return other
+    return None
+
+
+def recommend_indexes(graphs: dict, queries: list) -> dict:
+    """Rank composite index candidates for a query workload against parsed schema graphs.
+
+    ``graphs`` maps each schema file to its graph. Models are keyed by
+    (schema file, model name), so two services that both define ``User`` are
+    ranked separately; a table defined in several schemas matches each of them.
+
+    Each query's per-table access becomes an Equality-Sort-Range candidate
+    (equality columns ordered by how often the workload filters on them);
+    each join column becomes a single-column candidate for the inner side
+    of a nested-loop join.
+    Shapes already served by a declared index are skipped; candidates that
+    are a prefix of a longer candidate are folded into it.
+    """
+    lookups = [(schema, graph.orm, table_lookup(graph)) for schema, graph in graphs.items()]
+    total_weight = sum(weight for _, weight in queries) or 1.0
+
+    # Resolve every query to (model, eq, sort, range) shapes in field names
+    shapes = []
+    eq_weight = {}
+    used = {}
+    unmatched = 0
+    for sql, weight in queries:
+        access = analyze_sql(sql)
+        matched = False
+        for (table, columns), (schema, orm, tables) in product(access.items(), lookups):
+            model = tables.get(table) or tables.get(table.lower())
+            if model is None:
+                continue
+            matched = True
+            owner = (schema, model.name)
+            by_column = {field.db_name: field.name for field in model.fields.values()}
+            eq = tuple(by_column[c] for c in columns['eq'] if c in by_column)
+            order = tuple(by_column[c] for c in columns['order'] if c in by_column and c not in columns['eq'])
+            rng = tuple(by_column[c] for c in columns['range'] if c in by_column and c not in columns['eq'])
+            joins = tuple(by_column[c] for c in columns['join'] if c in by_column and c not in columns['eq'])
+            used.setdefault(owner, set()).update(eq + order + rng + joins)
+            for column in eq:
+                key = (owner, column)
+                eq_weight[key] = eq_weight.get(key, 0.0) + weight
+            if eq or order or rng:
+                shapes.append((schema, orm, model, eq, order, rng, weight))
+            for column in joins:
+                shapes.append((schema, orm, model, (column,), (), (), weight))
+        if not matched:
+            unmatched += 1
+
+    candidates = {}
+    for schema, orm, model, eq, order, rng, weight in shapes:
+        owner = (schema, model.name)
+        eq = tuple(sorted(eq, key=lambda c: (-eq_weight.get((owner, c), 0.0), c)))
+        tail = order + tuple(c for c in rng if c not in order)
+        columns = (eq + tail)[:MAX_INDEX_COLUMNS]
+        if not columns or any(serves(index, eq, tail) for index in model.indexes):
+            continue
+        key = (owner, columns)
+        entry = candidates.setdefault(key, {'schema': schema, 'model': model.name, 'orm': orm,
+                                            'fields': columns, 'queries': 0, 'weight': 0.0})
+        entry['queries'] += 1
+        entry['weight'] += weight
+
+    # Fold candidates that are a prefix of a longer one into it
+    ranked = sorted(candidates.values(), key=lambda c: -len(c['fields']))
+    kept = []
+    for candidate in ranked:
+        for longer in kept:
+            if ((longer['schema'], longer['model']) == (candidate['schema'], candidate['model'])
+                    and longer['fields'][:len(candidate['fields'])] == candidate['fields']):
+                longer['queries'] += candidate['queries']
+                longer['weight'] += candidate['weight']
+                break
+        else:
+            kept.append(candidate)
+    kept.sort(key=lambda c: -c['weight'])
+    for candidate in kept:
+        candidate['share'] = round(100.0 * candidate['weight'] / total_weight, 1)
+
+    # Declared @@index entries that are redundant, or unused by this workload
+    redundant, unused = [], []
+    for schema, graph in graphs.items():
+        for model in graph.models.values():
+            for index in model.indexes:
+                if index.kind != 'index':
+                    continue
+                other = covering_index(model, index)
+                if other is not None:
+                    covered_by = f"@@{other.kind}([{', '.join(other.fields)}])" if graph.orm == 'prisma' \
+                        else f"{other.kind}({', '.join(other.fields)})"
+                    redundant.append({'schema': schema, 'model': model.name, 'orm': graph.orm,
+                                      'fields': index.fields, 'covered_by': covered_by})
+                fields = used.get((schema, model.name))
+                if fields is not None and index.fields[0] not in fields:
+                    unused.append({'schema': schema, 'model': model.name, 'orm': graph.orm,
+                                   'fields': index.fields})
+
+    return {
+        'queries': len(queries),
+        'unmatched_queries': unmatched,
+        'recommendations': kept,
+        'redundant': redundant,
+        'unused': unused,
+    }
+
+
+def load_graph(schema_type: str, file_path: Path) -> Optional[SchemaGraph]:
+    """Parse a schema file into a graph, or None if it cannot be parsed."""
+    try:
+        content = file_path.read_text(encoding='utf-8', errors='ignore')
+        return parse_prisma(content) if schema_type == 'prisma' else parse_drizzle(content)
+    except (OSError, SchemaParseError):
+        pass
+    return None
+
+
+def index_syntax(item: dict) -> str:
+    return ORM_CONVENTIONS[item['orm']]['index_hint'](item['fields'])
+
+
+def model_label(item: dict) -> str:
+    return f"{item['model']} ({item['schema']})"
+
+
+def print_workload_report(report: dict, workload_files: int, top: int = 15):
+    print("\n" + "="*60)
+    print(f"INDEX RECOMMENDATIONS (workload: {workload_files} file(s), {report['queries']:,} queries)")
+    print("="*60)
+    if report['unmatched_queries']:
+        print(f"({report['unmatched_queries']:,} queries did not touch any known model)")
+    if report['recommendations']:
+        for rank, candidate in enumerate(report['recommendations'][:top], 1):
+            print(f"  {rank}. {model_label(candidate)}: {index_syntax(candidate)} "
+                  f"- {candidate['queries']:,} {'query' if candidate['queries'] == 1 else 'queries'}, "
+                  f"{candidate['share']}% of workload")
+        if len(report['recommendations']) > top:
+            print(f"  ... and {len(report['recommendations']) - top} more")
+    else:
+        print("Every query shape is served by a declared index.")
+    if report['redundant']:
+        print("\nRedundant indexes:")
+        for item in report['redundant']:
+            print(f"  - {model_label(item)}: {index_syntax(item)} "
+                  f"is covered by {item['covered_by']}")
+    if report['unused']:
+        print("\nUnused by this workload:")
+        for item in report['unused']:
+            print(f"  - {model_label(item)}: {index_syntax(item)}")
+
+
+def validate_all(schemas: list, jobs: Optional[int], cache: Optional[dict]) -> tuple:
+    """Validate schema files in parallel, reusing cached results for unchanged files.
+
+    ``cache`` maps a file's absolute path to {'key': cache_key(...), 'issues': [...]};
+    a file whose content changed overwrites its own entry.
+    Returns (issues per file, number of cache hits).
+    """
+    results = [None] * len(schemas)
+    keys = [None] * len(schemas)
+    pending = []
+    for i, (schema_type, file_path) in enumerate(schemas):
+        if cache is not None:
+            try:
+                keys[i] = cache_key(schema_type, file_path)
+            except OSError:
+                pass
+            entry = cache.get(str(file_path))
+            if keys[i] is not None and entry and entry.get('key') == keys[i]:
+                results[i] = entry['issues']
+                continue
+        pending.append(i)
+
+    if len(pending) > 1 and jobs != 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            issues = executor.map(validate_schema, *zip(*(schemas[i] for i in pending)))
+            for i, file_issues in zip(pending, issues):
+                results[i] = file_issues
+    else:
+        for i in pending:
+            results[i] = validate_schema(*schemas[i])
+
+    if cache is not None:
+        for i in pending:
+            if keys[i] is not None:
+                cache[str(schemas[i][1])] = {'key': keys[i], 'issues': results[i]}
+
+    return results, len(schemas) - len(pending)
 
 
 def main():
-    project_path = Path(sys.argv[1] if len(sys.argv) > 1 else ".").resolve()
+    parser = argparse.ArgumentParser(description="Database schema validation")
+    parser.add_argument('project_path', nargs='?', default='.')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Worker processes for validation (default: CPU count)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Re-validate every schema instead of reusing results for unchanged files")
+    parser.add_argument('--cache-file', type=Path, default=DEFAULT_CACHE_PATH,
+                        help=f"Validation cache (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument('--workload', type=Path, action='append', default=[],
+                        help="Query log (Prisma query log, or pg_stat_statements export as .csv) "
+                             "to recommend indexes from; may be repeated")
+    args = parser.parse_args()
+
+    project_path = Path(args.project_path).resolve()
     
     print(f"\n{'='*60}")
     print(f"[SCHEMA VALIDATOR] Database Schema Validation")
@@ -117,20 +1383,23 @@ def main():
         print(json.dumps(output, indent=2))
         sys.exit(0)
     
-    # Validate each schema
+    # Validate all schemas (in parallel, skipping unchanged files)
+    cache = None if args.no_cache else load_cache(args.cache_file)
+    results, cached = validate_all(schemas, args.jobs, cache)
+    if cache is not None:
+        save_cache(args.cache_file, prune_cache(cache, project_path, schemas))
+    if cached:
+        print(f"{cached} unchanged schema(s) reused from cache")
+
     all_issues = []
     
-    for schema_type, file_path in schemas:
-        print(f"\nValidating: {file_path.name} ({schema_type})")
-        
-        if schema_type == 'prisma':
-            issues = validate_prisma_schema(file_path)
-        else:
-            issues = []  # Drizzle validation could be added
+    for (schema_type, file_path), issues in zip(schemas, results):
+        rel_path = file_path.relative_to(project_path).as_posix()
+        print(f"\nValidating: {rel_path} ({schema_type})")
         
         if issues:
             all_issues.append({
-                "file": str(file_path.name),
+                "file": rel_path,
                 "type": schema_type,
                 "issues": issues
             })
@@ -150,6 +1419,22 @@ def main():
     else:
         print("No schema issues found!")
     
+    workload = None
+    if args.workload:
+        graphs = {}
+        for schema_type, file_path in schemas:
+            graph = load_graph(schema_type, file_path)
+            if graph is not None:
+                graphs[file_path.relative_to(project_path).as_posix()] = graph
+        queries = []
+        for log_path in args.workload:
+            try:
+                queries.extend(read_workload(log_path))
+            except OSError as e:
+                print(f"Warning: could not read workload {log_path}: {e}")
+        workload = recommend_indexes(graphs, queries)
+        print_workload_report(workload, len(args.workload))
+
     total_issues = sum(len(item["issues"]) for item in all_issues)
     # Schema issues are warnings, not failures
     passed = True
@@ -162,6 +1447,8 @@ def main():
         "passed": passed,
         "issues": all_issues
     }
+    if workload is not None:
+        output["workload"] = workload
     
     print("\n" + json.dumps(output, indent=2))
     
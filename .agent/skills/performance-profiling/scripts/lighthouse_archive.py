@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Skill: performance-profiling
+Script: lighthouse_archive.py
+Purpose: Keep a compact history of Lighthouse reports and query trends
+Usage: python lighthouse_audit.py --urls urls.txt --archive .lighthouse/archive.sqlite
+       python lighthouse_archive.py trend /dashboard --metric lcp_ms --last 30
+       python lighthouse_archive.py list
+       python lighthouse_archive.py show 42 > report.json
+       python lighthouse_archive.py import reports/*.json
+       python lighthouse_archive.py stats
+Output: JSON
+
+One SQLite file holds everything. Scores and core metrics of every run are
+indexed columns, so trend queries never touch report bodies. Each report is
+trimmed (localized strings, timing entries and audit descriptions dropped)
+and compressed with zstd when the zstandard package is installed, gzip
+otherwise. Screenshots and filmstrip frames are moved into a
+content-addressed blob table, so identical frames across runs are stored once.
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import urllib.parse
+from datetime import datetime
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DEFAULT_ARCHIVE = os.path.join(".lighthouse", "archive.sqlite")
+
+# Indexed per-run columns: name -> Lighthouse audit id (scores come from categories)
+METRIC_COLUMNS = {
+    "lcp_ms": "largest-contentful-paint",
+    "tbt_ms": "total-blocking-time",
+    "cls": "cumulative-layout-shift",
+    "tti_ms": "interactive",
+    "fcp_ms": "first-contentful-paint",
+    "si_ms": "speed-index",
+}
+SCORE_COLUMNS = {
+    "performance": "performance",
+    "accessibility": "accessibility",
+    "best_practices": "best-practices",
+    "seo": "seo",
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    path TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    lighthouse_version TEXT,
+    {", ".join(f"{c} INTEGER" for c in SCORE_COLUMNS)},
+    {", ".join(f"{c} REAL" for c in METRIC_COLUMNS)},
+    total_bytes INTEGER,
+    raw_size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_url_time ON runs (url, fetched_at);
+CREATE INDEX IF NOT EXISTS runs_path_time ON runs (path, fetched_at);
+CREATE TABLE IF NOT EXISTS reports (
+    run_id INTEGER PRIMARY KEY REFERENCES runs (id),
+    codec TEXT NOT NULL,
+    body BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    mime TEXT NOT NULL,
+    data BLOB NOT NULL,
+    refs INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+BLOB_PREFIX = "archive-blob:sha256:"
+
+def archive_path() -> str:
+    return os.environ.get("LIGHTHOUSE_ARCHIVE", DEFAULT_ARCHIVE)
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    path = path or archive_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+def compress(data: bytes) -> tuple:
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=19).compress(data)
+    return "gzip", gzip.compress(data, compresslevel=9)
+
+def decompress(codec: str, body: bytes) -> bytes:
+    if codec == "gzip":
+        return gzip.decompress(body)
+    if zstandard is None:
+        raise RuntimeError("Report is zstd-compressed; install zstandard to read it (pip install zstandard)")
+    return zstandard.ZstdDecompressor().decompress(body)
+
+def store_blob(conn: sqlite3.Connection, data_uri: str) -> str:
+    """Replace a data: URI with a content-addressed blob reference."""
+    header, _, payload = data_uri.partition(",")
+    mime = header[5:].split(";")[0] or "application/octet-stream"
+    data = base64.b64decode(payload) if header.endswith(";base64") else urllib.parse.unquote_to_bytes(payload)
+    digest = hashlib.sha256(data).hexdigest()
+    conn.execute(
+        "INSERT INTO blobs (sha256, mime, data, refs) VALUES (?, ?, ?, 1) "
+        "ON CONFLICT (sha256) DO UPDATE SET refs = refs + 1",
+        (digest, mime, data),
+    )
+    return BLOB_PREFIX + digest
+
+def trim_report(conn: sqlite3.Connection, report: dict) -> dict:
+    """Drop bulky, non-diagnostic parts and move images into the blob table."""
+    report = dict(report)
+    for key in ("i18n", "timing", "stackPacks"):
+        report.pop(key, None)
+    audits = {}
+    for audit_id, audit in report.get("audits", {}).items():
+        audit = {k: v for k, v in audit.items() if k != "description"}
+        details = audit.get("details")
+        if isinstance(details, dict):
+            audit["details"] = extract_images(conn, details)
+        audits[audit_id] = audit
+    report["audits"] = audits
+    return report
+
+def extract_images(conn: sqlite3.Connection, value):
+    """Recursively swap data:image URIs (screenshots, filmstrip frames) for blob refs."""
+    if isinstance(value, dict):
+        return {k: extract_images(conn, v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [extract_images(conn, v) for v in value]
+    if isinstance(value, str) and value.startswith("data:image/"):
+        return store_blob(conn, value)
+    return value
+
+def restore_images(conn: sqlite3.Connection, value):
+    if isinstance(value, dict):
+        return {k: restore_images(conn, v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [restore_images(conn, v) for v in value]
+    if isinstance(value, str) and value.startswith(BLOB_PREFIX):
+        row = conn.execute("SELECT mime, data FROM blobs WHERE sha256 = ?", (value[len(BLOB_PREFIX):],)).fetchone()
+        if row:
+            return f"data:{row[0]};base64,{base64.b64encode(row[1]).decode()}"
+    return value
+
+def fetched_at(report: dict) -> float:
+    try:
+        return datetime.fromisoformat(report["fetchTime"].replace("Z", "+00:00")).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+def store_report(conn: sqlite3.Connection, report: dict, url: Optional[str] = None) -> int:
+    """Archive one full Lighthouse report; returns the run id."""
+    url = url or report.get("requestedUrl") or report.get("finalDisplayedUrl") or report.get("finalUrl", "")
+    audits = report.get("audits", {})
+    categories = report.get("categories", {})
+    scores = [
+        int(round(categories[c]["score"] * 100)) if categories.get(c, {}).get("score") is not None else None
+        for c in SCORE_COLUMNS.values()
+    ]
+    metrics = [audits.get(audit_id, {}).get("numericValue") for audit_id in METRIC_COLUMNS.values()]
+    total_bytes = next((item.get("transferSize") for item in
+                        audits.get("resource-summary", {}).get("details", {}).get("items", [])
+                        if item.get("resourceType") == "total"), None)
+
+    raw = json.dumps(report, separators=(",", ":")).encode()
+    with conn:
+        trimmed = json.dumps(trim_report(conn, report), separators=(",", ":")).encode()
+        codec, body = compress(trimmed)
+        columns = ["url", "path", "fetched_at", "lighthouse_version", *SCORE_COLUMNS, *METRIC_COLUMNS,
+                   "total_bytes", "raw_size", "stored_size"]
+        values = [url, urllib.parse.urlsplit(url).path or "/", fetched_at(report),
+                  report.get("lighthouseVersion"), *scores, *metrics, total_bytes, len(raw), len(body)]
+        cur = conn.execute(
+            f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", values)
+        conn.execute("INSERT INTO reports (run_id, codec, body) VALUES (?, ?, ?)",
+                     (cur.lastrowid, codec, body))
+    return cur.lastrowid
+
+def url_filter(target: str) -> tuple:
+    """A target starting with '/' matches by path across hosts; anything else is an exact URL."""
+    return ("path = ?", target) if target.startswith("/") else ("url = ?", target)
+
+def trend(conn: sqlite3.Connection, target: str, metrics: list, last: int = 30) -> list:
+    """The last N runs for a URL or path, oldest first, from indexed columns only."""
+    for metric in metrics:
+        if metric not in METRIC_COLUMNS and metric not in SCORE_COLUMNS:
+            raise ValueError(f"Unknown metric: {metric}")
+    where, arg = url_filter(target)
+    rows = conn.execute(
+        f"SELECT id, url, fetched_at, {', '.join(metrics)} FROM runs WHERE {where} "
+        "ORDER BY fetched_at DESC LIMIT ?", (arg, last)).fetchall()
+    return [
+        {"id": row[0], "url": row[1],
+         "fetched_at": datetime.fromtimestamp(row[2]).isoformat(timespec="seconds"),
+         **{metric: round(value, 4 if metric == "cls" else 1) if isinstance(value, float) else value
+            for metric, value in zip(metrics, row[3:])}}
+        for row in reversed(rows)
+    ]
+
+def load_report(conn: sqlite3.Connection, run_id: int, with_images: bool = False) -> Optional[dict]:
+    row = conn.execute("SELECT codec, body FROM reports WHERE run_id = ?", (run_id,)).fetchone()
+    if row is None:
+        return None
+    report = json.loads(decompress(row[0], row[1]))
+    return restore_images(conn, report) if with_images else report
+
+def list_urls(conn: sqlite3.Connection) -> list:
+    rows = conn.execute(
+        "SELECT url, COUNT(*), MAX(fetched_at), "
+        "(SELECT performance FROM runs r2 WHERE r2.url = runs.url ORDER BY fetched_at DESC LIMIT 1) "
+        "FROM runs GROUP BY url ORDER BY url").fetchall()
+    return [{"url": url, "runs": count,
+             "latest": datetime.fromtimestamp(latest).isoformat(timespec="seconds"),
+             "latest_performance": perf}
+            for url, count, latest, perf in rows]
+
+def archive_stats(conn: sqlite3.Connection) -> dict:
+    runs, raw, stored = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(stored_size), 0) FROM runs").fetchone()
+    blobs, blob_bytes, refs = conn.execute(
+        "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0), COALESCE(SUM(refs), 0) FROM blobs").fetchone()
+    codecs = dict(conn.execute("SELECT codec, COUNT(*) FROM reports GROUP BY codec").fetchall())
+    return {
+        "runs": runs,
+        "urls": conn.execute("SELECT COUNT(DISTINCT url) FROM runs").fetchone()[0],
+        "raw_report_bytes": raw,
+        "stored_report_bytes": stored,
+        "blobs": blobs,
+        "blob_bytes": blob_bytes,
+        "blob_references": refs,
+        "compression_ratio": round(raw / (stored + blob_bytes), 1) if stored + blob_bytes else None,
+        "codecs": codecs,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Lighthouse report archive")
+    parser.add_argument("--archive", default=archive_path(), help="Path to the SQLite archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    trend_cmd = sub.add_parser("trend", help="Metric history for a URL or a path such as /dashboard")
+    trend_cmd.add_argument("target")
+    trend_cmd.add_argument("--metric", action="append",
+                           choices=[*SCORE_COLUMNS, *METRIC_COLUMNS], help="Repeatable (default: lcp_ms)")
+    trend_cmd.add_argument("--last", type=int, default=30)
+
+    sub.add_parser("list", help="Archived URLs with run counts")
+
+    show = sub.add_parser("show", help="Print an archived report")
+    show.add_argument("run_id", type=int)
+    show.add_argument("--with-images", action="store_true", help="Inline screenshots as data URIs again")
+
+    import_cmd = sub.add_parser("import", help="Archive existing Lighthouse JSON reports")
+    import_cmd.add_argument("files", nargs="+")
+
+    sub.add_parser("stats", help="Archive size and deduplication figures")
+
+    args = parser.parse_args()
+    conn = connect(args.archive)
+    try:
+        if args.command == "trend":
+            result = trend(conn, args.target, args.metric or ["lcp_ms"], args.last)
+        elif args.command == "list":
+            result = list_urls(conn)
+        elif args.command == "show":
+            result = load_report(conn, args.run_id, args.with_images)
+            if result is None:
+                print(json.dumps({"error": f"No archived run {args.run_id}"}))
+                sys.exit(1)
+        elif args.command == "import":
+            ids = []
+            for path in args.files:
+                with open(path, "r") as f:
+                    ids.append(store_report(conn, json.load(f)))
+            result = {"imported": len(ids), "run_ids": ids}
+        else:
+            result = archive_stats(conn)
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
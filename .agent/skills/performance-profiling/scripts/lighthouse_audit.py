@@ -2,64 +2,154 @@
 """
 Skill: performance-profiling
 Script: lighthouse_audit.py
-Purpose: Run Lighthouse performance audit on a URL
+Purpose: Run Lighthouse performance audit on one URL or a batch of URLs
 Usage: python lighthouse_audit.py https://example.com
-Output: JSON with performance scores
+       python lighthouse_audit.py --urls urls.txt --workers 4 --format csv --output report.csv
+       python lighthouse_audit.py --sitemap https://example.com/sitemap.xml
+       python lighthouse_audit.py https://example.com --runs 5 --baseline baseline.json
+       python lighthouse_audit.py --urls urls.txt --budget budget.json --baseline-reports reports/
+       python lighthouse_audit.py --urls urls.txt --archive .lighthouse/archive.sqlite
+Output: JSON with performance scores (batch mode: JSON or CSV report with
+        scores and LCP/TBT/CLS/TTI per URL; with --runs N the median, p75 and
+        stddev of every score and metric over N runs; with --budget the
+        violations found in the full report, with --baseline-reports a diff
+        of metrics, resource bytes and opportunities against stored reports)
 Note: Requires lighthouse CLI (npm install -g lighthouse)
 """
+import argparse
+import csv
+import fnmatch
+import math
 import subprocess
 import json
+import queue
+import random
+import shutil
+import statistics
 import sys
 import os
 import tempfile
+import time
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
 
-def run_lighthouse(url: str) -> dict:
-    """Run Lighthouse audit on URL."""
+CATEGORIES = {
+    "performance": "performance",
+    "accessibility": "accessibility",
+    "best_practices": "best-practices",
+    "seo": "seo",
+}
+
+# Report key -> Lighthouse audit id; timings are in ms, CLS is unitless
+METRICS = {
+    "lcp_ms": "largest-contentful-paint",
+    "tbt_ms": "total-blocking-time",
+    "cls": "cumulative-layout-shift",
+    "tti_ms": "interactive",
+}
+
+CSV_COLUMNS = ["url", *CATEGORIES, *METRICS, "duration_s", "error"]
+
+# Budget timing names: the report keys above, Lighthouse audit ids and the
+# metric names used by Lighthouse's own budget.json
+BUDGET_TIMINGS = {
+    **METRICS,
+    **{audit_id: audit_id for audit_id in METRICS.values()},
+    "first-contentful-paint": "first-contentful-paint",
+    "speed-index": "speed-index",
+    "max-potential-fid": "max-potential-fid",
+    "fcp_ms": "first-contentful-paint",
+}
+
+# Opportunity audits whose savings are diffed against the baseline report
+DIFF_OPPORTUNITIES = ("render-blocking-resources", "unused-javascript", "unused-css-rules",
+                      "unminified-javascript", "modern-image-formats", "uses-text-compression")
+
+# Lighthouse's own median-run choice: the run closest to the median FCP and TTI
+MEDIAN_RUN_AUDITS = ("first-contentful-paint", "interactive")
+
+# A run is only discarded when its performance score is this many points
+# outside the quartiles as well: with 3-5 runs of a near-constant integer
+# score the IQR is often 0 or 1, and Tukey's fences alone would drop
+# ordinary runs
+OUTLIER_MIN_SPREAD = 10
+
+# Shuffles sampled by the permutation test when exact enumeration is larger
+PERMUTATION_LIMIT = 20000
+
+
+def run_lighthouse(url: str, user_data_dir: str = None, timeout: int = 120,
+                   keep_report: bool = False) -> dict:
+    """Run Lighthouse audit on URL (keep_report attaches the full report as "report")."""
+    chrome_flags = "--headless"
+    if user_data_dir:
+        chrome_flags += f" --user-data-dir={user_data_dir}"
     try:
         with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
             output_path = f.name
-        
+
         result = subprocess.run(
             [
                 "lighthouse",
                 url,
                 "--output=json",
                 f"--output-path={output_path}",
-                "--chrome-flags=--headless",
+                f"--chrome-flags={chrome_flags}",
                 "--only-categories=performance,accessibility,best-practices,seo"
             ],
             capture_output=True,
             text=True,
-            timeout=120
+            timeout=timeout
         )
-        
-        if os.path.exists(output_path):
+
+        if os.path.exists(output_path) and os.path.getsize(output_path):
             with open(output_path, 'r') as f:
                 report = json.load(f)
             os.unlink(output_path)
-            
+
             categories = report.get("categories", {})
-            return {
+            result = {
                 "url": url,
-                "scores": {
-                    "performance": int(categories.get("performance", {}).get("score", 0) * 100),
-                    "accessibility": int(categories.get("accessibility", {}).get("score", 0) * 100),
-                    "best_practices": int(categories.get("best-practices", {}).get("score", 0) * 100),
-                    "seo": int(categories.get("seo", {}).get("score", 0) * 100)
-                },
+                "scores": extract_scores(categories),
+                "metrics": extract_metrics(report.get("audits", {})),
                 "summary": get_summary(categories)
             }
+            if keep_report:
+                result["report"] = report
+            return result
         else:
+            if os.path.exists(output_path):
+                os.unlink(output_path)
             return {"error": "Lighthouse failed to generate report", "stderr": result.stderr[:500]}
-            
+
     except subprocess.TimeoutExpired:
         return {"error": "Lighthouse audit timed out"}
     except FileNotFoundError:
         return {"error": "Lighthouse CLI not found. Install with: npm install -g lighthouse"}
+    except json.JSONDecodeError as e:
+        return {"error": f"Unreadable Lighthouse report: {e}"}
+
+def extract_scores(categories: dict) -> dict:
+    """Category scores as 0-100 ints (0 when Lighthouse could not score a category)."""
+    return {
+        key: int((categories.get(category, {}).get("score") or 0) * 100)
+        for key, category in CATEGORIES.items()
+    }
+
+def extract_metrics(audits: dict) -> dict:
+    """Core metrics from the report audits; None when an audit did not run."""
+    metrics = {}
+    for key, audit_id in METRICS.items():
+        value = audits.get(audit_id, {}).get("numericValue")
+        metrics[key] = round(value, 4 if key == "cls" else 1) if value is not None else None
+    return metrics
 
 def get_summary(categories: dict) -> str:
     """Generate summary based on scores."""
-    perf = categories.get("performance", {}).get("score", 0) * 100
+    perf = (categories.get("performance", {}).get("score") or 0) * 100
     if perf >= 90:
         return "[OK] Excellent performance"
     elif perf >= 50:
@@ -67,10 +157,532 @@ def get_summary(categories: dict) -> str:
     else:
         return "[X] Poor performance"
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print(json.dumps({"error": "Usage: python lighthouse_audit.py <url>"}))
+def read_sitemap(source: str) -> list:
+    """<loc> URLs from a sitemap file or URL; sitemap indexes are followed."""
+    if source.startswith(("http://", "https://")):
+        with urllib.request.urlopen(source, timeout=30) as response:
+            content = response.read()
+    else:
+        with open(source, 'rb') as f:
+            content = f.read()
+    root = ET.fromstring(content)
+    locs = [el.text.strip() for el in root.iter() if el.tag.rsplit('}', 1)[-1] == "loc" and el.text]
+    if root.tag.rsplit('}', 1)[-1] == "sitemapindex":
+        return [url for loc in locs for url in read_sitemap(loc)]
+    return locs
+
+def read_url_list(path: str) -> list:
+    """One URL per line; blank lines and # comments are ignored."""
+    with open(path, 'r') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def run_batch(urls: list, workers: int = 4, timeout: int = 120, keep_report: bool = False,
+              runs: int = 1) -> list:
+    """Audit URLs with a bounded worker pool, results in input order.
+
+    Each worker owns one Chrome user-data-dir for the whole batch so
+    concurrent Chrome instances never share profile state. The runs of one
+    URL are audited one after another by the same worker (results[i * runs:
+    (i + 1) * runs] belong to urls[i]), so they never compete with each
+    other for CPU and their spread is not inflated.
+    """
+    workers = max(1, min(workers, len(urls)))
+    profiles = queue.Queue()
+    base_dir = tempfile.mkdtemp(prefix="lighthouse-profiles-")
+    for i in range(workers):
+        path = os.path.join(base_dir, f"worker-{i}")
+        os.makedirs(path)
+        profiles.put(path)
+
+    def audit(url: str) -> list:
+        profile = profiles.get()
+        try:
+            results = []
+            for _ in range(runs):
+                start = time.monotonic()
+                result = run_lighthouse(url, user_data_dir=profile, timeout=timeout, keep_report=keep_report)
+                result.setdefault("url", url)
+                result["duration_s"] = round(time.monotonic() - start, 2)
+                print(f"[{'OK' if 'error' not in result else 'FAIL'}] {url} ({result['duration_s']}s)",
+                      file=sys.stderr, flush=True)
+                results.append(result)
+            return results
+        finally:
+            profiles.put(profile)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return [result for results in executor.map(audit, urls) for result in results]
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+def percentile(values: list, pct: float) -> float:
+    """Linear-interpolated percentile of a non-empty list."""
+    values = sorted(values)
+    pos = (len(values) - 1) * pct / 100
+    low = int(pos)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (pos - low)
+
+def outlier_runs(values: list, min_spread: float = 0.0) -> set:
+    """Indexes of values outside Tukey's fences (1.5 x IQR, but at least min_spread); needs 4+ samples."""
+    if len(values) < 4:
+        return set()
+    q1, q3 = percentile(values, 25), percentile(values, 75)
+    spread = max(1.5 * (q3 - q1), min_spread)
+    low, high = q1 - spread, q3 + spread
+    return {i for i, v in enumerate(values) if v < low or v > high}
+
+def median_run(reports: list) -> int:
+    """Index of the run closest to the median FCP and TTI, as Lighthouse CI picks it."""
+    medians = {}
+    for audit_id in MEDIAN_RUN_AUDITS:
+        values = [r.get("audits", {}).get(audit_id, {}).get("numericValue") for r in reports]
+        if None not in values:
+            medians[audit_id] = statistics.median(values)
+
+    def distance(i):
+        audits = reports[i].get("audits", {})
+        return sum(((audits[a]["numericValue"] - m) / (m or 1)) ** 2 for a, m in medians.items())
+
+    return min(range(len(reports)), key=distance)
+
+def describe(samples: list) -> dict:
+    return {
+        "median": round(statistics.median(samples), 4),
+        "p75": round(percentile(samples, 75), 4),
+        "stddev": round(statistics.stdev(samples), 4) if len(samples) > 1 else 0.0,
+        "min": min(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+def aggregate_runs(url: str, runs: list) -> dict:
+    """Fold N runs of one URL into per-score/metric statistics.
+
+    Runs whose performance score lies outside Tukey's fences (at least
+    OUTLIER_MIN_SPREAD points beyond the quartiles) are discarded first; the
+    remaining run closest to the median supplies the report used for
+    diagnostics (summary, and the full report when kept).
+    """
+    ok = [r for r in runs if "error" not in r]
+    if not ok:
+        return {"url": url, "runs": len(runs), "error": runs[-1]["error"] if runs else "No runs"}
+    outliers = outlier_runs([r["scores"]["performance"] for r in ok], OUTLIER_MIN_SPREAD)
+    kept = [r for i, r in enumerate(ok) if i not in outliers]
+
+    stats = {}
+    for group in ("scores", "metrics"):
+        for key in (CATEGORIES if group == "scores" else METRICS):
+            samples = [r[group][key] for r in kept if r[group].get(key) is not None]
+            if samples:
+                stats[key] = describe(samples)
+
+    chosen = kept[median_run([r.get("report", {}) for r in kept])]
+    result = {
+        "url": url,
+        "runs": len(runs),
+        "failed_runs": len(runs) - len(ok),
+        "outliers_discarded": len(outliers),
+        "scores": {key: int(round(stats[key]["median"])) for key in CATEGORIES if key in stats},
+        "metrics": {key: stats[key]["median"] if key in stats else None for key in METRICS},
+        "stats": stats,
+        "summary": chosen["summary"],
+        "median_run_metrics": chosen["metrics"],
+        "duration_s": round(sum(r.get("duration_s", 0) for r in runs), 2),
+    }
+    if any("archive_run_id" in r for r in runs):
+        result["archive_run_ids"] = [r["archive_run_id"] for r in runs if "archive_run_id" in r]
+    if "report" in chosen:
+        result["report"] = chosen["report"]
+    return result
+
+def permutation_p_value(baseline: list, current: list, worse: int, limit: int = PERMUTATION_LIMIT) -> float:
+    """One-sided p-value that current's mean is worse than baseline's by chance.
+
+    worse is +1 when larger values are worse (timings), -1 when smaller are
+    (scores). Exact over all splits when feasible, otherwise a seeded
+    Monte Carlo sample of `limit` shuffles.
+    """
+    pooled = baseline + current
+    n = len(current)
+    observed = sum(current)
+
+    # The pooled total is fixed, so a split's mean difference grows with the
+    # sum it assigns to "current": compare sums, counting ties with a relative
+    # tolerance since the same values summed in another order can round apart
+    def as_extreme(picked_sum):
+        return worse * (picked_sum - observed) > 0 or math.isclose(picked_sum, observed, rel_tol=1e-9)
+
+    exact = math.comb(len(pooled), n)
+    if exact <= limit:
+        return sum(1 for c in combinations(pooled, n) if as_extreme(sum(c))) / exact
+    rng = random.Random(0)
+    extreme = sum(1 for _ in range(limit) if as_extreme(sum(rng.sample(pooled, n))))
+    return (extreme + 1) / (limit + 1)  # The observed split counts, so p is never 0
+
+def min_p_value(n_baseline: int, n_current: int, limit: int = PERMUTATION_LIMIT) -> float:
+    """Smallest p-value permutation_p_value can return for these sample sizes."""
+    exact = math.comb(n_baseline + n_current, n_current)
+    return 1 / exact if exact <= limit else 1 / (limit + 1)
+
+def underpowered(baseline: dict, urls: list, runs: int, alpha: float) -> list:
+    """(url, baseline runs, keys) for URLs where `runs` new runs can never show a regression.
+
+    That is when even the most extreme split's p-value misses the first Holm
+    threshold, alpha / keys, for the keys the baseline has samples for.
+    """
+    found = []
+    for result in baseline.get("results", []):
+        if result.get("url") not in urls:
+            continue
+        sizes = [len(s["samples"]) for s in result.get("stats", {}).values() if len(s["samples"]) >= 2]
+        if sizes and (runs < 2 or min_p_value(max(sizes), runs) >= alpha / len(sizes)):
+            found.append((result["url"], max(sizes), len(sizes)))
+    return found
+
+def compare_to_baseline(results: list, baseline: dict, alpha: float = 0.05) -> list:
+    """Per-URL score/metric changes versus a baseline report from --runs mode.
+
+    A change is a regression only when it is in the worse direction and a
+    permutation test puts it below alpha after Holm-Bonferroni correction
+    across that URL's keys, so run-to-run noise does not fail the check.
+    Keys whose samples are all equal in both reports are not tested and do
+    not count towards the correction.
+    """
+    previous = {r["url"]: r.get("stats", {}) for r in baseline.get("results", [])}
+    changes = []
+    for result in results:
+        before_stats = previous.get(result["url"])
+        if before_stats is None:
+            continue
+        tested = []
+        for key, now in result.get("stats", {}).items():
+            before = before_stats.get(key)
+            if not before or len(before["samples"]) < 2 or len(now["samples"]) < 2:
+                continue
+            pooled = before["samples"] + now["samples"]
+            if min(pooled) == max(pooled):
+                continue
+            worse = -1 if key in CATEGORIES else 1
+            p_value = permutation_p_value(before["samples"], now["samples"], worse)
+            delta = now["median"] - before["median"]
+            tested.append({
+                "url": result["url"],
+                "key": key,
+                "baseline_median": before["median"],
+                "median": now["median"],
+                "change": round(delta, 4),
+                "p_value": p_value,
+                "worse": worse * delta > 0,
+            })
+
+        # Holm-Bonferroni: step down through the p-values, stop at the first miss
+        rejecting = True
+        for rank, change in enumerate(sorted(tested, key=lambda c: c["p_value"])):
+            worse = change.pop("worse")
+            rejecting = rejecting and change["p_value"] < alpha / (len(tested) - rank)
+            change["regression"] = rejecting and worse
+            change["p_value"] = round(change["p_value"], 4)
+        changes += tested
+    return changes
+
+def report_path(report_dir: str, url: str) -> str:
+    slug = "".join(c if c.isalnum() else "_" for c in url.split("://", 1)[-1]).strip("_")
+    return os.path.join(report_dir, f"{slug or 'index'}.json")
+
+def load_budgets(path: str) -> list:
+    """Read a Lighthouse budget.json: a list of budgets, each optionally scoped by "path".
+
+    Supported keys per budget: "timings" ([{"metric", "budget"}], ms; CLS
+    unitless), "resourceSizes" ([{"resourceType", "budget"}], KB of transfer
+    size), "resourceCounts" ([{"resourceType", "budget"}], requests) and
+    "scores" ([{"category", "minimum"}], 0-100).
+    """
+    with open(path, 'r') as f:
+        budgets = json.load(f)
+    if isinstance(budgets, dict):
+        budgets = [budgets]
+    for budget in budgets:
+        for timing in budget.get("timings", []):
+            if timing.get("metric") not in BUDGET_TIMINGS:
+                raise ValueError(f"Unknown budget metric: {timing.get('metric')!r}")
+        for score in budget.get("scores", []):
+            if score.get("category") not in CATEGORIES:
+                raise ValueError(f"Unknown budget category: {score.get('category')!r}")
+    return budgets
+
+def budget_for(budgets: list, url: str):
+    """The last budget whose path pattern matches the URL path (Lighthouse's rule)."""
+    path = urllib.parse.urlsplit(url).path or "/"
+    matching = [b for b in budgets if fnmatch.fnmatchcase(path, b.get("path", "/*"))]
+    return matching[-1] if matching else None
+
+def resource_summary(report: dict) -> dict:
+    """Transfer bytes and request counts per resource type from the resource-summary audit."""
+    items = report.get("audits", {}).get("resource-summary", {}).get("details", {}).get("items", [])
+    return {
+        item["resourceType"]: {"bytes": item.get("transferSize", 0), "requests": item.get("requestCount", 0)}
+        for item in items if "resourceType" in item
+    }
+
+def opportunities(report: dict) -> dict:
+    """Savings and offending URLs of the diffed opportunity audits."""
+    audits = report.get("audits", {})
+    found = {}
+    for audit_id in DIFF_OPPORTUNITIES:
+        details = audits.get(audit_id, {}).get("details") or {}
+        if not details:
+            continue
+        items = details.get("items", [])
+        found[audit_id] = {
+            "savings_ms": details.get("overallSavingsMs", 0),
+            "savings_bytes": details.get("overallSavingsBytes",
+                                         sum(item.get("wastedBytes", 0) for item in items)),
+            "urls": sorted(item["url"] for item in items if isinstance(item.get("url"), str)),
+        }
+    return found
+
+def evaluate_budget(report: dict, budget: dict) -> list:
+    """Budget violations in a full Lighthouse report."""
+    audits = report.get("audits", {})
+    scores = extract_scores(report.get("categories", {}))
+    resources = resource_summary(report)
+    violations = []
+
+    def check(kind, key, limit, actual, over):
+        if actual is not None and over:
+            violations.append({"kind": kind, "key": key, "budget": limit, "actual": actual,
+                               "over": round(actual - limit, 4)})
+
+    for timing in budget.get("timings", []):
+        audit_id = BUDGET_TIMINGS[timing["metric"]]
+        value = audits.get(audit_id, {}).get("numericValue")
+        actual = round(value, 4 if audit_id == "cumulative-layout-shift" else 1) if value is not None else None
+        check("timing", timing["metric"], timing["budget"], actual,
+              actual is not None and actual > timing["budget"])
+    for size in budget.get("resourceSizes", []):
+        kb = resources.get(size["resourceType"], {}).get("bytes")
+        actual = round(kb / 1024, 1) if kb is not None else None
+        check("resourceSize", size["resourceType"], size["budget"], actual,
+              actual is not None and actual > size["budget"])
+    for count in budget.get("resourceCounts", []):
+        actual = resources.get(count["resourceType"], {}).get("requests")
+        check("resourceCount", count["resourceType"], count["budget"], actual,
+              actual is not None and actual > count["budget"])
+    for score in budget.get("scores", []):
+        actual = scores[score["category"]]
+        check("score", score["category"], score["minimum"], actual, actual < score["minimum"])
+    return violations
+
+def diff_reports(baseline: dict, current: dict, tolerance: float = 10.0) -> dict:
+    """Structured diff of two full reports.
+
+    Metrics, resource transfer sizes and opportunity savings are compared;
+    an entry is a regression when it got worse by more than `tolerance`
+    percent. New render-blocking or unused-JS URLs are listed by audit.
+    """
+    def entry(before, after, higher_is_worse=True):
+        delta = after - before
+        pct = round(100.0 * delta / before, 1) if before else (0.0 if not delta else None)
+        worse = delta > 0 if higher_is_worse else delta < 0
+        return {"baseline": before, "current": after, "delta": round(delta, 4), "pct": pct,
+                "regression": worse and (pct is None or abs(pct) > tolerance)}
+
+    diff = {"scores": {}, "metrics": {}, "resources": {}, "opportunities": {}}
+    before_scores = extract_scores(baseline.get("categories", {}))
+    for key, value in extract_scores(current.get("categories", {})).items():
+        diff["scores"][key] = entry(before_scores[key], value, higher_is_worse=False)
+    before_audits, after_audits = baseline.get("audits", {}), current.get("audits", {})
+    for audit_id in dict.fromkeys(BUDGET_TIMINGS.values()):
+        before = before_audits.get(audit_id, {}).get("numericValue")
+        after = after_audits.get(audit_id, {}).get("numericValue")
+        if before is not None and after is not None:
+            diff["metrics"][audit_id] = entry(round(before, 4), round(after, 4))
+    before_resources = resource_summary(baseline)
+    for resource_type, now in resource_summary(current).items():
+        if resource_type in before_resources:
+            diff["resources"][resource_type] = entry(before_resources[resource_type]["bytes"], now["bytes"])
+    before_opps = opportunities(baseline)
+    for audit_id, now in opportunities(current).items():
+        before = before_opps.get(audit_id, {"savings_ms": 0, "savings_bytes": 0, "urls": []})
+        diff["opportunities"][audit_id] = {
+            "savings_ms": entry(before["savings_ms"], now["savings_ms"]),
+            "savings_bytes": entry(before["savings_bytes"], now["savings_bytes"]),
+            "new_urls": [url for url in now["urls"] if url not in before["urls"]],
+        }
+    diff["regressions"] = sum(
+        1 for section in ("scores", "metrics", "resources") for e in diff[section].values() if e["regression"]
+    ) + sum(1 for o in diff["opportunities"].values()
+            if o["savings_ms"]["regression"] or o["savings_bytes"]["regression"])
+    return diff
+
+def load_baseline_report(source: str, url: str):
+    """Stored baseline report for URL: a report file, or a --save-reports directory."""
+    path = report_path(source, url) if os.path.isdir(source) else source
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def batch_report(results: list, workers: int, elapsed: float) -> dict:
+    return {
+        "urls": len(results),
+        "failed": sum(1 for r in results if "error" in r),
+        "workers": workers,
+        "elapsed_s": round(elapsed, 2),
+        "results": results,
+    }
+
+def write_csv(results: list, out):
+    columns = list(CSV_COLUMNS)
+    if any("stats" in r for r in results):
+        spread = [f"{key}_{stat}" for key in (*CATEGORIES, *METRICS) for stat in ("p75", "stddev")]
+        columns[-2:-2] = ["runs", "outliers_discarded", *spread]
+    writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for r in results:
+        row = {"url": r.get("url"), "duration_s": r.get("duration_s"), "error": r.get("error", ""),
+               "runs": r.get("runs"), "outliers_discarded": r.get("outliers_discarded")}
+        row.update(r.get("scores", {}))
+        row.update(r.get("metrics", {}))
+        for key, stat in r.get("stats", {}).items():
+            row[f"{key}_p75"] = stat["p75"]
+            row[f"{key}_stddev"] = stat["stddev"]
+        writer.writerow(row)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Lighthouse audits on one URL or a batch of URLs")
+    parser.add_argument("url", nargs="?", help="Single URL to audit")
+    parser.add_argument("--urls", help="File with one URL per line")
+    parser.add_argument("--sitemap", help="sitemap.xml path or URL")
+    parser.add_argument("-w", "--workers", type=int, default=4,
+                        help="Concurrent Lighthouse runs in batch mode (default: 4)")
+    parser.add_argument("--timeout", type=int, default=120, help="Seconds per audit (default: 120)")
+    parser.add_argument("--format", choices=["json", "csv"], default="json", help="Batch report format")
+    parser.add_argument("-o", "--output", help="Write the report here instead of stdout")
+    parser.add_argument("-n", "--runs", type=int, default=1,
+                        help="Runs per URL; reports median, p75 and stddev (default: 1)")
+    parser.add_argument("--save-reports", metavar="DIR",
+                        help="Write each URL's median-run Lighthouse report into DIR")
+    parser.add_argument("--baseline", help="Earlier --runs JSON report to test for regressions")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="Significance level for baseline regressions, Holm-corrected per URL (default: 0.05)")
+    parser.add_argument("--budget", help="Lighthouse budget.json to enforce")
+    parser.add_argument("--baseline-reports", metavar="PATH",
+                        help="Stored report (or --save-reports directory) to diff the full reports against")
+    parser.add_argument("--tolerance", type=float, default=10.0,
+                        help="Percent a diffed value may worsen before it counts as a regression (default: 10)")
+    parser.add_argument("--archive", metavar="PATH",
+                        help="Store every run's report in this archive (see lighthouse_archive.py)")
+    args = parser.parse_args()
+
+    if not (args.url or args.urls or args.sitemap):
+        print(json.dumps({"error": "Usage: python lighthouse_audit.py <url> | --urls FILE | --sitemap FILE"}))
+        sys.exit(1)
+
+    budgets = None
+    if args.budget:
+        try:
+            budgets = load_budgets(args.budget)
+        except (OSError, ValueError) as e:
+            print(json.dumps({"error": f"Invalid budget file: {e}"}))
+            sys.exit(1)
+
+    # The single-URL fast path prints one summary to stdout; any output, gating
+    # or archive option needs the batch path
+    needs_batch = (args.output or args.format != "json" or args.save_reports or args.baseline
+                   or budgets is not None or args.baseline_reports or args.archive)
+    if args.url and not (args.urls or args.sitemap) and args.runs == 1 and not needs_batch:
+        print(json.dumps(run_lighthouse(args.url, timeout=args.timeout), indent=2))
+        return
+
+    urls = [args.url] if args.url else []
+    if args.urls:
+        urls += read_url_list(args.urls)
+    if args.sitemap:
+        urls += read_sitemap(args.sitemap)
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        print(json.dumps({"error": "No URLs to audit"}))
         sys.exit(1)
-    
-    result = run_lighthouse(sys.argv[1])
-    print(json.dumps(result, indent=2))
+
+    runs = max(1, args.runs)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        # Refuse before spending minutes on audits whose regressions could never be significant
+        for url, baseline_runs, keys in underpowered(baseline, urls, runs, args.alpha):
+            needed = next((n for n in range(2, 51) if min_p_value(baseline_runs, n) < args.alpha / keys), None)
+            hint = f"use --runs {needed} or more" if needed else "record a baseline with more runs"
+            parser.error(f"--runs {runs} against the {baseline_runs}-run baseline for {url} can never reach "
+                         f"p < {args.alpha}/{keys} after correction; {hint}")
+
+    start = time.monotonic()
+    results = run_batch(urls, workers=args.workers, timeout=args.timeout, runs=runs,
+                        keep_report=runs > 1 or bool(args.save_reports or budgets is not None
+                                                     or args.baseline_reports or args.archive))
+    elapsed = time.monotonic() - start
+    if args.archive:
+        from lighthouse_archive import connect, store_report
+        conn = connect(args.archive)
+        try:
+            for result in results:
+                if "report" in result:
+                    result["archive_run_id"] = store_report(conn, result["report"], result["url"])
+        finally:
+            conn.close()
+    if runs > 1:
+        results = [aggregate_runs(url, results[i * runs:(i + 1) * runs]) for i, url in enumerate(urls)]
+
+    failures = 0
+    for result in results:
+        report = result.pop("report", None)
+        if report is not None and budgets is not None:
+            budget = budget_for(budgets, result["url"])
+            if budget is not None:
+                violations = evaluate_budget(report, budget)
+                result["budget"] = {"path": budget.get("path", "/*"), "passed": not violations,
+                                    "violations": violations}
+                failures += bool(violations)
+                for v in violations:
+                    print(f"[BUDGET] {result['url']} {v['kind']} {v['key']}: {v['actual']} "
+                          f"(budget {v['budget']})", file=sys.stderr)
+        if report is not None and args.baseline_reports:
+            baseline_report = load_baseline_report(args.baseline_reports, result["url"])
+            if baseline_report is not None:
+                result["diff"] = diff_reports(baseline_report, report, args.tolerance)
+                failures += bool(result["diff"]["regressions"])
+        if args.save_reports and report is not None:
+            os.makedirs(args.save_reports, exist_ok=True)
+            result["report_path"] = report_path(args.save_reports, result["url"])
+            with open(result["report_path"], 'w') as f:
+                json.dump(report, f)
+
+    output = batch_report(results, min(args.workers, len(urls)), elapsed)
+    if budgets is not None or args.baseline_reports:
+        output["gate_failures"] = failures
+    regressions = []
+    if baseline is not None:
+        output["baseline"] = compare_to_baseline(results, baseline, args.alpha)
+        regressions = [c for c in output["baseline"] if c["regression"]]
+        output["regressions"] = len(regressions)
+        for change in regressions:
+            print(f"[REGRESSION] {change['url']} {change['key']}: {change['baseline_median']} -> "
+                  f"{change['median']} (p={change['p_value']})", file=sys.stderr)
+
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(results, out)
+        else:
+            json.dump(output, out, indent=2)
+            out.write("\n")
+    finally:
+        if args.output:
+            out.close()
+    sys.exit(1 if regressions or failures or any("error" in r for r in results) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,144 @@ Analyze token usage from Claude Code session transcripts.
 Breaks down usage by main session and individual subagents.
 """
 
+import argparse
+import csv
+import glob
+import hashlib
+import heapq
 import json
+import os
+import sqlite3
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from itertools import count, repeat
 from pathlib import Path
 from collections import defaultdict
 
-def analyze_main_session(filepath):
-    """Analyze a session file and return token usage broken down by agent."""
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+USAGE_FIELDS = ('input_tokens', 'output_tokens', 'cache_creation', 'cache_read', 'messages')
+
+# Only lines containing one of these byte strings can affect the totals:
+# main-session records have "type":"assistant", subagent results carry a
+# "toolUseResult" key. Anything else is skipped without being decoded.
+CANDIDATE_MARKERS = (b'"assistant"', b'"toolUseResult"')
+
+READ_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Per-million-token prices in dollars. Models are matched by the longest
+# name prefix; 'default' covers everything else, including subagents whose
+# model is not recorded. Override or extend with --pricing FILE.json.
+PRICE_FIELDS = ('input', 'output', 'cache_creation', 'cache_read')
+DEFAULT_PRICING = {
+    'default': {'input': 3.0, 'output': 15.0, 'cache_creation': 3.75, 'cache_read': 0.30},
+    'claude-opus': {'input': 15.0, 'output': 75.0, 'cache_creation': 18.75, 'cache_read': 1.50},
+    'claude-sonnet': {'input': 3.0, 'output': 15.0, 'cache_creation': 3.75, 'cache_read': 0.30},
+    'claude-haiku': {'input': 1.0, 'output': 5.0, 'cache_creation': 1.25, 'cache_read': 0.10},
+}
+
+# Analytics bucket windows: (prefix length of a '...Z' timestamp, suffix)
+BUCKET_WINDOWS = {'minute': (16, ''), 'hour': (13, ':00'), 'day': (10, '')}
+ANALYTICS_COLUMNS = ('bucket', 'agent', 'model') + USAGE_FIELDS + ('cost',)
+
+# Cross-session index (--db). Sessions are keyed by resolved path, per-agent
+# rows by (session, agentId); the indexes back the TOP_QUERIES ORDER BYs.
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    session TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    lines INTEGER NOT NULL,
+    malformed INTEGER NOT NULL,
+    first_ts TEXT,
+    last_ts TEXT,
+    cost REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS agent_usage (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    agent TEXT NOT NULL,
+    description TEXT,
+    messages INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cache_creation INTEGER NOT NULL,
+    cache_read INTEGER NOT NULL,
+    total_input INTEGER NOT NULL,
+    cache_hit REAL,
+    max_input INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    PRIMARY KEY (session_id, agent)
+);
+CREATE TABLE IF NOT EXISTS large_messages (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    agent TEXT NOT NULL,
+    timestamp TEXT,
+    uuid TEXT,
+    input_total INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_cost ON sessions (cost DESC);
+CREATE INDEX IF NOT EXISTS agent_usage_subagent_cost ON agent_usage (cost DESC) WHERE agent != 'main';
+CREATE INDEX IF NOT EXISTS agent_usage_cache_hit ON agent_usage (cache_hit, total_input);
+CREATE INDEX IF NOT EXISTS large_messages_input ON large_messages (input_total DESC);
+CREATE INDEX IF NOT EXISTS large_messages_session ON large_messages (session_id);
+"""
+# Largest single messages kept per session for the 'input' query
+INDEX_LARGEST_PER_SESSION = 10
+# Agents with less total input are ignored by the 'cache-hit' query
+INDEX_MIN_INPUT = 10_000
+
+TOP_QUERIES = {
+    'sessions': """
+        SELECT session, first_ts, last_ts, cost FROM sessions
+        ORDER BY cost DESC LIMIT ?""",
+    'subagents': """
+        SELECT s.session, a.agent, a.description, a.messages, a.total_input, a.output_tokens, a.cost
+        FROM agent_usage a JOIN sessions s ON s.id = a.session_id
+        WHERE a.agent != 'main'
+        ORDER BY a.cost DESC LIMIT ?""",
+    'cache-hit': """
+        SELECT s.session, a.agent, a.description, a.total_input, a.cache_read, a.cache_hit, a.cost
+        FROM agent_usage a JOIN sessions s ON s.id = a.session_id
+        WHERE a.cache_hit IS NOT NULL AND a.total_input >= ?
+        ORDER BY a.cache_hit LIMIT ?""",
+    'input': """
+        SELECT s.session, m.agent, m.timestamp, m.uuid, m.input_total
+        FROM large_messages m JOIN sessions s ON s.id = m.session_id
+        ORDER BY m.input_total DESC LIMIT ?""",
+}
+TOP_TITLES = {
+    'sessions': "most expensive sessions",
+    'subagents': "most expensive subagents",
+    'cache-hit': "worst cache-hit ratios (cache read / total input)",
+    'input': "largest single-message inputs (incl. cache)",
+}
+
+LEDGER_VERSION = 1
+# Bytes hashed from the start of each file to detect in-place rewrites
+LEDGER_HEAD_BYTES = 4096
+
+def analyze_main_session(filepath, stats=None, prefilter=True, start=0, complete_only=False):
+    """Analyze a session file and return token usage broken down by agent.
+
+    With ``prefilter`` (the default) only lines whose raw bytes contain one of
+    CANDIDATE_MARKERS are JSON-decoded; every other line cannot contribute to
+    the totals. Pass ``prefilter=False`` to decode and validate every line.
+
+    Parsing begins at byte ``start``. With ``complete_only`` an unterminated
+    last line (one still being written) is left unread.
+
+    If ``stats`` is a dict, it is filled with the number of lines read, the
+    number of malformed lines that were skipped and the byte offset at which
+    parsing stopped.
+    """
     main_usage = {
         'input_tokens': 0,
         'output_tokens': 0,
@@ -29,76 +160,728 @@ def analyze_main_session(filepath):
         'description': None
     })
 
-    with open(filepath, 'r') as f:
-        for line in f:
-            try:
-                data = json.loads(line)
-
-                # Main session assistant messages
-                if data.get('type') == 'assistant' and 'message' in data:
-                    main_usage['messages'] += 1
-                    msg_usage = data['message'].get('usage', {})
-                    main_usage['input_tokens'] += msg_usage.get('input_tokens', 0)
-                    main_usage['output_tokens'] += msg_usage.get('output_tokens', 0)
-                    main_usage['cache_creation'] += msg_usage.get('cache_creation_input_tokens', 0)
-                    main_usage['cache_read'] += msg_usage.get('cache_read_input_tokens', 0)
-
-                # Subagent tool results
-                if data.get('type') == 'user' and 'toolUseResult' in data:
-                    result = data['toolUseResult']
-                    if 'usage' in result and 'agentId' in result:
-                        agent_id = result['agentId']
-                        usage = result['usage']
-
-                        # Get description from prompt if available
-                        if subagent_usage[agent_id]['description'] is None:
-                            prompt = result.get('prompt', '')
-                            # Extract first line as description
-                            first_line = prompt.split('\n')[0] if prompt else f"agent-{agent_id}"
-                            if first_line.startswith('You are '):
-                                first_line = first_line[8:]  # Remove "You are "
-                            subagent_usage[agent_id]['description'] = first_line[:60]
-
-                        subagent_usage[agent_id]['messages'] += 1
-                        subagent_usage[agent_id]['input_tokens'] += usage.get('input_tokens', 0)
-                        subagent_usage[agent_id]['output_tokens'] += usage.get('output_tokens', 0)
-                        subagent_usage[agent_id]['cache_creation'] += usage.get('cache_creation_input_tokens', 0)
-                        subagent_usage[agent_id]['cache_read'] += usage.get('cache_read_input_tokens', 0)
-            except:
-                pass
+    scan_stats = scan_session(
+        filepath,
+        lambda data: accumulate_record(data, main_usage, subagent_usage),
+        prefilter, start, complete_only)
+
+    if stats is not None:
+        stats.update(scan_stats)
 
     return main_usage, dict(subagent_usage)
 
+def scan_session(filepath, handle_record, prefilter=True, start=0, complete_only=False):
+    """Decode the relevant records of a session file and pass each to ``handle_record``.
+
+    Returns a dict with the number of lines read, the number of malformed
+    lines skipped and the byte offset at which parsing stopped. See
+    analyze_main_session for ``prefilter``, ``start`` and ``complete_only``.
+    """
+    lines = 0
+    malformed = 0
+    offset = start
+
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        for block in read_line_blocks(f):
+            if complete_only and not block.endswith(b'\n'):
+                break
+            offset += len(block)
+            lines += block.count(b'\n') + (not block.endswith(b'\n'))
+            candidates = iter_candidate_lines(block) if prefilter else block.split(b'\n')
+            for line in candidates:
+                if not line.strip():
+                    continue
+                try:
+                    handle_record(_loads(line))
+                except (ValueError, TypeError, AttributeError):
+                    # Not JSON, not an object, or a usage block of the wrong shape
+                    malformed += 1
+
+    return {'lines': lines, 'malformed': malformed, 'offset': offset}
+
+def usage_record(usage):
+    """Return the counters one usage block adds, with ``messages`` set to 1.
+
+    Raises AttributeError or TypeError if the block has the wrong shape, so
+    callers can build every delta before applying any of them.
+    """
+    record = {
+        'input_tokens': usage.get('input_tokens', 0),
+        'output_tokens': usage.get('output_tokens', 0),
+        'cache_creation': usage.get('cache_creation_input_tokens', 0),
+        'cache_read': usage.get('cache_read_input_tokens', 0),
+        'messages': 1,
+    }
+    for field, value in record.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(f"usage field {field} is {type(value).__name__}, not a number")
+    return record
+
+def agent_description(result, agent_id):
+    """First line of a subagent's prompt, without a leading "You are "."""
+    prompt = result.get('prompt', '')
+    # Extract first line as description
+    first_line = prompt.split('\n')[0] if prompt else f"agent-{agent_id}"
+    if first_line.startswith('You are '):
+        first_line = first_line[8:]  # Remove "You are "
+    return first_line
+
+def accumulate_record(data, main_usage, subagent_usage):
+    """Add one decoded transcript record to the main/subagent counters.
+
+    The record's deltas are computed first and applied only once it has
+    parsed, so a malformed record never leaves a partial count behind.
+    """
+    # Main session assistant messages
+    if data.get('type') == 'assistant' and 'message' in data:
+        merge_usage(main_usage, usage_record(data['message'].get('usage', {})))
+
+    # Subagent tool results
+    if data.get('type') == 'user' and 'toolUseResult' in data:
+        result = data['toolUseResult']
+        if 'usage' in result and 'agentId' in result:
+            agent_id = result['agentId']
+            record = usage_record(result['usage'])
+            # Looked up with get() so a bad record never creates an empty entry
+            entry = subagent_usage.get(agent_id)
+            if entry is None or entry['description'] is None:
+                description = agent_description(result, agent_id)[:60]
+                entry = subagent_usage[agent_id]
+                entry['description'] = description
+            merge_usage(entry, record)
+
+def read_line_blocks(f, chunk_size=READ_CHUNK_SIZE):
+    """Yield large blocks of whole lines from a binary file.
+
+    Each block ends on a newline except possibly the last one, so no line is
+    ever split between two blocks.
+    """
+    tail = b''
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        cut = chunk.rfind(b'\n') + 1
+        if not cut:
+            tail += chunk
+            continue
+        yield tail + chunk[:cut]
+        tail = chunk[cut:]
+    if tail:
+        yield tail
+
+def iter_candidate_lines(block):
+    """Yield the lines of ``block`` that contain any of CANDIDATE_MARKERS.
+
+    Markers are located with bytes.find over the whole block, so lines that
+    cannot matter (tool output, user text, summaries) are never split out,
+    let alone decoded.
+    """
+    size = len(block)
+    next_hits = [block.find(marker) for marker in CANDIDATE_MARKERS]
+    pos = 0
+    while True:
+        for i, hit in enumerate(next_hits):
+            if -1 < hit < pos:
+                next_hits[i] = block.find(CANDIDATE_MARKERS[i], pos)
+        hits = [hit for hit in next_hits if hit != -1]
+        if not hits:
+            return
+        hit = min(hits)
+        start = block.rfind(b'\n', 0, hit) + 1
+        end = block.find(b'\n', hit)
+        if end == -1:
+            end = size
+        yield block[start:end]
+        pos = end + 1
+
+def analyze_file(filepath, prefilter=True, start=0, complete_only=False):
+    """Worker entry point: analyze one session file in a pool process."""
+    stats = {}
+    main_usage, subagent_usage = analyze_main_session(filepath, stats, prefilter, start, complete_only)
+    return str(filepath), main_usage, subagent_usage, stats
+
+def merge_usage(target, usage):
+    """Add the counters of ``usage`` into ``target`` in place."""
+    for field in USAGE_FIELDS:
+        target[field] += usage[field]
+
+def merge_subagents(target, subagents):
+    """Merge per-agentId usage into ``target``, keeping the first description seen."""
+    for agent_id, usage in subagents.items():
+        if agent_id not in target:
+            target[agent_id] = {field: 0 for field in USAGE_FIELDS}
+            target[agent_id]['description'] = usage['description']
+        merge_usage(target[agent_id], usage)
+
+def load_ledger(path):
+    """Load the incremental-analysis ledger, or start an empty one."""
+    try:
+        with open(path, 'r') as f:
+            ledger = json.load(f)
+    except FileNotFoundError:
+        return {'version': LEDGER_VERSION, 'files': {}}
+    if ledger.get('version') != LEDGER_VERSION:
+        print(f"Warning: ignoring ledger {path} with unknown version {ledger.get('version')}",
+              file=sys.stderr)
+        return {'version': LEDGER_VERSION, 'files': {}}
+    return ledger
+
+def save_ledger(path, ledger):
+    """Write the ledger atomically so an interrupted run never corrupts it."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(ledger, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def head_digest(filepath, length):
+    """Hash the first ``length`` bytes (at most LEDGER_HEAD_BYTES) of a file."""
+    with open(filepath, 'rb') as f:
+        return hashlib.sha1(f.read(min(length, LEDGER_HEAD_BYTES))).hexdigest()
+
+def resume_offset(entry, filepath, st):
+    """Return the byte offset to resume from, or 0 if the file must be re-scanned.
+
+    A file is re-scanned when it was rotated (different inode or device),
+    truncated (shorter than the stored offset) or rewritten in place (its
+    first bytes no longer match).
+    """
+    if entry is None:
+        return 0
+    if entry['inode'] != st.st_ino or entry['dev'] != st.st_dev:
+        return 0
+    if st.st_size < entry['offset']:
+        return 0
+    if head_digest(filepath, entry['offset']) != entry['head']:
+        return 0
+    return entry['offset']
+
+def expand_session_paths(args):
+    """Resolve files, directories and glob patterns to a sorted list of .jsonl files."""
+    paths = set()
+    for arg in args:
+        if os.path.isdir(arg):
+            paths.update(str(p) for p in Path(arg).rglob('*.jsonl'))
+        elif glob.has_magic(arg):
+            paths.update(p for p in glob.glob(arg, recursive=True) if os.path.isfile(p))
+        elif os.path.isfile(arg):
+            paths.add(arg)
+    return sorted(paths)
+
+def analyze_many(files, jobs=None, prefilter=True, ledger=None):
+    """Analyze session files in a process pool and merge the per-file results.
+
+    With a ``ledger`` (see load_ledger) only bytes appended since the previous
+    run are parsed and the stored per-file aggregates are updated in place.
+    Entries for files that no longer exist are dropped from it.
+
+    Returns the merged main and subagent usage plus a summary with the file,
+    line and malformed-line counts (and which files had malformed lines).
+    """
+    main_usage = {field: 0 for field in USAGE_FIELDS}
+    subagent_usage = {}
+    summary = {'files': 0, 'lines': 0, 'malformed': 0, 'malformed_files': {},
+               'resumed': 0, 'rescanned': 0, 'unchanged': 0, 'bytes_parsed': 0,
+               'pruned': 0}
+
+    if ledger is not None:
+        # Deleted (or rotated-away) sessions would otherwise stay in the ledger forever
+        for key in [key for key in ledger['files'] if not os.path.exists(key)]:
+            del ledger['files'][key]
+            summary['pruned'] += 1
+
+    # Work out where each file has to be parsed from
+    starts = {}
+    stats_by_file = {}
+    for filepath in files:
+        st = os.stat(filepath)
+        stats_by_file[filepath] = st
+        start = 0
+        if ledger is not None:
+            key = os.path.realpath(filepath)
+            entry = ledger['files'].get(key)
+            start = resume_offset(entry, filepath, st)
+            if entry is not None and start != entry['offset']:
+                summary['rescanned'] += 1
+                del ledger['files'][key]
+            elif start and start == st.st_size:
+                summary['unchanged'] += 1
+                continue
+            elif start:
+                summary['resumed'] += 1
+        starts[filepath] = start
+
+    # Large jobs first so the pool is not left waiting on one straggler
+    pending = sorted(starts, key=lambda p: stats_by_file[p].st_size - starts[p], reverse=True)
+    complete_only = ledger is not None
+
+    if jobs == 1 or len(pending) <= 1:
+        results = map(analyze_file, pending, repeat(prefilter),
+                      [starts[p] for p in pending], repeat(complete_only))
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        results = executor.map(analyze_file, pending, repeat(prefilter),
+                               [starts[p] for p in pending], repeat(complete_only))
+
+    per_file = {}
+    try:
+        for filepath, file_main, file_subagents, stats in results:
+            summary['bytes_parsed'] += stats['offset'] - starts[filepath]
+            if ledger is None:
+                per_file[filepath] = {'main': file_main, 'subagents': file_subagents,
+                                      'lines': stats['lines'], 'malformed': stats['malformed']}
+                continue
+
+            st = stats_by_file[filepath]
+            key = os.path.realpath(filepath)
+            entry = ledger['files'].setdefault(key, {
+                'main': {field: 0 for field in USAGE_FIELDS},
+                'subagents': {}, 'lines': 0, 'malformed': 0,
+            })
+            merge_usage(entry['main'], file_main)
+            merge_subagents(entry['subagents'], file_subagents)
+            entry['lines'] += stats['lines']
+            entry['malformed'] += stats['malformed']
+            entry.update({
+                'inode': st.st_ino,
+                'dev': st.st_dev,
+                'offset': stats['offset'],
+                'head': head_digest(filepath, stats['offset']),
+            })
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if ledger is not None:
+        per_file = {filepath: ledger['files'][os.path.realpath(filepath)] for filepath in files
+                    if os.path.realpath(filepath) in ledger['files']}
+
+    for filepath, entry in per_file.items():
+        summary['files'] += 1
+        summary['lines'] += entry['lines']
+        summary['malformed'] += entry['malformed']
+        if entry['malformed']:
+            summary['malformed_files'][filepath] = entry['malformed']
+        merge_usage(main_usage, entry['main'])
+        merge_subagents(subagent_usage, entry['subagents'])
+
+    return main_usage, subagent_usage, summary
+
 def format_tokens(n):
     """Format token count with thousands separators."""
     return f"{n:,}"
 
-def calculate_cost(usage, input_cost_per_m=3.0, output_cost_per_m=15.0):
-    """Calculate estimated cost in dollars."""
+def calculate_cost(usage, input_cost_per_m=3.0, output_cost_per_m=15.0, rates=None):
+    """Calculate estimated cost in dollars.
+
+    Without ``rates`` all input (including cache) is billed at the input price.
+    ``rates`` is a pricing-table entry (see DEFAULT_PRICING) that prices cache
+    creation and cache reads separately.
+    """
+    if rates is not None:
+        return (usage['input_tokens'] * rates['input']
+                + usage['output_tokens'] * rates['output']
+                + usage['cache_creation'] * rates['cache_creation']
+                + usage['cache_read'] * rates['cache_read']) / 1_000_000
     total_input = usage['input_tokens'] + usage['cache_creation'] + usage['cache_read']
     input_cost = total_input * input_cost_per_m / 1_000_000
     output_cost = usage['output_tokens'] * output_cost_per_m / 1_000_000
     return input_cost + output_cost
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: analyze-token-usage.py <session-file.jsonl>")
-        sys.exit(1)
+def load_pricing(path=None):
+    """Return the pricing table, with entries from a JSON file overriding the defaults."""
+    pricing = {model: dict(rates) for model, rates in DEFAULT_PRICING.items()}
+    if path is None:
+        return pricing
+    with open(path, 'r') as f:
+        overrides = json.load(f)
+    for model, rates in overrides.items():
+        missing = set(PRICE_FIELDS) - set(rates) - set(pricing.get(model, {}))
+        if missing:
+            raise ValueError(f"Pricing for {model!r} is missing: {', '.join(sorted(missing))}")
+        pricing.setdefault(model, {}).update({field: float(rates[field]) for field in rates})
+    return pricing
 
-    main_session_file = sys.argv[1]
+def rates_for_model(pricing, model):
+    """Pick the pricing entry whose name is the longest prefix of ``model``."""
+    best = 'default'
+    for name in pricing:
+        if name != 'default' and model.startswith(name) and len(name) > len(best):
+            best = name
+    return pricing[best]
 
-    if not Path(main_session_file).exists():
-        print(f"Error: Session file not found: {main_session_file}")
-        sys.exit(1)
+def bucket_start(timestamp, window):
+    """Truncate an ISO-8601 timestamp to the start of its UTC minute, hour or day."""
+    if not isinstance(timestamp, str) or len(timestamp) < 19:
+        return 'unknown'
+    if not timestamp.endswith('Z'):
+        try:
+            parsed = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return 'unknown'
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc)
+        timestamp = parsed.strftime('%Y-%m-%dT%H:%M:%SZ')
+    return timestamp[:BUCKET_WINDOWS[window][0]] + BUCKET_WINDOWS[window][1]
+
+def bucket_file(filepath, window, prefilter=True):
+    """Worker entry point: usage counters keyed by (bucket, agent, model) for one file."""
+    buckets = {}
+
+    def handle_record(data):
+        if data.get('type') == 'assistant' and 'message' in data:
+            message = data['message']
+            agent = 'main'
+            model = message.get('model') or 'unknown'
+            usage = message.get('usage', {})
+        elif data.get('type') == 'user' and 'toolUseResult' in data:
+            result = data['toolUseResult']
+            if not ('usage' in result and 'agentId' in result):
+                return
+            agent = result['agentId']
+            model = result.get('model') or 'unknown'
+            usage = result['usage']
+        else:
+            return
+
+        record = usage_record(usage)
+        key = (bucket_start(data.get('timestamp'), window), agent, model)
+        counters = buckets.get(key)
+        if counters is None:
+            counters = buckets[key] = [0, 0, 0, 0, 0]
+        counters[0] += record['input_tokens']
+        counters[1] += record['output_tokens']
+        counters[2] += record['cache_creation']
+        counters[3] += record['cache_read']
+        counters[4] += 1
+
+    stats = scan_session(filepath, handle_record, prefilter)
+    return str(filepath), buckets, stats
+
+def analyze_buckets(files, window, pricing, jobs=None, prefilter=True):
+    """Bucket usage by time window, agent and model across files.
 
-    # Analyze the session
-    main_usage, subagent_usage = analyze_main_session(main_session_file)
+    Returns a list of row dicts (ANALYTICS_COLUMNS) sorted by bucket, agent
+    and model, plus the same summary as analyze_many.
+    """
+    merged = {}
+    summary = {'files': 0, 'lines': 0, 'malformed': 0, 'malformed_files': {}}
 
+    files = sorted(files, key=lambda p: os.path.getsize(p), reverse=True)
+    if jobs == 1 or len(files) <= 1:
+        results = map(bucket_file, files, repeat(window), repeat(prefilter))
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        results = executor.map(bucket_file, files, repeat(window), repeat(prefilter))
+
+    try:
+        for filepath, buckets, stats in results:
+            summary['files'] += 1
+            summary['lines'] += stats['lines']
+            summary['malformed'] += stats['malformed']
+            if stats['malformed']:
+                summary['malformed_files'][filepath] = stats['malformed']
+            for key, counters in buckets.items():
+                total = merged.get(key)
+                if total is None:
+                    merged[key] = list(counters)
+                else:
+                    for i, value in enumerate(counters):
+                        total[i] += value
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    rows = []
+    for (bucket, agent, model), counters in sorted(merged.items()):
+        row = dict(zip(('bucket', 'agent', 'model') + USAGE_FIELDS, (bucket, agent, model, *counters)))
+        row['cost'] = calculate_cost(row, rates=rates_for_model(pricing, model))
+        rows.append(row)
+    return rows, summary
+
+def group_rows(rows, key):
+    """Sum analytics rows by one column (bucket, agent or model)."""
+    groups = {}
+    for row in rows:
+        group = groups.get(row[key])
+        if group is None:
+            group = groups[row[key]] = {field: 0 for field in USAGE_FIELDS}
+            group['cost'] = 0.0
+        merge_usage(group, row)
+        group['cost'] += row['cost']
+    return groups
+
+def print_analytics(rows, summary, window, top=20):
+    """Print usage per time bucket, plus the top models and agents by cost."""
+    print("=" * 100)
+    print(f"TOKEN USAGE ANALYTICS (per {window})")
+    print("=" * 100)
+    print()
+    print(f"Sessions analyzed: {format_tokens(summary['files'])} "
+          f"({format_tokens(summary['lines'])} lines, {format_tokens(summary['malformed'])} malformed)")
+    print()
+
+    header = f"{'Msgs':>7} {'Input':>12} {'Output':>12} {'Cache write':>12} {'Cache read':>14} {'Cost':>10}"
+
+    def print_group(label, name, usage):
+        print(f"{name:<{label}} {usage['messages']:>7,} {usage['input_tokens']:>12,} "
+              f"{usage['output_tokens']:>12,} {usage['cache_creation']:>12,} "
+              f"{usage['cache_read']:>14,} ${usage['cost']:>9.2f}")
+
+    by_bucket = group_rows(rows, 'bucket')
+    print(f"{'Bucket':<20} {header}")
+    print("-" * 100)
+    for bucket in sorted(by_bucket):
+        print_group(20, bucket, by_bucket[bucket])
+    print()
+
+    for column, title in (('model', 'Model'), ('agent', 'Agent')):
+        groups = group_rows(rows, column)
+        ranked = sorted(groups.items(), key=lambda item: item[1]['cost'], reverse=True)
+        print(f"{title:<20} {header}")
+        print("-" * 100)
+        for name, usage in ranked[:top]:
+            print_group(20, name[:20], usage)
+        if len(ranked) > top:
+            print(f"  ... {len(ranked) - top} more")
+        print()
+
+    total_cost = sum(row['cost'] for row in rows)
+    print(f"  Estimated cost: ${total_cost:.2f} (per-model pricing incl. cache rates)")
+    print()
+    print("=" * 100)
+
+def export_rows(rows, path):
+    """Write analytics rows as CSV, Parquet/Arrow (pyarrow) or NumPy .npz.
+
+    The format follows the file suffix. Parquet/Arrow fall back to .npz when
+    pyarrow is not installed. Returns the path actually written.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=ANALYTICS_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    if suffix in ('.parquet', '.arrow', '.feather'):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            path = str(Path(path).with_suffix('.npz'))
+            print(f"Warning: pyarrow not installed, writing {path} instead", file=sys.stderr)
+        else:
+            columns = {}
+            for column in ANALYTICS_COLUMNS:
+                values = [row[column] for row in rows]
+                if column in ('bucket', 'agent', 'model'):
+                    columns[column] = pa.array(values, pa.string()).dictionary_encode()
+                elif column == 'cost':
+                    columns[column] = pa.array(values, pa.float64())
+                else:
+                    columns[column] = pa.array(values, pa.int64())
+            table = pa.table(columns)
+            if suffix == '.parquet':
+                import pyarrow.parquet as pq
+                pq.write_table(table, path, compression='zstd')
+            else:
+                import pyarrow.feather as feather
+                feather.write_feather(table, path, compression='zstd')
+            return path
+    elif suffix != '.npz':
+        raise ValueError(f"Unsupported export format {suffix!r} (use .csv, .parquet, .arrow or .npz)")
+
+    try:
+        import numpy as np
+    except ImportError:
+        raise ValueError("Columnar export needs pyarrow or numpy; use a .csv path instead")
+
+    # String columns are dictionary-encoded: <column>_codes indexes <column>_values
+    arrays = {}
+    for column in ANALYTICS_COLUMNS:
+        values = [row[column] for row in rows]
+        if column in ('bucket', 'agent', 'model'):
+            categories = sorted(set(values))
+            index = {value: i for i, value in enumerate(categories)}
+            arrays[f'{column}_values'] = np.array(categories, dtype=str)
+            arrays[f'{column}_codes'] = np.array([index[v] for v in values], dtype=np.int32)
+        elif column == 'cost':
+            arrays[column] = np.array(values, dtype=np.float64)
+        else:
+            arrays[column] = np.array(values, dtype=np.int64)
+    np.savez_compressed(path, **arrays)
+    return path
+
+def index_file(filepath, pricing, prefilter=True):
+    """Worker entry point: per-agent usage, cost and largest messages for one session."""
+    agents = {}
+    largest = []  # min-heap of (input_total, seq, agent, timestamp, uuid)
+    span = [None, None]
+    seq = count()
+
+    def handle_record(data):
+        if data.get('type') == 'assistant' and 'message' in data:
+            message = data['message']
+            agent = 'main'
+            description = None
+            model = message.get('model') or 'unknown'
+            usage = message.get('usage', {})
+        elif data.get('type') == 'user' and 'toolUseResult' in data:
+            result = data['toolUseResult']
+            if not ('usage' in result and 'agentId' in result):
+                return
+            agent = result['agentId']
+            description = agent_description(result, agent)
+            model = result.get('model') or 'unknown'
+            usage = result['usage']
+        else:
+            return
+
+        record = usage_record(usage)
+        cost = calculate_cost(record, rates=rates_for_model(pricing, model))
+        input_total = record['input_tokens'] + record['cache_creation'] + record['cache_read']
+
+        acc = agents.get(agent)
+        if acc is None:
+            acc = agents[agent] = {field: 0 for field in USAGE_FIELDS}
+            acc.update({'cost': 0.0, 'max_input': 0, 'description': description and description[:60]})
+        merge_usage(acc, record)
+        acc['cost'] += cost
+        acc['max_input'] = max(acc['max_input'], input_total)
+
+        timestamp = data.get('timestamp')
+        if isinstance(timestamp, str):
+            span[0] = min(span[0] or timestamp, timestamp)
+            span[1] = max(span[1] or timestamp, timestamp)
+        # The sequence number breaks ties so agent/timestamp are never compared
+        entry = (input_total, next(seq), agent, timestamp, data.get('uuid'))
+        if len(largest) < INDEX_LARGEST_PER_SESSION:
+            heapq.heappush(largest, entry)
+        elif entry > largest[0]:
+            heapq.heapreplace(largest, entry)
+
+    stats = scan_session(filepath, handle_record, prefilter)
+    largest = [(input_total, agent, timestamp, uuid)
+               for input_total, _, agent, timestamp, uuid in sorted(largest, reverse=True)]
+    return str(filepath), agents, largest, span, stats
+
+def open_index(path):
+    """Open (creating if needed) the SQLite cross-session index."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")  # Re-ingesting a session cascades to its child rows
+    conn.executescript(INDEX_SCHEMA)
+    # Indexes written before foreign keys were enforced can hold orphans whose
+    # session_id a re-inserted session would reuse
+    with conn:
+        for table in ('agent_usage', 'large_messages'):
+            conn.execute(f"DELETE FROM {table} WHERE session_id NOT IN (SELECT id FROM sessions)")
+    return conn
+
+def ingest_sessions(conn, files, pricing, jobs=None, prefilter=True):
+    """Index session files, skipping ones whose size and mtime are unchanged."""
+    known = {path: (size, mtime) for path, size, mtime in
+             conn.execute("SELECT path, size, mtime FROM sessions")}
+    pending = []
+    for filepath in files:
+        st = os.stat(filepath)
+        key = os.path.realpath(filepath)
+        if known.get(key) != (st.st_size, st.st_mtime):
+            pending.append(filepath)
+    pending.sort(key=lambda p: os.path.getsize(p), reverse=True)
+
+    if jobs == 1 or len(pending) <= 1:
+        results = map(index_file, pending, repeat(pricing), repeat(prefilter))
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        results = executor.map(index_file, pending, repeat(pricing), repeat(prefilter),
+                               chunksize=max(1, len(pending) // (8 * (os.cpu_count() or 1))))
+
+    try:
+        with conn:
+            for filepath, agents, largest, span, stats in results:
+                key = os.path.realpath(filepath)
+                st = os.stat(filepath)
+                conn.execute("DELETE FROM sessions WHERE path = ?", (key,))
+                session_id = conn.execute(
+                    "INSERT INTO sessions (path, session, size, mtime, lines, malformed, "
+                    "first_ts, last_ts, cost) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, Path(filepath).stem, st.st_size, st.st_mtime, stats['lines'],
+                     stats['malformed'], span[0], span[1],
+                     sum(acc['cost'] for acc in agents.values())),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO agent_usage (session_id, agent, description, messages, input_tokens, "
+                    "output_tokens, cache_creation, cache_read, total_input, cache_hit, max_input, cost) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(session_id, agent, acc['description'], acc['messages'], acc['input_tokens'],
+                      acc['output_tokens'], acc['cache_creation'], acc['cache_read'], total,
+                      acc['cache_read'] / total if total else None, acc['max_input'], acc['cost'])
+                     for agent, acc in agents.items()
+                     for total in [acc['input_tokens'] + acc['cache_creation'] + acc['cache_read']]],
+                )
+                conn.executemany(
+                    "INSERT INTO large_messages (session_id, agent, timestamp, uuid, input_total) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(session_id, agent, timestamp, uuid, input_total)
+                     for input_total, agent, timestamp, uuid in largest],
+                )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Rows of files that were deleted or rotated away are kept: the index is a history.
+    return len(pending), len(files) - len(pending)
+
+def query_top(conn, kind, limit=20, min_input=INDEX_MIN_INPUT):
+    """Run one of the TOP_QUERIES against the index and return (columns, rows)."""
+    sql = TOP_QUERIES[kind]
+    params = (min_input, limit) if kind == 'cache-hit' else (limit,)
+    cursor = conn.execute(sql, params)
+    return [column[0] for column in cursor.description], cursor.fetchall()
+
+def print_top(kind, columns, rows, elapsed):
+    """Print a top-N query result as a table."""
+    print("=" * 100)
+    print(f"TOP {len(rows)}: {TOP_TITLES[kind]}")
+    print("=" * 100)
+    widths = [max(len(column), *(len(format_cell(row[i])) for row in rows)) if rows else len(column)
+              for i, column in enumerate(columns)]
+    widths = [min(width, 40) for width in widths]
+    print("  ".join(f"{column:<{width}}" for column, width in zip(columns, widths)))
+    print("-" * 100)
+    for row in rows:
+        print("  ".join(f"{format_cell(value)[:width]:<{width}}" for value, width in zip(row, widths)))
+    print("-" * 100)
+    print(f"({elapsed * 1000:.1f} ms)")
+
+def format_cell(value):
+    """Format one value of a top-N result for display."""
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f"{value:.3f}" if value < 1 else f"{value:,.2f}"
+    if isinstance(value, int):
+        return format_tokens(value)
+    return str(value)
+
+def print_report(main_usage, subagent_usage, summary):
+    """Print the usage breakdown table and totals."""
     print("=" * 100)
     print("TOKEN USAGE ANALYSIS")
     print("=" * 100)
     print()
 
+    if summary['files'] > 1:
+        print(f"Sessions analyzed: {format_tokens(summary['files'])} "
+              f"({format_tokens(summary['lines'])} lines)")
+        print()
+
     # Print breakdown
     print("Usage Breakdown:")
     print("-" * 100)
@@ -129,20 +912,9 @@ def main():
     print("-" * 100)
 
     # Calculate totals
-    total_usage = {
-        'input_tokens': main_usage['input_tokens'],
-        'output_tokens': main_usage['output_tokens'],
-        'cache_creation': main_usage['cache_creation'],
-        'cache_read': main_usage['cache_read'],
-        'messages': main_usage['messages']
-    }
-
+    total_usage = {field: main_usage[field] for field in USAGE_FIELDS}
     for usage in subagent_usage.values():
-        total_usage['input_tokens'] += usage['input_tokens']
-        total_usage['output_tokens'] += usage['output_tokens']
-        total_usage['cache_creation'] += usage['cache_creation']
-        total_usage['cache_read'] += usage['cache_read']
-        total_usage['messages'] += usage['messages']
+        merge_usage(total_usage, usage)
 
     total_input = total_usage['input_tokens'] + total_usage['cache_creation'] + total_usage['cache_read']
     total_tokens = total_input + total_usage['output_tokens']
@@ -162,7 +934,120 @@ def main():
     print(f"  Estimated cost: ${total_cost:.2f}")
     print("  (at $3/$15 per M tokens for input/output)")
     print()
+
+    if summary['malformed']:
+        print(f"  Malformed lines skipped: {format_tokens(summary['malformed'])} "
+              f"in {len(summary['malformed_files'])} file(s)")
+        for filepath, count in sorted(summary['malformed_files'].items(),
+                                      key=lambda item: item[1], reverse=True)[:10]:
+            print(f"    {count:>8,}  {filepath}")
+        print()
+
     print("=" * 100)
 
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analyze token usage from Claude Code session transcripts.")
+    parser.add_argument('paths', nargs='*',
+                        help="Session .jsonl files, directories (searched recursively) or glob patterns")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Worker processes for multi-file runs (default: CPU count)")
+    parser.add_argument('--validate-all', action='store_true',
+                        help="Decode every line instead of pre-filtering on raw bytes "
+                             "(slower, but counts malformed lines anywhere in the file)")
+    parser.add_argument('--ledger', metavar='PATH',
+                        help="Incremental mode: remember per-file offsets and totals in PATH "
+                             "and only parse bytes appended since the last run")
+    parser.add_argument('--analytics', choices=sorted(BUCKET_WINDOWS),
+                        help="Bucket usage by time window, agent and model")
+    parser.add_argument('--pricing', metavar='FILE',
+                        help="JSON pricing table ({model-prefix: {input, output, cache_creation, "
+                             "cache_read}} per M tokens) for --analytics and --db")
+    parser.add_argument('--export', metavar='PATH',
+                        help="With --analytics, write the bucketed rows to PATH "
+                             "(.csv, .parquet/.arrow with pyarrow, or .npz with numpy)")
+    parser.add_argument('--db', metavar='PATH',
+                        help="Cross-session SQLite index: ingest the given sessions into PATH "
+                             "(unchanged files are skipped) and/or query it with --top")
+    parser.add_argument('--top', choices=sorted(TOP_QUERIES),
+                        help="With --db, report the top N sessions, subagents, worst cache-hit "
+                             "ratios or largest single-message inputs")
+    parser.add_argument('-n', '--limit', type=int, default=20, help="Rows for --top (default: 20)")
+    parser.add_argument('--min-input', type=int, default=INDEX_MIN_INPUT,
+                        help="Minimum total input for --top cache-hit (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.top and not args.db:
+        parser.error("--top requires --db")
+    if not args.paths and not args.top:
+        parser.error("no session files given")
+    if args.db and (args.analytics or args.ledger):
+        parser.error("--db cannot be combined with --analytics or --ledger")
+
+    if args.db:
+        try:
+            pricing = load_pricing(args.pricing)
+        except (OSError, ValueError) as e:
+            print(f"Error: Invalid pricing table: {e}")
+            sys.exit(1)
+        conn = open_index(args.db)
+        if args.paths:
+            files = expand_session_paths(args.paths)
+            start = time.perf_counter()
+            indexed, unchanged = ingest_sessions(conn, files, pricing, jobs=args.jobs,
+                                                 prefilter=not args.validate_all)
+            print(f"Indexed {indexed:,} session(s), {unchanged:,} unchanged "
+                  f"({time.perf_counter() - start:.1f}s)")
+        if args.top:
+            start = time.perf_counter()
+            columns, rows = query_top(conn, args.top, args.limit, args.min_input)
+            print_top(args.top, columns, rows, time.perf_counter() - start)
+        conn.close()
+        return
+
+    if args.analytics and args.ledger:
+        parser.error("--analytics cannot be combined with --ledger")
+    if args.export and not args.analytics:
+        parser.error("--export requires --analytics")
+
+    files = expand_session_paths(args.paths)
+    if not files:
+        print(f"Error: No session files found: {' '.join(args.paths)}")
+        sys.exit(1)
+
+    if args.analytics:
+        try:
+            pricing = load_pricing(args.pricing)
+        except (OSError, ValueError) as e:
+            print(f"Error: Invalid pricing table: {e}")
+            sys.exit(1)
+        rows, summary = analyze_buckets(files, args.analytics, pricing, jobs=args.jobs,
+                                        prefilter=not args.validate_all)
+        print_analytics(rows, summary, args.analytics)
+        if args.export:
+            try:
+                written = export_rows(rows, args.export)
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+            print(f"Exported {len(rows):,} rows to {written}")
+        return
+
+    ledger = load_ledger(args.ledger) if args.ledger else None
+
+    # Analyze the sessions
+    main_usage, subagent_usage, summary = analyze_many(files, jobs=args.jobs,
+                                                   prefilter=not args.validate_all,
+                                                   ledger=ledger)
+
+    if ledger is not None:
+        save_ledger(args.ledger, ledger)
+        print(f"Ledger: {summary['unchanged']} unchanged, {summary['resumed']} resumed, "
+              f"{summary['rescanned']} re-scanned, {summary['pruned']} pruned, "
+              f"{summary['bytes_parsed'] / (1024 * 1024):,.1f} MB parsed")
+        print()
+
+    print_report(main_usage, subagent_usage, summary)
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark the analyze-token-usage.py fast path on a synthetic transcript.
+
+Generates a session JSONL file of the requested size (1 GB by default) with a
+realistic mix of records, then analyzes it twice:
+
+  baseline  - reference-token-usage.py, a frozen copy of the analyzer from
+              before the fast path
+  fast      - the current analyzer: raw-byte prefilter + orjson (when installed)
+
+and verifies that both runs produce identical totals.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+def load_script(filename):
+    """Import a script from this directory (its name is not a valid module name)."""
+    spec = importlib.util.spec_from_file_location(
+        filename[:-3].replace('-', '_'), SCRIPT_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def synthetic_records(rng):
+    """Build a pool of transcript lines resembling a Claude Code session."""
+    records = []
+    for i in range(2000):
+        kind = rng.random()
+        ts = f"2026-10-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00.000Z"
+        if kind < 0.35:
+            record = {
+                'type': 'assistant', 'timestamp': ts, 'uuid': f'a-{i}',
+                'message': {
+                    'model': rng.choice(['claude-sonnet-4-5', 'claude-opus-4-1', 'claude-haiku-4-5']),
+                    'role': 'assistant',
+                    'content': [{'type': 'text', 'text': 'reasoning ' * rng.randint(5, 80)}],
+                    'usage': {
+                        'input_tokens': rng.randint(1, 4000),
+                        'output_tokens': rng.randint(1, 2000),
+                        'cache_creation_input_tokens': rng.randint(0, 5000),
+                        'cache_read_input_tokens': rng.randint(0, 120000),
+                    },
+                },
+            }
+        elif kind < 0.40:
+            record = {
+                'type': 'user', 'timestamp': ts, 'uuid': f'u-{i}',
+                'toolUseResult': {
+                    'agentId': f'agent{rng.randint(1, 40):03d}',
+                    'prompt': f'You are subagent {i}\nDo the task.',
+                    'content': [{'type': 'text', 'text': 'done ' * rng.randint(10, 200)}],
+                    'usage': {
+                        'input_tokens': rng.randint(1, 30000),
+                        'output_tokens': rng.randint(1, 8000),
+                        'cache_creation_input_tokens': rng.randint(0, 20000),
+                        'cache_read_input_tokens': rng.randint(0, 300000),
+                    },
+                },
+            }
+        elif kind < 0.85:
+            # Tool results carrying file contents dominate real transcripts by size
+            record = {
+                'type': 'user', 'timestamp': ts, 'uuid': f't-{i}',
+                'message': {'role': 'user', 'content': [{
+                    'type': 'tool_result', 'tool_use_id': f'toolu_{i}',
+                    'content': 'line of source code\n' * rng.randint(20, 600),
+                }]},
+            }
+        else:
+            record = {'type': 'system', 'timestamp': ts, 'uuid': f's-{i}',
+                      'content': 'hook output ' * rng.randint(1, 50)}
+        records.append((json.dumps(record, separators=(',', ':')) + '\n').encode())
+    records.append(b'{"type":"assistant","message":{"usage":\n')  # malformed
+    return records
+
+def generate(path, size_bytes, seed=0):
+    rng = random.Random(seed)
+    records = synthetic_records(rng)
+    written = 0
+    with open(path, 'wb', buffering=8 * 1024 * 1024) as f:
+        while written < size_bytes:
+            line = rng.choice(records)
+            f.write(line)
+            written += len(line)
+    return written
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=1024, help="Synthetic transcript size (default: 1024)")
+    parser.add_argument('--file', help="Use (or create, if missing) this transcript instead of a temp file")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    analyzer = load_script('analyze-token-usage.py')
+    baseline = load_script('reference-token-usage.py')
+    tmpdir = None
+    path = args.file
+    if path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        path = os.path.join(tmpdir.name, 'synthetic-session.jsonl')
+
+    try:
+        if not os.path.exists(path):
+            print(f"Generating {args.size_mb} MB synthetic transcript at {path} ...")
+            elapsed, size = timed(generate, path, args.size_mb * 1024 * 1024, args.seed)
+            print(f"  done in {elapsed:.1f}s")
+        size = os.path.getsize(path)
+
+        base_time, base = timed(baseline.analyze_main_session, path)
+        fast_time, fast = timed(analyzer.analyze_main_session, path, None, True)
+
+        decoder = 'orjson' if analyzer._loads is not json.loads else 'json'
+        mb = size / (1024 * 1024)
+        print()
+        print(f"{'Mode':<32} {'Time':>9} {'MB/s':>9}")
+        print(f"{'baseline (reference analyzer)':<32} {base_time:>8.2f}s {mb / base_time:>9.1f}")
+        print(f"{f'fast (prefilter + {decoder})':<32} {fast_time:>8.2f}s {mb / fast_time:>9.1f}")
+        print(f"Speedup: {base_time / fast_time:.1f}x on {mb:,.0f} MB")
+
+        if base != fast:
+            print("FAIL: totals differ between baseline and fast path")
+            sys.exit(1)
+        print(f"Totals identical: {base[0]['messages']:,} main messages, {len(base[1])} subagents")
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+if __name__ == '__main__':
+    main()
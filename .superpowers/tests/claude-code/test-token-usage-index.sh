@@ -0,0 +1,69 @@
+#!/usr/bin/env bash
+# Test: analyze-token-usage.py --db cross-session index
+# Verifies that re-ingesting a changed session replaces its rows
+# (no Claude Code CLI needed: runs on synthetic transcripts)
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+source "$SCRIPT_DIR/test-helpers.sh"
+
+ANALYZER="$SCRIPT_DIR/analyze-token-usage.py"
+test_dir=$(create_test_project)
+trap 'cleanup_test_project "$test_dir"' EXIT
+
+# Append N records (alternating main-agent and agent1 usage) starting at index I
+# Usage: write_session FILE I N
+write_session() {
+    python3 - "$@" <<'EOF'
+import json, sys
+path, start, count = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+with open(path, 'a') as f:
+    for i in range(start, start + count):
+        usage = {'input_tokens': 100 * i, 'output_tokens': 10,
+                 'cache_creation_input_tokens': 0, 'cache_read_input_tokens': 50}
+        ts = f"2026-10-01T00:{i:02d}:00.000Z"
+        if i % 2:
+            record = {'type': 'user', 'timestamp': ts, 'uuid': f'u{i}',
+                      'toolUseResult': {'agentId': 'agent1', 'prompt': 'You are a tester', 'usage': usage}}
+        else:
+            record = {'type': 'assistant', 'timestamp': ts, 'uuid': f'a{i}',
+                      'message': {'model': 'claude-sonnet-4-5', 'usage': usage}}
+        f.write(json.dumps(record) + '\n')
+EOF
+}
+
+echo "=== Test: token usage index ==="
+echo ""
+
+write_session "$test_dir/a.jsonl" 1 4
+write_session "$test_dir/b.jsonl" 1 4
+db="$test_dir/index.db"
+
+# Test 1: Initial ingest
+echo "Test 1: Initial ingest..."
+output=$(python3 "$ANALYZER" "$test_dir/a.jsonl" "$test_dir/b.jsonl" --db "$db" -j 1)
+assert_contains "$output" "Indexed 2 session(s), 0 unchanged" "Both sessions indexed" || exit 1
+echo ""
+
+# Test 2: Re-ingest the last-inserted session after it grows (its id gets reused)
+echo "Test 2: Re-ingest a changed session..."
+write_session "$test_dir/b.jsonl" 5 2
+output=$(python3 "$ANALYZER" "$test_dir/a.jsonl" "$test_dir/b.jsonl" --db "$db" -j 1 2>&1) || true
+assert_contains "$output" "Indexed 1 session(s), 1 unchanged" "Only the changed session re-indexed" || exit 1
+
+output=$(python3 "$ANALYZER" --db "$db" --top subagents)
+assert_count "$output" "agent1" 2 "One agent1 row per session" || exit 1
+assert_contains "$output" "^b  *agent1 .* 3  *1,050 " "Changed session's totals replaced, not duplicated" || exit 1
+echo ""
+
+# Test 3: No child rows left behind by the replaced session
+echo "Test 3: No orphaned rows..."
+orphans=$(python3 -c "
+import sqlite3, sys
+conn = sqlite3.connect(sys.argv[1])
+print(sum(conn.execute(f'SELECT COUNT(*) FROM {t} WHERE session_id NOT IN (SELECT id FROM sessions)').fetchone()[0]
+          for t in ('agent_usage', 'large_messages')))" "$db")
+assert_contains "$orphans" "^0$" "No orphaned agent_usage/large_messages rows" || exit 1
+echo ""
+
+echo "=== All token usage index tests passed ==="
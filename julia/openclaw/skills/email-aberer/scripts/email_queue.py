@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import smtplib
+import sqlite3
+import sys
+import time
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+
+DEFAULT_SPOOL = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "spool", "outbox.sqlite"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    sender TEXT NOT NULL,
+    recipients TEXT NOT NULL,
+    raw BLOB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    sent_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+# 5xx replies to these are about the session (credentials, greeting), not the
+# message, so they are retried like any transient error.
+SESSION_ERRORS = (smtplib.SMTPAuthenticationError, smtplib.SMTPConnectError, smtplib.SMTPHeloError)
+
+# A worker owns a row it is sending for this long; a row left in 'sending' by a
+# crashed worker is picked up again once its lease runs out.
+LEASE_SECONDS = 300.0
+
+
+def spool_path() -> str:
+    return os.environ.get("EMAIL_SPOOL", DEFAULT_SPOOL)
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    path = path or spool_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def enqueue(msg: EmailMessage, sender: str, recipients: List[str], path: Optional[str] = None) -> int:
+    if not sender:
+        raise ValueError("A sender address is required")
+    if not recipients:
+        raise ValueError("At least one recipient is required")
+    now = time.time()
+    conn = connect(path)
+    try:
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO outbox (created_at, sender, recipients, raw, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (now, sender, json.dumps(recipients), msg.as_bytes(), now),
+            )
+        return cur.lastrowid
+    finally:
+        conn.close()
+
+
+class Deliverer:
+    """Holds one SMTP session open across messages and reconnects on demand."""
+
+    def __init__(self, host: str, port: int, user: Optional[str], passwd: Optional[str],
+                 starttls: bool = True, idle_timeout: float = 60.0):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.passwd = passwd
+        self.starttls = starttls
+        self.idle_timeout = idle_timeout
+        self.server: Optional[smtplib.SMTP] = None
+        self.last_used = 0.0
+
+    def _open(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.user and self.passwd:
+                server.login(self.user, self.passwd)
+        except BaseException:
+            server.close()  # Don't leak the socket of a session that never became usable
+            raise
+        return server
+
+    def send(self, raw: bytes, sender: str, recipients: List[str]) -> None:
+        if self.server is not None and time.monotonic() - self.last_used > self.idle_timeout:
+            self.close()
+        if self.server is None:
+            self.server = self._open()
+        try:
+            msg = message_from_bytes(raw, policy=policy.SMTP)
+            self.server.send_message(msg, from_addr=sender, to_addrs=recipients)
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self.close()
+            raise
+        self.last_used = time.monotonic()
+
+    def close(self) -> None:
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+
+
+def backoff(attempts: int, base: float, cap: float) -> float:
+    return min(cap, base * (2 ** (attempts - 1)))
+
+
+def is_permanent(exc: BaseException) -> bool:
+    """Whether the server rejected this message for good (every reply code 5xx)."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in exc.recipients.values()]
+    elif isinstance(exc, smtplib.SMTPResponseException) and not isinstance(exc, SESSION_ERRORS):
+        codes = [exc.smtp_code]
+    else:
+        return False
+    return bool(codes) and all(code >= 500 for code in codes)
+
+
+def claim(conn: sqlite3.Connection, msg_id: int, status: str, next_attempt_at: float,
+          lease: float = LEASE_SECONDS) -> bool:
+    """Take a due row for this worker; False if another worker changed it first."""
+    with conn:
+        cur = conn.execute(
+            "UPDATE outbox SET status = 'sending', next_attempt_at = ? "
+            "WHERE id = ? AND status = ? AND next_attempt_at = ?",
+            (time.time() + lease, msg_id, status, next_attempt_at),
+        )
+    return cur.rowcount == 1
+
+
+def drain(conn: sqlite3.Connection, deliverer: Deliverer, rate: float = 1.0,
+          max_attempts: int = 8, base_delay: float = 30.0, max_delay: float = 3600.0,
+          batch: int = 50, lease: float = LEASE_SECONDS) -> Dict[str, int]:
+    """Deliver every message that is due now; return counts of sent/retried/failed.
+
+    Each row is claimed (status 'sending' with a lease) just before it is sent,
+    so several workers can drain the same spool without sending a row twice.
+    """
+    counts = {"sent": 0, "retried": 0, "failed": 0}
+    min_interval = 1.0 / rate if rate > 0 else 0.0
+    last_send = 0.0
+    while True:
+        rows = conn.execute(
+            "SELECT id, sender, recipients, raw, attempts, status, next_attempt_at FROM outbox "
+            "WHERE status IN ('queued', 'sending') AND next_attempt_at <= ? "
+            "ORDER BY next_attempt_at, id LIMIT ?",
+            (time.time(), batch),
+        ).fetchall()
+        if not rows:
+            return counts
+        for msg_id, sender, recipients, raw, attempts, status, next_attempt_at in rows:
+            wait = last_send + min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            if not claim(conn, msg_id, status, next_attempt_at, lease):
+                continue  # Another worker has it
+            last_send = time.monotonic()
+            attempts += 1
+            try:
+                deliverer.send(raw, sender, json.loads(recipients))
+            except Exception as exc:
+                # Transient SMTP/network errors, but also anything unexpected (an
+                # unparseable spooled message, a bug): retry with backoff, then fail
+                # the message, so one bad row can't crash the worker on every restart
+                error = str(exc)
+                if not isinstance(exc, (smtplib.SMTPException, OSError)):
+                    deliverer.close()  # The session may be left mid-transaction
+                    error = f"{type(exc).__name__}: {exc}"
+                if is_permanent(exc) or attempts >= max_attempts:
+                    status, next_at = "failed", time.time()
+                    counts["failed"] += 1
+                else:
+                    status, next_at = "queued", time.time() + backoff(attempts, base_delay, max_delay)
+                    counts["retried"] += 1
+                with conn:
+                    conn.execute(
+                        "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? "
+                        "WHERE id = ?",
+                        (status, attempts, next_at, error, msg_id),
+                    )
+                continue
+            with conn:
+                conn.execute(
+                    "UPDATE outbox SET status = 'sent', attempts = ?, sent_at = ?, last_error = NULL "
+                    "WHERE id = ?",
+                    (attempts, time.time(), msg_id),
+                )
+            counts["sent"] += 1
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[idx]
+
+
+def round_or_none(value: Optional[float]) -> Optional[float]:
+    return round(value, 3) if value is not None else None
+
+
+def status(conn: sqlite3.Connection, window: int = 500) -> Dict:
+    now = time.time()
+    by_status = dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+    oldest = conn.execute(
+        "SELECT MIN(created_at) FROM outbox WHERE status IN ('queued', 'sending')"
+    ).fetchone()[0]
+    latencies = [
+        row[0] for row in conn.execute(
+            "SELECT sent_at - created_at FROM outbox WHERE status = 'sent' "
+            "ORDER BY sent_at DESC LIMIT ?",
+            (window,),
+        )
+    ]
+    return {
+        "queued": by_status.get("queued", 0),
+        "sending": by_status.get("sending", 0),
+        "sent": by_status.get("sent", 0),
+        "failed": by_status.get("failed", 0),
+        "oldest_queued_age_s": round(now - oldest, 1) if oldest else None,
+        "latency_s": {
+            "samples": len(latencies),
+            "p50": round_or_none(percentile(latencies, 50)),
+            "p95": round_or_none(percentile(latencies, 95)),
+            "max": round_or_none(max(latencies) if latencies else None),
+        },
+    }
+
+
+def purge(conn: sqlite3.Connection, older_than_days: float) -> int:
+    cutoff = time.time() - older_than_days * 86400
+    with conn:
+        cur = conn.execute("DELETE FROM outbox WHERE status = 'sent' AND sent_at < ?", (cutoff,))
+    return cur.rowcount
+
+
+def deliverer_from_env(starttls: bool) -> Deliverer:
+    return Deliverer(
+        host=os.environ["SMTP_HOST"],
+        port=int(os.environ.get("SMTP_PORT", "587")),
+        user=os.environ.get("SMTP_USER"),
+        passwd=os.environ.get("SMTP_PASS"),
+        starttls=starttls,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Outbound mail spool for Aberer SMTP")
+    parser.add_argument("--spool", default=spool_path(), help="Path to the SQLite spool")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    worker = sub.add_parser("worker", help="Deliver queued messages")
+    worker.add_argument("--once", action="store_true", help="Drain due messages and exit")
+    worker.add_argument("--poll", type=float, default=5.0, help="Seconds between spool polls")
+    worker.add_argument("--rate", type=float, default=1.0, help="Max messages per second")
+    worker.add_argument("--max-attempts", type=int, default=8)
+    worker.add_argument("--base-delay", type=float, default=30.0, help="First retry delay in seconds")
+    worker.add_argument("--max-delay", type=float, default=3600.0, help="Retry delay cap in seconds")
+    worker.add_argument("--no-starttls", action="store_true", help="Plain SMTP (local test servers only)")
+
+    sub.add_parser("status", help="Print queue depth and delivery latency as JSON")
+
+    purge_cmd = sub.add_parser("purge", help="Delete delivered messages from the spool")
+    purge_cmd.add_argument("--older-than-days", type=float, default=7.0)
+
+    args = parser.parse_args()
+    conn = connect(args.spool)
+
+    if args.command == "status":
+        json.dump(status(conn), fp=sys.stdout, indent=2)
+        print()
+        return
+    if args.command == "purge":
+        print(f"Purged {purge(conn, args.older_than_days)} delivered messages")
+        return
+
+    deliverer = deliverer_from_env(starttls=not args.no_starttls)
+    try:
+        while True:
+            counts = drain(
+                conn, deliverer, rate=args.rate, max_attempts=args.max_attempts,
+                base_delay=args.base_delay, max_delay=args.max_delay,
+            )
+            if any(counts.values()):
+                print(json.dumps(counts), flush=True)
+            if args.once:
+                break
+            time.sleep(args.poll)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        deliverer.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -14,12 +14,11 @@ def main():
     parser.add_argument("--cc", help="Comma-separated CC list")
     parser.add_argument("--bcc", help="Comma-separated BCC list")
     parser.add_argument("--from", dest="sender", default=os.environ.get("SMTP_USER"))
+    parser.add_argument("--queue", action="store_true",
+                        help="Spool the message and return immediately (delivered by email_queue.py worker)")
     args = parser.parse_args()
-
-    host = os.environ["SMTP_HOST"]
-    port = int(os.environ.get("SMTP_PORT", "587"))
-    user = os.environ["SMTP_USER"]
-    passwd = os.environ["SMTP_PASS"]
+    if not args.sender:
+        parser.error("no sender address: pass --from or set SMTP_USER")
 
     msg = EmailMessage()
     msg["From"] = args.sender
@@ -42,6 +41,18 @@ def main():
     if args.bcc:
         recipients.extend(addr.strip() for addr in args.bcc.split(","))
 
+    if args.queue:
+        from email_queue import enqueue
+
+        msg_id = enqueue(msg, args.sender, recipients)
+        print(f"Queued message {msg_id}")
+        return
+
+    host = os.environ["SMTP_HOST"]
+    port = int(os.environ.get("SMTP_PORT", "587"))
+    user = os.environ["SMTP_USER"]
+    passwd = os.environ["SMTP_PASS"]
+
     with smtplib.SMTP(host, port) as server:
         server.starttls()
         server.login(user, passwd)
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Tests for email_queue.py: python3 -m unittest discover skills/email-aberer/scripts"""
+import os
+import smtplib
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from email.message import EmailMessage
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import email_queue  # noqa: E402
+
+
+def message(subject: str = "Hello") -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "bot@example.com"
+    msg["To"] = "ops@example.com"
+    msg["Subject"] = subject
+    msg.set_content("body")
+    return msg
+
+
+class FakeDeliverer:
+    """Records sends; raises the queued errors first, one per send, and always for `poison` subjects."""
+
+    def __init__(self, *errors: BaseException, poison: bytes = None):
+        self.errors = list(errors)
+        self.poison = poison
+        self.sent = []
+        self.closed = 0
+
+    def send(self, raw: bytes, sender: str, recipients: list) -> None:
+        if self.poison and b"Subject: " + self.poison in raw:
+            raise KeyError("unparseable")
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append((sender, recipients))
+
+    def close(self) -> None:
+        self.closed += 1
+
+
+class SpoolTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "outbox.sqlite")
+        self.conn = email_queue.connect(self.path)
+
+    def tearDown(self):
+        self.conn.close()
+        self.dir.cleanup()
+
+    def enqueue(self, subject: str = "Hello") -> int:
+        return email_queue.enqueue(message(subject), "bot@example.com", ["ops@example.com"], self.path)
+
+    def row(self, msg_id: int) -> tuple:
+        return self.conn.execute(
+            "SELECT status, attempts, last_error FROM outbox WHERE id = ?", (msg_id,)
+        ).fetchone()
+
+    def drain(self, deliverer, **kwargs) -> dict:
+        kwargs.setdefault("base_delay", 60)
+        return email_queue.drain(self.conn, deliverer, rate=0, **kwargs)
+
+
+class EnqueueTest(SpoolTest):
+    def test_requires_sender(self):
+        with self.assertRaises(ValueError):
+            email_queue.enqueue(message(), None, ["ops@example.com"], self.path)
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0], 0)
+
+    def test_send_queue_without_sender_is_a_usage_error(self):
+        env = {k: v for k, v in os.environ.items() if k != "SMTP_USER"}
+        env["EMAIL_SPOOL"] = self.path
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "email_send.py")
+        proc = subprocess.run([sys.executable, script, "--to", "ops@example.com", "--subject", "Hi", "--queue"],
+                              capture_output=True, text=True, env=env)
+        self.assertEqual(proc.returncode, 2)
+        self.assertIn("--from", proc.stderr)
+
+
+class DrainTest(SpoolTest):
+    def test_sends_due_messages(self):
+        msg_id = self.enqueue()
+        deliverer = FakeDeliverer()
+        self.assertEqual(self.drain(deliverer), {"sent": 1, "retried": 0, "failed": 0})
+        self.assertEqual(deliverer.sent, [("bot@example.com", ["ops@example.com"])])
+        self.assertEqual(self.row(msg_id), ("sent", 1, None))
+
+    def test_permanent_data_error_fails_at_once(self):
+        msg_id = self.enqueue()
+        counts = self.drain(FakeDeliverer(smtplib.SMTPDataError(550, b"Message rejected")))
+        self.assertEqual(counts["failed"], 1)
+        self.assertEqual(self.row(msg_id)[:2], ("failed", 1))
+
+    def test_transient_data_error_is_retried(self):
+        msg_id = self.enqueue()
+        counts = self.drain(FakeDeliverer(smtplib.SMTPDataError(451, b"Try again later")))
+        self.assertEqual(counts["retried"], 1)
+        self.assertEqual(self.row(msg_id)[:2], ("queued", 1))
+
+    def test_recipients_refused_is_permanent_only_if_every_reply_is_5xx(self):
+        hard = self.enqueue("hard")
+        soft = self.enqueue("soft")
+        deliverer = FakeDeliverer(
+            smtplib.SMTPRecipientsRefused({"ops@example.com": (550, b"No such user")}),
+            smtplib.SMTPRecipientsRefused({"ops@example.com": (450, b"Mailbox busy")}),
+        )
+        self.drain(deliverer)
+        self.assertEqual(self.row(hard)[0], "failed")
+        self.assertEqual(self.row(soft)[0], "queued")
+
+    def test_authentication_failure_is_retried(self):
+        msg_id = self.enqueue()
+        self.drain(FakeDeliverer(smtplib.SMTPAuthenticationError(535, b"Bad credentials")))
+        self.assertEqual(self.row(msg_id)[0], "queued")
+
+    def test_unexpected_error_is_retried_then_failed(self):
+        bad = self.enqueue("bad")
+        good = self.enqueue("good")
+        deliverer = FakeDeliverer(poison=b"bad")
+        self.drain(deliverer, max_attempts=2, base_delay=0)
+        status, attempts, error = self.row(bad)
+        self.assertEqual((status, attempts), ("failed", 2))
+        self.assertTrue(error.startswith("KeyError"))
+        self.assertEqual(self.row(good)[0], "sent")
+        self.assertEqual(deliverer.closed, 2)
+
+    def test_row_claimed_by_another_worker_is_skipped(self):
+        msg_id = self.enqueue()
+        status, next_at = self.conn.execute(
+            "SELECT status, next_attempt_at FROM outbox WHERE id = ?", (msg_id,)).fetchone()
+        self.assertTrue(email_queue.claim(self.conn, msg_id, status, next_at))
+        self.assertFalse(email_queue.claim(self.conn, msg_id, status, next_at))  # Lost the race
+        deliverer = FakeDeliverer()
+        self.assertEqual(self.drain(deliverer)["sent"], 0)
+        self.assertEqual(deliverer.sent, [])
+
+    def test_expired_lease_is_reclaimed(self):
+        msg_id = self.enqueue()
+        with self.conn:
+            self.conn.execute("UPDATE outbox SET status = 'sending', next_attempt_at = ? WHERE id = ?",
+                              (time.time() - 1, msg_id))
+        self.assertEqual(self.drain(FakeDeliverer())["sent"], 1)
+        self.assertEqual(self.row(msg_id)[0], "sent")
+
+
+class DelivererTest(unittest.TestCase):
+    def test_failed_login_closes_the_socket(self):
+        with mock.patch.object(email_queue.smtplib, "SMTP") as smtp:
+            server = smtp.return_value
+            server.login.side_effect = smtplib.SMTPAuthenticationError(535, b"Bad credentials")
+            deliverer = email_queue.Deliverer("smtp.example.com", 587, "bot", "secret")
+            with self.assertRaises(smtplib.SMTPAuthenticationError):
+                deliverer.send(message().as_bytes(), "bot@example.com", ["ops@example.com"])
+        server.close.assert_called_once()
+        self.assertIsNone(deliverer.server)
+
+    def test_failed_starttls_closes_the_socket(self):
+        with mock.patch.object(email_queue.smtplib, "SMTP") as smtp:
+            server = smtp.return_value
+            server.starttls.side_effect = smtplib.SMTPNotSupportedError("STARTTLS not supported")
+            deliverer = email_queue.Deliverer("smtp.example.com", 587, None, None)
+            with self.assertRaises(smtplib.SMTPNotSupportedError):
+                deliverer.send(message().as_bytes(), "bot@example.com", ["ops@example.com"])
+        server.close.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
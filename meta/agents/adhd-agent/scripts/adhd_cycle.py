@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+ADHD Agent — Cycle Runner
+Runs a whole cycle in one process: scan the registries, then render the HTML
+and Telegram status reports from the same in-memory skills and findings.
+Replaces `scan_skills.py --json | generate_status_report.py --scan-output -`,
+which started Python once per step, round-tripped the findings through JSON
+and re-walked every registry for the report.
+
+Usage:
+  python3 adhd_cycle.py [--registries path1 path2 ...] [--exceptions path]
+                        [--html /tmp/adhd_status.html] [--telegram -|path]
+                        [--scan-json path]
+  python3 adhd_cycle.py --loop [--interval 14400] ...   # long-lived scheduler mode
+
+--loop keeps the process (and a parse cache of unchanged SKILL.md files)
+alive between cycles. Each cycle logs its stage timings to stderr.
+"""
+from __future__ import annotations
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Optional
+
+import scan_skills
+import generate_status_report as report
+
+# ─── Cycle ────────────────────────────────────────────────────────────────────
+
+def write_output(target: str, text: str):
+    """Write to a file, or stdout for '-'."""
+    if target == "-":
+        print(text)
+        return
+    out = Path(target)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(text, encoding="utf-8")
+
+
+def run_cycle(args: argparse.Namespace, cache: Optional[dict] = None) -> dict:
+    """One scan + report cycle; returns the scan document and per-stage timings."""
+    timings = {}
+    start = time.perf_counter()
+
+    registry_paths = [Path(p) for p in args.registries] if args.registries else scan_skills.DEFAULT_REGISTRIES
+    exceptions = scan_skills.load_exception_rules(args.exceptions, args.no_exceptions)
+    skills, findings = scan_skills.scan(registry_paths, exceptions, args.min_severity, cache)
+    scan_data = scan_skills.scan_output(registry_paths, skills, findings,
+                                        args.exceptions if not args.no_exceptions else "(disabled)")
+    timings["scan"] = time.perf_counter() - start
+
+    mark = time.perf_counter()
+    bridge = report.check_bridge(args.bridge_url)  # Once per cycle, shared by both reports
+    timings["bridge"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    inventory = report.inventory_from_skills(skills)
+    if args.html:
+        write_output(args.html, report.build_html(scan_data, args.bridge_url, inventory, bridge))
+    if args.telegram:
+        write_output(args.telegram, report.build_telegram(scan_data, args.bridge_url, inventory, bridge))
+    if args.scan_json:
+        write_output(args.scan_json, json.dumps(scan_data, indent=2))
+    timings["reports"] = time.perf_counter() - mark
+
+    timings["total"] = time.perf_counter() - start
+    return {"scan": scan_data, "timings": timings}
+
+
+def log_cycle(result: dict):
+    t = result["timings"]
+    scan = result["scan"]
+    print(f"[adhd] cycle {t['total'] * 1000:.0f}ms (scan {t['scan'] * 1000:.0f}ms, "
+          f"bridge {t['bridge'] * 1000:.0f}ms, reports {t['reports'] * 1000:.0f}ms) — "
+          f"{scan['total_skills']} skills, {len(scan['findings'])} findings", file=sys.stderr, flush=True)
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="ADHD Agent scan + status reports in one process")
+    parser.add_argument("--registries", nargs="+", help="Override registry paths")
+    parser.add_argument("--exceptions", default=str(scan_skills.DEFAULT_EXCEPTIONS_FILE),
+                        help="Path to exceptions.json")
+    parser.add_argument("--no-exceptions", action="store_true", help="Ignore all exception rules")
+    parser.add_argument("--min-severity", choices=["info", "low", "medium", "high"], default="low")
+    parser.add_argument("--bridge-url", default="http://127.0.0.1:3001", help="Bridge URL for health check")
+    parser.add_argument("--html", help="Write the HTML report here")
+    parser.add_argument("--telegram", help="Write the Telegram report here ('-' for stdout)")
+    parser.add_argument("--scan-json", help="Write the scan_skills.py --json document here ('-' for stdout)")
+    parser.add_argument("--loop", action="store_true", help="Keep running, one cycle every --interval seconds")
+    parser.add_argument("--interval", type=float, default=14400, help="Seconds between cycle starts (default: 4h)")
+    args = parser.parse_args()
+
+    if not args.loop:
+        log_cycle(run_cycle(args))
+        return
+
+    cache: dict = {}
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                log_cycle(run_cycle(args, cache))
+            except Exception as e:  # A bad cycle must not kill the scheduler
+                print(f"[adhd] ⚠️  cycle failed: {e!r}", file=sys.stderr, flush=True)
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -111,14 +111,11 @@ PYEOF
 }
 
 send_status_report() {
-  local SCAN_JSON="$1"
+  local MESSAGE_FILE="$1"
 
-  # Generate Telegram-formatted status message
+  # Telegram-formatted status message, rendered by adhd_cycle.py in the scan's process
   local MESSAGE
-  MESSAGE=$(echo "$SCAN_JSON" | python3 "$SCRIPT_DIR/generate_status_report.py" \
-    --scan-output - \
-    --format telegram \
-    --bridge-url "${BRIDGE_URL:-http://127.0.0.1:3001}" 2>/dev/null)
+  MESSAGE=$(cat "$MESSAGE_FILE" 2>/dev/null)
 
   if [[ -z "$MESSAGE" ]]; then
     log "⚠️  Status report generation failed"
@@ -188,19 +185,25 @@ MSG
 run_cycle() {
   log "🔍 Starting scan cycle..."
 
-  # Run scanner with registries from config
-  SCAN_OUTPUT=$(python3 "$SCRIPT_DIR/scan_skills.py" --json \
+  # Scan registries from config and render the status report in one process
+  local CYCLE_DIR
+  CYCLE_DIR=$(mktemp -d)
+  python3 "$SCRIPT_DIR/adhd_cycle.py" \
     --registries "${SKILL_REGISTRIES[@]}" \
-    --exceptions "$AGENT_DIR/config/exceptions.json" 2>/dev/null || echo '{"findings":[]}')
-  TOTAL_SKILLS=$(echo "$SCAN_OUTPUT" | python3 -c "import json,sys; print(json.load(sys.stdin).get('total_skills', 0))" 2>/dev/null || echo "?")
-  FINDING_COUNT=$(echo "$SCAN_OUTPUT" | python3 -c "import json,sys; print(len([f for f in json.load(sys.stdin).get('findings',[]) if f.get('severity') != 'info']))" 2>/dev/null || echo "0")
+    --exceptions "$AGENT_DIR/config/exceptions.json" \
+    --bridge-url "${BRIDGE_URL:-http://127.0.0.1:3001}" \
+    --scan-json "$CYCLE_DIR/scan.json" \
+    --telegram "$CYCLE_DIR/status.md" 2>>"$LOG" || log "⚠️  Scan cycle failed"
+  SCAN_OUTPUT=$(cat "$CYCLE_DIR/scan.json" 2>/dev/null || echo '{"findings":[]}')
+  read -r TOTAL_SKILLS FINDING_COUNT < <(echo "$SCAN_OUTPUT" | python3 -c "import json,sys; d=json.load(sys.stdin); print(d.get('total_skills', 0), len([f for f in d.get('findings',[]) if f.get('severity') != 'info']))" 2>/dev/null || echo "? 0")
 
   log "📊 Scanned $TOTAL_SKILLS skills — $FINDING_COUNT actionable findings"
 
   # Always send the status report (every cycle, even if clean)
   if [[ "$DRY_RUN" == "false" ]]; then
-    send_status_report "$SCAN_OUTPUT"
+    send_status_report "$CYCLE_DIR/status.md"
   fi
+  rm -rf "$CYCLE_DIR"
 
   if [[ "$FINDING_COUNT" -eq 0 ]]; then
     log "✨ No issues found. System is clean."
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+ADHD Agent — Cycle Benchmark
+Times one scan + report cycle end to end, the old way and the new way, on a
+synthetic set of registries (so the numbers do not depend on this machine's
+skills) with the bridge pointed at a closed local port:
+
+  pipeline   scan_skills.py --json, then generate_status_report.py once for
+             HTML and once for Telegram (three Python processes, JSON on stdin)
+  cycle      adhd_cycle.py: one process, shared in-memory scan data
+  loop       further cycles inside a long-lived process (adhd_cycle.py --loop)
+
+Also checks that both ways produce the same Telegram message and HTML report.
+
+Usage:
+  python3 bench_cycle.py [--registries 4] [--skills 150] [--repeat 5]
+"""
+from __future__ import annotations
+
+import re
+import sys
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import time
+import random
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent
+WORDS = ["deploy", "docker", "review", "python", "testing", "database", "schema", "api", "design", "security",
+         "audit", "logging", "metrics", "react", "frontend", "backend", "cache", "queue", "release", "docs"]
+
+# ─── Fixture ──────────────────────────────────────────────────────────────────
+
+def build_registries(root: Path, registries: int, skills: int, seed: int) -> list[Path]:
+    """Registries of <skill>/SKILL.md; some names repeat across registries so every detector has work."""
+    rng = random.Random(seed)
+    paths = []
+    for r in range(registries):
+        registry = root / f"registry-{r}" / "skills"
+        for s in range(skills):
+            name = f"skill-{s}" if s % 10 == 0 else f"skill-{r}-{s}"  # Every tenth name is shared
+            topic = " ".join(rng.sample(WORDS, 6))
+            body = "" if s % 25 == 0 else "\n".join(f"Step {i}: {topic}" for i in range(rng.randint(5, 40)))
+            folder = registry / name
+            folder.mkdir(parents=True)
+            (folder / "SKILL.md").write_text(
+                f"---\nname: {name}\ndescription: Helps with {topic} tasks\n---\n\n# {name}\n\n{body}\n",
+                encoding="utf-8")
+        paths.append(registry)
+    return paths
+
+
+def closed_port_url() -> str:
+    """A localhost URL nothing is listening on: the bridge check fails fast, as when the bridge is down."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+# ─── Runs ─────────────────────────────────────────────────────────────────────
+
+def run(cmd: list[str], stdin: str | None = None) -> str:
+    return subprocess.run(cmd, input=stdin, capture_output=True, text=True, check=True).stdout
+
+
+def pipeline(registries: list[Path], exceptions: Path, bridge: str, out: Path) -> tuple[str, str]:
+    """The old cycle: three processes; returns (telegram, html)."""
+    scan_json = run([sys.executable, str(SCRIPTS / "scan_skills.py"), "--json", "--exceptions", str(exceptions),
+                     "--registries", *map(str, registries)])
+    run([sys.executable, str(SCRIPTS / "generate_status_report.py"), "--scan-output", "-",
+         "--format", "html", "--output", str(out), "--bridge-url", bridge], stdin=scan_json)
+    telegram = run([sys.executable, str(SCRIPTS / "generate_status_report.py"), "--scan-output", "-",
+                    "--format", "telegram", "--bridge-url", bridge], stdin=scan_json)
+    return telegram, out.read_text(encoding="utf-8")
+
+
+def cycle(registries: list[Path], exceptions: Path, bridge: str, out: Path) -> tuple[str, str]:
+    """The new cycle: one adhd_cycle.py process; returns (telegram, html)."""
+    telegram = run([sys.executable, str(SCRIPTS / "adhd_cycle.py"), "--exceptions", str(exceptions),
+                    "--bridge-url", bridge, "--html", str(out), "--telegram", "-",
+                    "--registries", *map(str, registries)])
+    return telegram, out.read_text(encoding="utf-8")
+
+
+def warm_cycles(registries: list[Path], exceptions: Path, bridge: str, out: Path, repeat: int) -> list[float]:
+    """Cycle times inside one process with a shared parse cache (what --loop does after its first cycle)."""
+    sys.path.insert(0, str(SCRIPTS))
+    import adhd_cycle
+
+    args = argparse.Namespace(registries=list(map(str, registries)), exceptions=str(exceptions),
+                              no_exceptions=False, min_severity="low", bridge_url=bridge,
+                              html=str(out), telegram=str(out.with_suffix(".txt")), scan_json=None)
+    cache: dict = {}
+    adhd_cycle.run_cycle(args, cache)  # First cycle fills the cache
+    return [adhd_cycle.run_cycle(args, cache)["timings"]["total"] for _ in range(repeat)]
+
+
+def timed(fn, repeat: int, *args) -> tuple[list[float], tuple[str, str]]:
+    samples, result = [], ("", "")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def comparable(text: str) -> str:
+    """Drop the generation timestamps so two runs of the same cycle compare equal."""
+    return re.sub(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2})?( UTC)?", "<time>", text)
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="ADHD cycle time: three-process pipeline vs adhd_cycle.py")
+    parser.add_argument("--registries", type=int, default=4, help="Synthetic registries (default: 4)")
+    parser.add_argument("--skills", type=int, default=150, help="Skills per registry (default: 150)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        registries = build_registries(root, args.registries, args.skills, args.seed)
+        exceptions = root / "exceptions.json"
+        exceptions.write_text('{"cross_registry_intentional": [], "registry_pair_rules": []}', encoding="utf-8")
+        bridge = closed_port_url()
+
+        before, (old_tg, old_html) = timed(pipeline, args.repeat, registries, exceptions, bridge, root / "old.html")
+        after, (new_tg, new_html) = timed(cycle, args.repeat, registries, exceptions, bridge, root / "new.html")
+        warm = warm_cycles(registries, exceptions, bridge, root / "warm.html", args.repeat)
+
+    print(f"{args.registries} registries × {args.skills} skills, median of {args.repeat}")
+    print(f"  pipeline (3 processes)   {statistics.median(before) * 1000:8.0f}ms")
+    print(f"  adhd_cycle.py            {statistics.median(after) * 1000:8.0f}ms  "
+          f"({statistics.median(before) / statistics.median(after):.1f}x)")
+    print(f"  --loop, warm cycle       {statistics.median(warm) * 1000:8.0f}ms  "
+          f"({statistics.median(before) / statistics.median(warm):.1f}x)")
+
+    same = comparable(old_tg) == comparable(new_tg) and comparable(old_html) == comparable(new_html)
+    print("Reports match the old pipeline" if same else "FAIL: reports differ from the old pipeline")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+ADHD Agent — Startup Benchmark
+Guards cold-start time of the scripts the scheduler launches. Each module is
+imported in a fresh `python -X importtime` process; the benchmark reports its
+cumulative import time (median of --repeat runs), how many modules it loads
+(deterministic, unlike the timings), the heaviest imports under it, and fails if
+
+  - a module's import takes longer than --budget-ms, or
+  - a module pulls in something that must stay lazy (LAZY_IMPORTS), such as
+    urllib.request, which only the bridge health check needs.
+
+Usage:
+  python3 bench_startup.py [--repeat 7] [--budget-ms 75] [--top 5]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent
+
+MODULES = ["scan_skills", "generate_status_report", "adhd_cycle"]
+
+# Imported on first use inside a function, never at module import
+LAZY_IMPORTS = {"urllib.request", "http.client", "difflib", "subprocess", "socket"}
+
+# ─── Measurement ──────────────────────────────────────────────────────────────
+
+def import_times(module: str) -> dict[str, int]:
+    """{imported module: cumulative µs} for what importing `module` loads, in a fresh interpreter."""
+    env = dict(os.environ, PYTHONPATH=str(SCRIPTS))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, env=env, cwd=SCRIPTS, check=True)
+    times = {}
+    for line in proc.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.strip() == "site":  # Interpreter startup ends here; the rest is ours
+            times = {}
+            continue
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def measure(module: str, repeat: int) -> tuple[float, dict[str, int]]:
+    """(median ms to import `module`, per-import µs from the median run)."""
+    import_times(module)  # Warm the .pyc cache so the first run isn't a compile
+    runs = sorted((import_times(module) for _ in range(repeat)), key=lambda t: t[module])
+    median = runs[len(runs) // 2]
+    return median[module] / 1000, median
+
+
+def heaviest(times: dict[str, int], module: str, top: int) -> list[tuple[str, int]]:
+    """Top-level imports (no dotted submodules) under `module`, slowest first."""
+    found = [(name, us) for name, us in times.items() if name != module and "." not in name]
+    return sorted(found, key=lambda x: x[1], reverse=True)[:top]
+
+# ─── Main ─────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time of the ADHD agent scripts")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=75.0,
+                        help="Fail if any module takes longer than this to import (default: 75)")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports to list per module")
+    args = parser.parse_args()
+
+    failures = []
+    for module in MODULES:
+        ms, times = measure(module, args.repeat)
+        print(f"{module:<24} {ms:7.1f}ms  {len(times):4d} modules")
+        for name, us in heaviest(times, module, args.top):
+            print(f"    {name:<20} {us / 1000:7.1f}ms")
+        eager = sorted(LAZY_IMPORTS & times.keys())
+        if eager:
+            failures.append(f"{module} imports {', '.join(eager)} at startup")
+        if ms > args.budget_ms:
+            failures.append(f"{module} takes {ms:.1f}ms to import (budget {args.budget_ms:.0f}ms)")
+
+    print()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"All modules import within {args.budget_ms:.0f}ms with no eager heavy imports")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,14 +12,13 @@ Usage:
 Stdin (-): pass JSON output from scan_skills.py via pipe.
 """
 
+import re
 import json
 import sys
 import argparse
-import subprocess
-import socket
-import urllib.request
 from pathlib import Path
 from datetime import datetime, timezone
+from typing import Optional
 
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
@@ -45,9 +44,12 @@ KIND_LABEL = {
     "cross_registry_intentional":"Cross-Registry (intentional)",
 }
 
+NAME_RE = re.compile(r'^name:\s*(.+)$', re.MULTILINE)
+
 
 def check_bridge(bridge_url: str) -> tuple[bool, str]:
     """Return (healthy, status_string)."""
+    import urllib.request  # Deferred: pulls in http.client, email and ssl, needed once per cycle
     try:
         health_url = bridge_url.rstrip("/") + "/health"
         with urllib.request.urlopen(health_url, timeout=3) as r:
@@ -92,8 +94,7 @@ def load_skills_by_registry(scan_data: dict) -> dict[str, list[dict]]:
                     name = entry.name
                     try:
                         text = skill_md.read_text(encoding="utf-8")
-                        import re
-                        m = re.search(r'^name:\s*(.+)$', text, re.MULTILINE)
+                        m = NAME_RE.search(text)
                         if m:
                             name = m.group(1).strip().strip('"\'')
                     except Exception:
@@ -104,9 +105,23 @@ def load_skills_by_registry(scan_data: dict) -> dict[str, list[dict]]:
     return by_reg
 
 
+def inventory_from_skills(skills: list) -> dict[str, list[dict]]:
+    """
+    Skills per registry path ({"name", "path"} dicts), built from the Skill
+    objects a scan already loaded (adhd_cycle.py) instead of re-walking the
+    registries.
+    """
+    by_path: dict[str, list[dict]] = {}
+    for s in skills:
+        by_path.setdefault(s.registry, []).append({"name": s.name, "path": s.path})
+    return by_path
+
+
 # ─── HTML Builder ─────────────────────────────────────────────────────────────
 
-def build_html(scan_data: dict, bridge_url: str) -> str:
+def build_html(scan_data: dict, bridge_url: str, inventory: Optional[dict] = None,
+               bridge: Optional[tuple[bool, str]] = None) -> str:
+    """inventory / bridge: precomputed inventory_from_skills() and check_bridge() results (else looked up here)."""
     now = datetime.now(timezone.utc)
     timestamp = now.strftime("%Y-%m-%d %H:%M UTC")
     scan_ts = scan_data.get("scan_timestamp", timestamp)
@@ -115,11 +130,14 @@ def build_html(scan_data: dict, bridge_url: str) -> str:
     info_findings = [f for f in scan_data.get("findings", []) if f.get("severity") == "info"]
     total_skills = scan_data.get("total_skills", "?")
 
-    bridge_ok, bridge_status = check_bridge(bridge_url)
+    bridge_ok, bridge_status = bridge or check_bridge(bridge_url)
     bridge_badge_color = "#27ae60" if bridge_ok else "#e74c3c"
     bridge_icon = "✅" if bridge_ok else "❌"
 
-    skills_by_registry = load_skills_by_registry(scan_data)
+    if inventory is not None:  # Same shape as load_skills_by_registry: a later registry with the same label wins
+        skills_by_registry = {registry_label(reg): inventory.get(reg, []) for reg in scan_data.get("scanned_registries", [])}
+    else:
+        skills_by_registry = load_skills_by_registry(scan_data)
 
     # ── Finding rows ──
     def finding_row(f: dict) -> str:
@@ -288,7 +306,8 @@ def build_html(scan_data: dict, bridge_url: str) -> str:
 
 # ─── Telegram Format ──────────────────────────────────────────────────────────
 
-def build_telegram(scan_data: dict, bridge_url: str) -> str:
+def build_telegram(scan_data: dict, bridge_url: str, inventory: Optional[dict] = None,
+                   bridge: Optional[tuple[bool, str]] = None) -> str:
     """Build a concise Telegram Markdown status report (fits within 4096 char limit)."""
     now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
     total = scan_data.get("total_skills", 0)
@@ -296,7 +315,7 @@ def build_telegram(scan_data: dict, bridge_url: str) -> str:
     findings = [f for f in all_findings if f.get("severity") != "info"]
     info_findings = [f for f in all_findings if f.get("severity") == "info"]
 
-    bridge_ok, bridge_status = check_bridge(bridge_url)
+    bridge_ok, bridge_status = bridge or check_bridge(bridge_url)
     bridge_icon = "✅" if bridge_ok else "❌"
 
     lines = [
@@ -309,12 +328,15 @@ def build_telegram(scan_data: dict, bridge_url: str) -> str:
     lines.append(f"📦 *Skills — {total} total*")
     for reg in scan_data.get("scanned_registries", []):
         label = registry_label(reg)
-        p = Path(reg)
-        names = []
-        if p.exists():
-            for e in sorted(p.iterdir()):
-                if e.is_dir() and (e / "SKILL.md").exists():
-                    names.append(e.name)
+        if inventory is not None:
+            names = [Path(s["path"]).parent.name for s in inventory.get(reg, [])]
+        else:
+            p = Path(reg)
+            names = []
+            if p.exists():
+                for e in sorted(p.iterdir()):
+                    if e.is_dir() and (e / "SKILL.md").exists():
+                        names.append(e.name)
         preview = ", ".join(names[:5])
         ellipsis = "…" if len(names) > 5 else ""
         lines.append(f"  • *{label}*: {len(names)} → `{preview}{ellipsis}`")
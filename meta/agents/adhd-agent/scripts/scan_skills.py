@@ -10,11 +10,10 @@ Usage: python3 scan_skills.py [--registries path1 path2 ...] [--json]
 """
 from __future__ import annotations
 
-import os
 import re
 import json
 import argparse
-import difflib
+from functools import lru_cache
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from typing import Optional, List, Dict
@@ -115,6 +114,11 @@ def is_cross_registry_exception(skill_name: str, registry_a: str, registry_b: st
 
 # ─── Parser ───────────────────────────────────────────────────────────────────
 
+NAME_RE = re.compile(r'^name:\s*(.+)$', re.MULTILINE)
+DESC_BLOCK_RE = re.compile(r'^description:\s*[>|]?\s*\n((?:[ \t]+.+\n?)*)', re.MULTILINE)  # YAML block scalar
+DESC_LINE_RE = re.compile(r'^description:\s*(.+)$', re.MULTILINE)
+
+
 def parse_skill_md(path: Path) -> tuple[str, str, int]:
     """Returns (name, description, body_line_count)"""
     try:
@@ -146,16 +150,16 @@ def parse_skill_md(path: Path) -> tuple[str, str, int]:
 
     # Parse name and description from frontmatter
     fm_text = "\n".join(fm_lines)
-    name_match = re.search(r'^name:\s*(.+)$', fm_text, re.MULTILINE)
+    name_match = NAME_RE.search(fm_text)
     if name_match:
         name = name_match.group(1).strip().strip('"\'')
 
     # Description can be multiline (YAML block scalar)
-    desc_match = re.search(r'^description:\s*[>|]?\s*\n((?:[ \t]+.+\n?)*)', fm_text, re.MULTILINE)
+    desc_match = DESC_BLOCK_RE.search(fm_text)
     if desc_match:
         description = " ".join(desc_match.group(1).split()).strip()
     else:
-        desc_match = re.search(r'^description:\s*(.+)$', fm_text, re.MULTILINE)
+        desc_match = DESC_LINE_RE.search(fm_text)
         if desc_match:
             description = desc_match.group(1).strip().strip('"\'')
 
@@ -164,7 +168,14 @@ def parse_skill_md(path: Path) -> tuple[str, str, int]:
     return name, description, body_lines
 
 
-def load_registry(registry_path: Path) -> List[Skill]:
+def load_registry(registry_path: Path, cache: Optional[dict] = None) -> List[Skill]:
+    """
+    Load every <skill>/SKILL.md in a registry.
+
+    cache (optional, shared across calls) maps SKILL.md path → (mtime, size,
+    parsed fields) so a long-lived process only re-parses files that changed;
+    scan() drops the entries of paths it no longer finds.
+    """
     skills = []
     if not registry_path.exists():
         return skills
@@ -173,10 +184,19 @@ def load_registry(registry_path: Path) -> List[Skill]:
         if not entry.is_dir():
             continue
         skill_md = entry / "SKILL.md"
-        if not skill_md.exists():
+        try:
+            st = skill_md.stat()
+        except OSError:
             continue
 
-        name, description, body_lines = parse_skill_md(skill_md)
+        key = str(skill_md)
+        cached = cache.get(key) if cache is not None else None
+        if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+            name, description, body_lines = cached[2]
+        else:
+            name, description, body_lines = parse_skill_md(skill_md)
+            if cache is not None:
+                cache[key] = (st.st_mtime_ns, st.st_size, (name, description, body_lines))
         if not name:
             name = entry.name  # fallback to folder name
 
@@ -196,24 +216,42 @@ def load_registry(registry_path: Path) -> List[Skill]:
 
 # ─── Detection Logic ──────────────────────────────────────────────────────────
 
+# Stop words and boilerplate to ignore when comparing descriptions
+STOP_WORDS = frozenset({"the", "and", "a", "to", "of", "in", "for", "is", "on", "that", "by", "this", "with", "i", "you", "it", "not", "or", "be", "are", "from", "at", "as", "your", "all", "have", "new", "more", "an", "was", "we", "will", "home", "can", "us", "about", "if", "page", "my", "has", "search", "free", "but", "our", "one", "other", "do", "no", "information", "time", "they", "site", "he", "up", "may", "what", "which", "their", "news", "out", "use", "any", "there", "see", "only", "so", "his", "when", "contact", "here", "business", "who", "web", "also", "now", "help", "get", "pm", "view", "online", "c", "e", "first", "am", "been", "would", "how", "were", "me", "s", "services", "some", "these", "click", "its", "like", "service", "x", "than", "find", "price", "date", "back", "top", "people", "had", "list", "name", "just", "over", "state", "year", "day", "into", "email", "two", "health", "n", "world", "re", "next", "used", "go", "b", "work", "last", "most", "products", "music", "buy", "data", "make", "them", "should", "product", "system", "post", "her", "city", "t", "add", "policy", "number", "such", "please", "available", "copyright", "support", "message", "after", "best", "software", "then", "jan", "good", "video", "well", "d", "where", "info", "rights", "public", "books", "high", "school", "through", "m", "each", "links", "she", "review", "years", "order", "very", "privacy", "book", "items", "company", "read", "group", "sex", "need", "many", "user", "said", "de", "does", "set", "under", "general", "research", "university", "january", "mail", "full", "map", "reviews", "program", "life", "know", "games", "way", "days", "management", "p", "part", "could", "great", "united", "hotel", "real", "f", "item", "international", "center", "ebay", "must", "store", "travel", "comments", "made", "development", "report", "off", "member", "details", "line", "terms", "before", "hotels", "did", "send", "right", "type", "because", "local", "those", "using", "results", "office", "education", "national", "car", "design", "take", "posted", "internet", "address", "community", "within", "states", "area", "want", "phone", "dvd", "shipping", "reserved", "subject", "between", "forum", "family", "l", "long", "based", "w", "code", "show", "o", "even", "black", "check", "special", "prices", "website", "index", "women", "much", "sign", "file", "link", "open", "today", "technology", "south", "case", "project", "same", "pages", "uk", "version", "section", "own", "found", "sports", "house", "related", "security", "both", "county", "american", "photo", "game", "members", "power", "while", "care", "network", "down", "computer", "systems", "three", "total", "place", "end", "following", "download", "h", "him", "without", "per", "access", "think", "north", "resources", "current", "posts", "big", "media", "law", "control", "water", "history", "pictures", "size", "art", "personal", "since", "including", "guide", "shop", "directory", "board", "location", "change", "white", "text", "small", "rating", "rate", "government", "children", "during", "usa", "return", "students", "v", "shopping", "account", "times", "sites", "level", "digital", "profile", "previous", "form", "events", "love", "old", "john", "main", "call", "hours", "image", "department", "title", "description", "non", "k", "y", "insurance", "another", "why", "shall", "property", "class", "cd", "still", "money", "quality", "every", "listing", "content", "country", "private", "little", "visit", "save", "tools", "low", "reply", "customer", "december", "compare", "movies", "include", "college", "value", "article", "york", "man", "card", "jobs", "provide", "j", "food", "source", "author", "different", "press", "u", "learn", "sale", "around", "print", "course", "job", "canada", "process", "teen", "room", "stock", "training", "too", "credit", "point", "join", "science", "men", "categories", "advanced", "west", "sales", "look", "english", "left", "team", "estate", "box", "conditions", "select", "windows", "photos", "thread", "week", "category", "note", "live", "large", "gallery", "table", "register", "however", "june", "october", "november", "market", "library", "really", "action", "start", "series", "model", "features", "air", "industry", "plan", "human", "provided", "tv", "yes", "required", "second", "hot", "accessories", "cost", "movie", "forums", "march", "la", "september", "better", "say", "questions", "july", "yahoo", "going", "medical", "test", "friend", "come", "server", "studios", "search", "skill", "agent", "use", "when", "this", "files", "scripts", "run", "how"})
+
+# Generic words that say nothing about what a skill is for
+CORE_NAME_IGNORE = frozenset({"patterns", "best", "practices", "expert", "design", "development", "integration", "management", "systems", "advanced", "workflows", "engineering", "mastery", "operations", "agent", "workflow"})
+
+NAME_SEP_RE = re.compile(r'[-_\s]+')
+WORD_RE = re.compile(r'\b[a-z]+\b')
+NAME_WORD_RE = re.compile(r'[a-z]+')
+
+
 def normalize_name(name: str) -> str:
-    return re.sub(r'[-_\s]+', '-', name.lower().strip())
+    return NAME_SEP_RE.sub('-', name.lower().strip())
+
+
+# Comfortably above any registry's skill count; bounded so `adhd_cycle.py --loop`
+# does not keep the tokens of every description it has ever seen
+DESC_TOKENS_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DESC_TOKENS_CACHE_SIZE)
+def desc_tokens(s: str) -> frozenset:
+    """Lowercase alphabetic tokens minus stop words; cached because every pair of skills re-compares them."""
+    return frozenset(t for t in WORD_RE.findall(s.lower()) if t not in STOP_WORDS and len(t) > 2)
+
+
+def core_name_tokens(name: str) -> set:
+    return set(t for t in NAME_WORD_RE.findall(name.lower()) if t not in CORE_NAME_IGNORE)
 
 
 def desc_similarity(a: str, b: str) -> float:
     if not a or not b:
         return 0.0
 
-    # Stop words and boilerplate to ignore
-    stop_words = {"the", "and", "a", "to", "of", "in", "for", "is", "on", "that", "by", "this", "with", "i", "you", "it", "not", "or", "be", "are", "from", "at", "as", "your", "all", "have", "new", "more", "an", "was", "we", "will", "home", "can", "us", "about", "if", "page", "my", "has", "search", "free", "but", "our", "one", "other", "do", "no", "information", "time", "they", "site", "he", "up", "may", "what", "which", "their", "news", "out", "use", "any", "there", "see", "only", "so", "his", "when", "contact", "here", "business", "who", "web", "also", "now", "help", "get", "pm", "view", "online", "c", "e", "first", "am", "been", "would", "how", "were", "me", "s", "services", "some", "these", "click", "its", "like", "service", "x", "than", "find", "price", "date", "back", "top", "people", "had", "list", "name", "just", "over", "state", "year", "day", "into", "email", "two", "health", "n", "world", "re", "next", "used", "go", "b", "work", "last", "most", "products", "music", "buy", "data", "make", "them", "should", "product", "system", "post", "her", "city", "t", "add", "policy", "number", "such", "please", "available", "copyright", "support", "message", "after", "best", "software", "then", "jan", "good", "video", "well", "d", "where", "info", "rights", "public", "books", "high", "school", "through", "m", "each", "links", "she", "review", "years", "order", "very", "privacy", "book", "items", "company", "read", "group", "sex", "need", "many", "user", "said", "de", "does", "set", "under", "general", "research", "university", "january", "mail", "full", "map", "reviews", "program", "life", "know", "games", "way", "days", "management", "p", "part", "could", "great", "united", "hotel", "real", "f", "item", "international", "center", "ebay", "must", "store", "travel", "comments", "made", "development", "report", "off", "member", "details", "line", "terms", "before", "hotels", "did", "send", "right", "type", "because", "local", "those", "using", "results", "office", "education", "national", "car", "design", "take", "posted", "internet", "address", "community", "within", "states", "area", "want", "phone", "dvd", "shipping", "reserved", "subject", "between", "forum", "family", "l", "long", "based", "w", "code", "show", "o", "even", "black", "check", "special", "prices", "website", "index", "women", "much", "sign", "file", "link", "open", "today", "technology", "south", "case", "project", "same", "pages", "uk", "version", "section", "own", "found", "sports", "house", "related", "security", "both", "county", "american", "photo", "game", "members", "power", "while", "care", "network", "down", "computer", "systems", "three", "total", "place", "end", "following", "download", "h", "him", "without", "per", "access", "think", "north", "resources", "current", "posts", "big", "media", "law", "control", "water", "history", "pictures", "size", "art", "personal", "since", "including", "guide", "shop", "directory", "board", "location", "change", "white", "text", "small", "rating", "rate", "government", "children", "during", "usa", "return", "students", "v", "shopping", "account", "times", "sites", "level", "digital", "profile", "previous", "form", "events", "love", "old", "john", "main", "call", "hours", "image", "department", "title", "description", "non", "k", "y", "insurance", "another", "why", "shall", "property", "class", "cd", "still", "money", "quality", "every", "listing", "content", "country", "private", "little", "visit", "save", "tools", "low", "reply", "customer", "december", "compare", "movies", "include", "college", "value", "article", "york", "man", "card", "jobs", "provide", "j", "food", "source", "author", "different", "press", "u", "learn", "sale", "around", "print", "course", "job", "canada", "process", "teen", "room", "stock", "training", "too", "credit", "point", "join", "science", "men", "categories", "advanced", "west", "sales", "look", "english", "left", "team", "estate", "box", "conditions", "select", "windows", "photos", "thread", "week", "category", "note", "live", "large", "gallery", "table", "register", "however", "june", "october", "november", "market", "library", "really", "action", "start", "series", "model", "features", "air", "industry", "plan", "human", "provided", "tv", "yes", "required", "second", "hot", "accessories", "cost", "movie", "forums", "march", "la", "september", "better", "say", "questions", "july", "yahoo", "going", "medical", "test", "friend", "come", "server", "studios", "search", "skill", "agent", "use", "when", "this", "files", "scripts", "run", "how"}
-
-    def get_tokens(s):
-        # Convert to lowercase and find alphabetic tokens
-        tokens = re.findall(r'\b[a-z]+\b', s.lower())
-        return {t for t in tokens if t not in stop_words and len(t) > 2}
-
-    tokens_a = get_tokens(a)
-    tokens_b = get_tokens(b)
+    tokens_a = desc_tokens(a)
+    tokens_b = desc_tokens(b)
 
     if not tokens_a and not tokens_b:
         return 0.0
@@ -297,11 +335,12 @@ def find_exact_duplicates(all_skills: List[Skill], exceptions: dict) -> List[Fin
 def find_near_duplicates(all_skills: List[Skill], exceptions: dict, threshold: float = 0.75) -> List[Finding]:
     findings = []
     seen_pairs = set()
+    norm_names = [normalize_name(s.name) for s in all_skills]
 
     for i, a in enumerate(all_skills):
         for j in range(i + 1, len(all_skills)):
             b = all_skills[j]  # type: ignore
-            if normalize_name(a.name) == normalize_name(b.name):
+            if norm_names[i] == norm_names[j]:
                 continue  # already caught as exact duplicate
 
             # Skip cross-registry near-duplicates that are covered by an exception
@@ -330,7 +369,7 @@ def find_near_duplicates(all_skills: List[Skill], exceptions: dict, threshold: f
                     ),
                     affected_paths=[a.path, b.path],
                     proposal=f"Review and consider merging '{a.name}' and '{b.name}' into a single skill.",
-                    fingerprint=f"near_dup::{normalize_name(a.name)}::{normalize_name(b.name)}",
+                    fingerprint=f"near_dup::{norm_names[i]}::{norm_names[j]}",
                 ))
 
     return findings
@@ -361,20 +400,18 @@ def find_merge_candidates(all_skills: List[Skill], threshold: float = 0.50) -> L
 
     seen_pairs = set()
     for registry, skills in by_registry.items():
+        norm_names = [normalize_name(s.name) for s in skills]
+        core_tokens = [core_name_tokens(s.name) for s in skills]
         for i, a in enumerate(skills):
             for j in range(i + 1, len(skills)):
                 b = skills[j]  # type: ignore
-                if normalize_name(a.name) == normalize_name(b.name):
+                if norm_names[i] == norm_names[j]:
                     continue
                 sim = desc_similarity(a.description, b.description)
 
                 # Penalize similarity if skill names conceptually mismatch completely
-                def get_core_tokens(name: str) -> set:
-                    ignore = {"patterns", "best", "practices", "expert", "design", "development", "integration", "management", "systems", "advanced", "workflows", "engineering", "mastery", "operations", "agent", "systems", "workflow"}
-                    return set(t for t in re.findall(r'[a-z]+', name.lower()) if t not in ignore)
-
-                core_a = get_core_tokens(a.name)
-                core_b = get_core_tokens(b.name)
+                core_a = core_tokens[i]
+                core_b = core_tokens[j]
                 if core_a and core_b and not core_a.intersection(core_b):
                     sim -= 0.20
 
@@ -394,11 +431,58 @@ def find_merge_candidates(all_skills: List[Skill], threshold: float = 0.50) -> L
                         ),
                         affected_paths=[a.path, b.path],
                         proposal=f"Consider merging '{a.name}' and '{b.name}' to reduce cognitive overhead.",
-                        fingerprint=f"merge::{normalize_name(a.name)}::{normalize_name(b.name)}",
+                        fingerprint=f"merge::{norm_names[i]}::{norm_names[j]}",
                     ))
     return findings
 
 
+# ─── Scan ─────────────────────────────────────────────────────────────────────
+
+SEVERITY_ORDER = {"high": 4, "medium": 3, "low": 2, "info": 1}
+
+
+def scan(registry_paths: List[Path], exceptions: dict, min_severity: str = "low",
+         cache: Optional[dict] = None) -> tuple[List[Skill], List[Finding]]:
+    """Load all registries and run every detector; findings sorted most severe first."""
+    all_skills = []
+    for rp in registry_paths:
+        all_skills.extend(load_registry(rp, cache))
+    if cache is not None:
+        # Rebuild from this cycle's paths so deleted SKILL.md files don't accumulate
+        live = {s.path: cache[s.path] for s in all_skills if s.path in cache}
+        cache.clear()
+        cache.update(live)
+
+    findings: List[Finding] = []
+    findings += find_exact_duplicates(all_skills, exceptions)
+    findings += find_near_duplicates(all_skills, exceptions)
+    findings += find_empty_skills(all_skills)
+    findings += find_merge_candidates(all_skills)
+
+    # Filter by severity
+    min_sev = SEVERITY_ORDER[min_severity]
+    findings = [f for f in findings if SEVERITY_ORDER.get(f.severity, 0) >= min_sev]
+    findings.sort(key=lambda f: SEVERITY_ORDER.get(f.severity, 0), reverse=True)
+    return all_skills, findings
+
+
+def scan_output(registry_paths: List[Path], all_skills: List[Skill], findings: List[Finding],
+                exceptions_file: str) -> dict:
+    """The --json document (also what generate_status_report.py consumes)."""
+    return {
+        "scanned_registries": [str(p) for p in registry_paths],
+        "total_skills": len(all_skills),
+        "exceptions_file": exceptions_file,
+        "findings": [asdict(f) for f in findings],  # type: ignore
+    }
+
+
+def load_exception_rules(exceptions_file: str, disabled: bool) -> dict:
+    if disabled:
+        return {"cross_registry_intentional": [], "registry_pair_rules": []}
+    return load_exceptions(Path(exceptions_file))
+
+
 # ─── Main ─────────────────────────────────────────────────────────────────────
 
 def main():
@@ -416,35 +500,12 @@ def main():
     registry_paths = [Path(p) for p in args.registries] if args.registries else DEFAULT_REGISTRIES
 
     # Load exceptions (unless --no-exceptions flag is set)
-    if args.no_exceptions:
-        exceptions = {"cross_registry_intentional": [], "registry_pair_rules": []}
-    else:
-        exceptions = load_exceptions(Path(args.exceptions))
-
-    all_skills = []
-    for rp in registry_paths:
-        skills = load_registry(rp)
-        all_skills.extend(skills)
-
-    findings: List[Finding] = []
-    findings += find_exact_duplicates(all_skills, exceptions)
-    findings += find_near_duplicates(all_skills, exceptions)
-    findings += find_empty_skills(all_skills)
-    findings += find_merge_candidates(all_skills)
-
-    # Filter by severity
-    severity_order = {"high": 4, "medium": 3, "low": 2, "info": 1}
-    min_sev = severity_order[args.min_severity]
-    findings = [f for f in findings if severity_order.get(f.severity, 0) >= min_sev]
-    findings.sort(key=lambda f: severity_order.get(f.severity, 0), reverse=True)
+    exceptions = load_exception_rules(args.exceptions, args.no_exceptions)
+    all_skills, findings = scan(registry_paths, exceptions, args.min_severity)
 
     if args.json:
-        output = {
-            "scanned_registries": [str(p) for p in registry_paths],
-            "total_skills": len(all_skills),
-            "exceptions_file": args.exceptions if not args.no_exceptions else "(disabled)",
-            "findings": [asdict(f) for f in findings],  # type: ignore
-        }
+        output = scan_output(registry_paths, all_skills, findings,
+                             args.exceptions if not args.no_exceptions else "(disabled)")
         print(json.dumps(output, indent=2))
     else:
         print(f"📊 Scanned {len(all_skills)} skills across {len(registry_paths)} registries")
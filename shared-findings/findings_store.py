@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Shared Findings Store
+One indexed SQLite store for every agent's findings, instead of each
+consumer re-reading and re-parsing the flat JSON files in shared-findings/.
+
+Findings are keyed by their stable `fingerprint` (scan_skills.py findings,
+health-checker incidents; docs-agent findings use their `id`) and carry
+`kind` and `severity` columns. Two tables:
+
+  events    append-only log: one row when a finding appears, changes,
+            is resolved or reopens (re-seeing an unchanged finding only
+            bumps last_seen, so a 15-minute agent does not flood the log)
+  findings  current state per fingerprint, indexed for the queries
+            reports run (active by kind/severity/agent, changed since T)
+
+Usage:
+  python3 findings_store.py import                      # shared-findings/*.json
+  python3 scan_skills.py --json | python3 findings_store.py import - --agent adhd-agent
+  python3 findings_store.py query --min-severity medium [--kind duplicate] [--json]
+  python3 findings_store.py query --since 2h [--kind duplicate]  # created/changed/resolved in the last 2h
+  python3 findings_store.py history <fingerprint>
+  python3 findings_store.py compact --older-than 30d [--vacuum]
+
+Library:
+  with FindingsStore() as store:
+      store.sync("adhd-agent", scan["findings"])
+      store.active(min_severity="medium")
+      store.changed_since(time.time() - 3600)
+"""
+from __future__ import annotations
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime, timezone
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple
+
+# ─── Paths & constants ────────────────────────────────────────────────────────
+
+SHARED_DIR = Path(__file__).resolve().parent
+DEFAULT_DB = Path(os.environ.get("FINDINGS_DB", SHARED_DIR / "findings.db"))
+
+SEVERITY_RANK = {"info": 1, "low": 2, "medium": 3, "high": 4, "critical": 5}
+
+# Fields that change on every run without the finding changing
+VOLATILE_KEYS = {"first_seen", "last_seen", "count", "timestamp", "last_alert_epoch", "last_daily_alert"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq          INTEGER PRIMARY KEY AUTOINCREMENT,
+    fingerprint  TEXT NOT NULL,
+    agent        TEXT NOT NULL,
+    op           TEXT NOT NULL,          -- new | changed | resolved | reopened
+    at           REAL NOT NULL,          -- epoch seconds
+    content_hash TEXT NOT NULL,
+    data         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_fingerprint ON events (fingerprint, seq);
+CREATE INDEX IF NOT EXISTS events_at ON events (at);
+
+CREATE TABLE IF NOT EXISTS findings (
+    fingerprint  TEXT PRIMARY KEY,
+    agent        TEXT NOT NULL,
+    kind         TEXT NOT NULL,
+    severity     TEXT NOT NULL,
+    title        TEXT NOT NULL,
+    data         TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    first_seen   REAL NOT NULL,
+    last_seen    REAL NOT NULL,
+    updated_at   REAL NOT NULL,          -- last new/changed/resolved/reopened event
+    resolved_at  REAL
+);
+CREATE INDEX IF NOT EXISTS findings_kind ON findings (kind, severity) WHERE resolved_at IS NULL;
+CREATE INDEX IF NOT EXISTS findings_severity ON findings (severity) WHERE resolved_at IS NULL;
+CREATE INDEX IF NOT EXISTS findings_agent ON findings (agent, resolved_at);
+CREATE INDEX IF NOT EXISTS findings_updated_at ON findings (updated_at);
+"""
+
+# ─── Normalization ────────────────────────────────────────────────────────────
+
+def to_epoch(value) -> Optional[float]:
+    """Epoch seconds from an epoch number or an ISO-8601 string (naive = UTC)."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Seconds in a duration like 90s, 30m, 2h or 7d; None if it is not one."""
+    m = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd])", value.strip())
+    if not m:
+        return None
+    return float(m.group(1)) * {"s": 1, "m": 60, "h": 3600, "d": 86400}[m.group(2)]
+
+
+def parse_since(value: str) -> float:
+    """--since: ISO-8601 timestamp, epoch seconds, or a duration back from now (90s, 30m, 2h, 7d)."""
+    seconds = parse_duration(value)
+    if seconds is not None:
+        return time.time() - seconds
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    epoch = to_epoch(value)
+    if epoch is None:
+        raise argparse.ArgumentTypeError(f"not a timestamp or duration: {value!r}")
+    return epoch
+
+
+def content_hash(finding: dict) -> str:
+    stable = {k: v for k, v in finding.items() if k not in VOLATILE_KEYS}
+    return hashlib.sha1(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def normalize(finding: dict) -> dict:
+    """Common columns for any agent's finding shape; raises ValueError without a fingerprint."""
+    fingerprint = finding.get("fingerprint") or finding.get("id")
+    if not fingerprint:
+        raise ValueError(f"finding has no fingerprint: {json.dumps(finding)[:120]}")
+    return {
+        "fingerprint": str(fingerprint),
+        "kind": finding.get("kind") or finding.get("category") or "finding",
+        "severity": str(finding.get("severity", "info")).lower(),
+        "title": finding.get("title") or finding.get("message") or str(fingerprint),
+        "first_seen": to_epoch(finding.get("first_seen")),
+    }
+
+# ─── Store ────────────────────────────────────────────────────────────────────
+
+class FindingsStore:
+    def __init__(self, path: Path | str = DEFAULT_DB):
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Readers never block the agents writing
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> "FindingsStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── Writes ──
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """BEGIN IMMEDIATE: take the write lock up front so concurrent agents queue instead of deadlocking."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _upsert(self, agent: str, finding: dict, now: float) -> str:
+        """Upsert one finding inside the caller's transaction; returns the event op or 'unchanged'."""
+        cols = normalize(finding)
+        digest = content_hash(finding)
+        data = json.dumps(finding, default=str)
+        row = self.conn.execute("SELECT content_hash, resolved_at FROM findings WHERE fingerprint = ?",
+                                (cols["fingerprint"],)).fetchone()
+        if row is None:
+            op = "new"
+        elif row["resolved_at"] is not None:
+            op = "reopened"
+        elif row["content_hash"] != digest:
+            op = "changed"
+        else:
+            self.conn.execute("UPDATE findings SET last_seen = ? WHERE fingerprint = ?", (now, cols["fingerprint"]))
+            return "unchanged"
+
+        self.conn.execute(
+            "INSERT INTO events (fingerprint, agent, op, at, content_hash, data) VALUES (?, ?, ?, ?, ?, ?)",
+            (cols["fingerprint"], agent, op, now, digest, data),
+        )
+        self.conn.execute(
+            """INSERT INTO findings (fingerprint, agent, kind, severity, title, data, content_hash,
+                                     first_seen, last_seen, updated_at, resolved_at)
+               VALUES (:fingerprint, :agent, :kind, :severity, :title, :data, :hash,
+                       :first_seen, :now, :now, NULL)
+               ON CONFLICT (fingerprint) DO UPDATE SET
+                   agent = excluded.agent, kind = excluded.kind, severity = excluded.severity,
+                   title = excluded.title, data = excluded.data, content_hash = excluded.content_hash,
+                   last_seen = excluded.last_seen, updated_at = excluded.updated_at, resolved_at = NULL""",
+            {**cols, "agent": agent, "data": data, "hash": digest, "now": now,
+             "first_seen": cols["first_seen"] or now},
+        )
+        return op
+
+    def upsert(self, agent: str, findings: Iterable[dict], now: Optional[float] = None) -> Counter:
+        """Insert or update findings in one transaction; returns a count per op."""
+        now = time.time() if now is None else now
+        ops: Counter = Counter()
+        with self.transaction():
+            for finding in findings:
+                ops[self._upsert(agent, finding, now)] += 1
+        return ops
+
+    def sync(self, agent: str, findings: Iterable[dict], now: Optional[float] = None) -> Counter:
+        """Make `findings` the agent's complete current set: upsert them, resolve the agent's others."""
+        now = time.time() if now is None else now
+        ops: Counter = Counter()
+        with self.transaction():
+            seen = set()
+            for finding in findings:
+                ops[self._upsert(agent, finding, now)] += 1
+                seen.add(normalize(finding)["fingerprint"])
+            stale = [r["fingerprint"] for r in self.conn.execute(
+                "SELECT fingerprint FROM findings WHERE agent = ? AND resolved_at IS NULL", (agent,))
+                if r["fingerprint"] not in seen]
+            for fingerprint in stale:
+                self._resolve(fingerprint, now)
+            if stale:
+                ops["resolved"] = len(stale)
+        return ops
+
+    def _resolve(self, fingerprint: str, now: float) -> bool:
+        row = self.conn.execute("SELECT agent, content_hash, data FROM findings "
+                                "WHERE fingerprint = ? AND resolved_at IS NULL", (fingerprint,)).fetchone()
+        if row is None:
+            return False
+        self.conn.execute(
+            "INSERT INTO events (fingerprint, agent, op, at, content_hash, data) VALUES (?, ?, 'resolved', ?, ?, ?)",
+            (fingerprint, row["agent"], now, row["content_hash"], row["data"]),
+        )
+        self.conn.execute("UPDATE findings SET resolved_at = ?, updated_at = ? WHERE fingerprint = ?",
+                          (now, now, fingerprint))
+        return True
+
+    def resolve(self, fingerprint: str, now: Optional[float] = None) -> bool:
+        """Mark one finding resolved; False if it is unknown or already resolved."""
+        with self.transaction():
+            return self._resolve(fingerprint, time.time() if now is None else now)
+
+    def compact(self, older_than: float, vacuum: bool = False) -> Dict[str, int]:
+        """Drop history older than `older_than` seconds.
+
+        Keeps each finding's latest event, so history() still explains its
+        current state; findings resolved before the cutoff go entirely.
+        """
+        cutoff = time.time() - older_than
+        with self.transaction():
+            gone = self.conn.execute(
+                "DELETE FROM findings WHERE resolved_at IS NOT NULL AND resolved_at < ?", (cutoff,)).rowcount
+            events = self.conn.execute(
+                """DELETE FROM events WHERE at < ? AND (
+                       fingerprint NOT IN (SELECT fingerprint FROM findings)
+                       OR seq < (SELECT MAX(seq) FROM events AS latest WHERE latest.fingerprint = events.fingerprint)
+                   )""", (cutoff,)).rowcount
+        if vacuum:
+            self.conn.execute("VACUUM")
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {"findings_removed": gone, "events_removed": events}
+
+    # ── Reads ──
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> dict:
+        record = dict(row)
+        record["data"] = json.loads(record["data"])
+        return record
+
+    @staticmethod
+    def _filters(kind: Optional[str], severity: Optional[str], min_severity: Optional[str],
+                 agent: Optional[str]) -> Tuple[List[str], list]:
+        """WHERE clauses and parameters shared by active() and changed_since()."""
+        clauses, params = [], []
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if severity:
+            clauses.append("severity = ?")
+            params.append(severity)
+        if min_severity:
+            allowed = [s for s, rank in SEVERITY_RANK.items() if rank >= SEVERITY_RANK[min_severity]]
+            clauses.append(f"severity IN ({', '.join('?' * len(allowed))})")
+            params += allowed
+        if agent:
+            clauses.append("agent = ?")
+            params.append(agent)
+        return clauses, params
+
+    def active(self, kind: Optional[str] = None, severity: Optional[str] = None,
+               min_severity: Optional[str] = None, agent: Optional[str] = None) -> List[dict]:
+        """Unresolved findings, most severe first."""
+        clauses, params = self._filters(kind, severity, min_severity, agent)
+        clauses.insert(0, "resolved_at IS NULL")
+        rows = self.conn.execute(f"SELECT * FROM findings WHERE {' AND '.join(clauses)}", params)
+        records = [self._row(r) for r in rows]
+        records.sort(key=lambda r: (-SEVERITY_RANK.get(r["severity"], 0), r["fingerprint"]))
+        return records
+
+    def changed_since(self, since: float, agent: Optional[str] = None, kind: Optional[str] = None,
+                      severity: Optional[str] = None, min_severity: Optional[str] = None) -> List[dict]:
+        """Findings created, changed, resolved or reopened after `since` (epoch), oldest change first."""
+        clauses, params = self._filters(kind, severity, min_severity, agent)
+        sql = f"SELECT * FROM findings WHERE {' AND '.join(['updated_at > ?'] + clauses)} ORDER BY updated_at"
+        return [self._row(r) for r in self.conn.execute(sql, [since] + params)]
+
+    def history(self, fingerprint: str) -> List[dict]:
+        rows = self.conn.execute("SELECT * FROM events WHERE fingerprint = ? ORDER BY seq", (fingerprint,))
+        return [self._row(r) for r in rows]
+
+    def get(self, fingerprint: str) -> Optional[dict]:
+        row = self.conn.execute("SELECT * FROM findings WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        return self._row(row) if row else None
+
+    def stats(self) -> dict:
+        def by(column: str) -> dict:
+            return dict(self.conn.execute(f"SELECT {column}, COUNT(*) FROM findings "
+                                          f"WHERE resolved_at IS NULL GROUP BY {column}").fetchall())
+
+        return {
+            "active": self.conn.execute("SELECT COUNT(*) FROM findings WHERE resolved_at IS NULL").fetchone()[0],
+            "resolved": self.conn.execute("SELECT COUNT(*) FROM findings WHERE resolved_at IS NOT NULL").fetchone()[0],
+            "events": self.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0],
+            "by_agent": by("agent"),
+            "by_kind": by("kind"),
+            "by_severity": by("severity"),
+        }
+
+# ─── Importers ────────────────────────────────────────────────────────────────
+
+def snapshots(data: dict, default_agent: Optional[str] = None) -> Dict[str, List[dict]]:
+    """Split one shared-findings JSON document into {agent: complete list of its findings}.
+
+    Understands the three shapes agents write today:
+      incidents.json      {"incidents": {fingerprint: {...}}, ...}  (health-checker)
+      <agent>.json        {"agent": ..., "findings": [{"id": ...}]} (docs-agent)
+      scan_skills --json  {"scanned_registries": ..., "findings": [{"fingerprint": ...}]}
+    """
+    if "incidents" in data:
+        found: Dict[str, List[dict]] = {default_agent or "health-checker": []}
+        for fingerprint, incident in data["incidents"].items():
+            found[default_agent or "health-checker"].append({"fingerprint": fingerprint, "kind": "incident",
+                                                              **incident})
+        return found
+    if "findings" in data:
+        agent = default_agent or data.get("agent") or ("adhd-agent" if "scanned_registries" in data else None)
+        if not agent:
+            raise ValueError("cannot tell which agent wrote these findings; pass --agent")
+        return {agent: list(data["findings"])}
+    raise ValueError("no 'findings' or 'incidents' in document")
+
+
+def import_document(store: FindingsStore, data: dict, agent: Optional[str] = None,
+                    resolve_missing: bool = True) -> Dict[str, Counter]:
+    """Load one document; each agent's set replaces its previous one unless resolve_missing is False."""
+    results = {}
+    for name, findings in snapshots(data, agent).items():
+        results[name] = store.sync(name, findings) if resolve_missing else store.upsert(name, findings)
+    return results
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+
+def print_findings(records: List[dict], as_json: bool):
+    if as_json:
+        print(json.dumps(records, indent=2, default=str))
+        return
+    icons = {"critical": "🔴", "high": "🔴", "medium": "🟡", "low": "🟢", "info": "🔵"}
+    for r in records:
+        state = " (resolved)" if r.get("resolved_at") else ""
+        updated = datetime.fromtimestamp(r["updated_at"], timezone.utc).strftime("%Y-%m-%d %H:%M")
+        print(f"{icons.get(r['severity'], '•')} [{r['kind']}] {r['title']}{state}")
+        print(f"   {r['fingerprint']} · {r['agent']} · updated {updated} UTC")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared findings store")
+    parser.add_argument("--db", default=str(DEFAULT_DB), help="SQLite file (default: shared-findings/findings.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="Import shared-findings JSON files or scan_skills.py output")
+    p.add_argument("files", nargs="*", help="JSON files, '-' for stdin (default: shared-findings/*.json)")
+    p.add_argument("--agent", help="Agent that wrote the findings (default: from the document)")
+    p.add_argument("--no-resolve", action="store_true",
+                   help="Only upsert; do not resolve the agent's findings missing from the file")
+
+    p = sub.add_parser("query", help="Active findings, or everything changed since --since")
+    p.add_argument("--kind")
+    p.add_argument("--severity", choices=list(SEVERITY_RANK))
+    p.add_argument("--min-severity", choices=list(SEVERITY_RANK))
+    p.add_argument("--agent")
+    p.add_argument("--since", type=parse_since, help="ISO time, epoch, or duration (30m, 2h, 7d)")
+    p.add_argument("--json", action="store_true")
+
+    p = sub.add_parser("history", help="Event log of one finding")
+    p.add_argument("fingerprint")
+
+    p = sub.add_parser("resolve", help="Mark a finding resolved")
+    p.add_argument("fingerprint")
+
+    p = sub.add_parser("compact", help="Drop history older than --older-than")
+    p.add_argument("--older-than", default="30d", type=parse_duration, help="Duration (default: 30d)")
+    p.add_argument("--vacuum", action="store_true", help="Also return freed pages to the filesystem")
+
+    sub.add_parser("stats", help="Counts by agent, kind and severity")
+    args = parser.parse_args()
+
+    with FindingsStore(args.db) as store:
+        if args.command == "import":
+            files = args.files or sorted(str(p) for p in SHARED_DIR.glob("*.json"))
+            for name in files:
+                try:
+                    data = json.load(sys.stdin) if name == "-" else json.loads(Path(name).read_text(encoding="utf-8"))
+                    results = import_document(store, data, args.agent, not args.no_resolve)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  {name}: {e}", file=sys.stderr)
+                    continue
+                for agent, ops in results.items():
+                    summary = ", ".join(f"{n} {op}" for op, n in sorted(ops.items())) or "nothing"
+                    print(f"[findings] {name} → {agent}: {summary}", file=sys.stderr)
+
+        elif args.command == "query":
+            if args.since is not None:
+                records = store.changed_since(args.since, args.agent, args.kind, args.severity, args.min_severity)
+            else:
+                records = store.active(args.kind, args.severity, args.min_severity, args.agent)
+            print_findings(records, args.json)
+
+        elif args.command == "history":
+            print(json.dumps(store.history(args.fingerprint), indent=2, default=str))
+
+        elif args.command == "resolve":
+            if not store.resolve(args.fingerprint):
+                print(f"⚠️  No active finding {args.fingerprint}", file=sys.stderr)
+                sys.exit(1)
+
+        elif args.command == "compact":
+            if args.older_than is None:
+                parser.error("--older-than takes a duration such as 30d")
+            print(json.dumps(store.compact(args.older_than, args.vacuum)))
+
+        elif args.command == "stats":
+            print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()